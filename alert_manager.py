@@ -11,13 +11,29 @@ Proprietario: Domarc SRL
 Copyright (c) 2024-2026 Domarc SRL - Tutti i diritti riservati.
 """
 
+import atexit
+import ctypes
+import errno
 import logging
+import os
 import socket
+import string
+import struct
+import sys
 import json
+import queue
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 from enum import Enum
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Version info
 try:
     from version import __version__, get_version_string
@@ -28,6 +44,167 @@ except ImportError:
 
 logger = logging.getLogger("proxreporter")
 
+def _json_dumps(obj: Any) -> bytes:
+    """Serializza in JSON (UTF-8), usando orjson se disponibile"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+# Escape dei valori nei parametri structured-data RFC 5424 (\, ", ])
+_SD_ESCAPE_TABLE = str.maketrans({'\\': '\\\\', '"': '\\"', ']': '\\]'})
+
+
+def _escape_sd_value(value: Any) -> str:
+    """
+    Escape di un valore structured-data RFC 5424 in un solo passaggio C
+    (str.translate). I numeri non contengono caratteri da escapare.
+    """
+    if isinstance(value, (int, float)):
+        return str(value)
+    return str(value).translate(_SD_ESCAPE_TABLE)
+
+# Hostname locale, letto una sola volta all'import
+_HOSTNAME = socket.gethostname()
+
+# Numero massimo di alert prelevati dalla coda di invio per ogni ciclo del worker
+DISPATCH_BATCH_SIZE = 64
+
+# Dimensione del buffer di invio del socket UDP syslog
+UDP_SEND_BUFFER_SIZE = 1024 * 1024
+
+# Numero massimo di buffer per singola sendmsg() (IOV_MAX su Linux)
+SENDMSG_MAX_BUFFERS = 1024
+
+# Numero massimo di datagrammi per singola chiamata sendmmsg()
+SENDMMSG_BATCH_SIZE = 64
+
+
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IoVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+def _load_sendmmsg():
+    """Restituisce la funzione libc sendmmsg() se disponibile (solo Linux)"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        func = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    func.restype = ctypes.c_int
+    return func
+
+
+_libc_sendmmsg = _load_sendmmsg()
+
+
+def _sendmsg_all(sock: socket.socket, buffers: List[bytes]) -> None:
+    """
+    Invia più buffer su uno stream con sendmsg() scatter-gather, senza
+    concatenarli in memoria. Gestisce gli invii parziali.
+    """
+    if not hasattr(sock, 'sendmsg'):
+        sock.sendall(b''.join(buffers))
+        return
+    
+    pending = [memoryview(buf) for buf in buffers]
+    index = 0
+    while index < len(pending):
+        sent = sock.sendmsg(pending[index:index + SENDMSG_MAX_BUFFERS])
+        # Avanza oltre i buffer inviati completamente, poi taglia quello parziale
+        while index < len(pending) and sent >= len(pending[index]):
+            sent -= len(pending[index])
+            index += 1
+        if sent:
+            pending[index] = pending[index][sent:]
+
+
+def _pack_sockaddr(family: int, sockaddr: tuple) -> Optional[bytes]:
+    """
+    sockaddr_in / sockaddr_in6 in formato binario, per msg_name di sendmmsg().
+    
+    Returns:
+        None se la famiglia di indirizzi non è gestita
+    """
+    if family == socket.AF_INET:
+        host, port = sockaddr[:2]
+        return struct.pack("=HH4s8x", family, socket.htons(port), socket.inet_aton(host))
+    if family == socket.AF_INET6:
+        host, port, flowinfo, scope_id = sockaddr
+        return struct.pack(
+            "=HHI16sI", family, socket.htons(port), socket.htonl(flowinfo),
+            socket.inet_pton(socket.AF_INET6, host.partition('%')[0]), scope_id
+        )
+    return None
+
+
+def _sendmmsg(sock: socket.socket, payloads: Sequence[bytes], raw_addr: Optional[bytes]) -> int:
+    """
+    Invia più datagrammi UDP con una sola syscall sendmmsg() per blocco.
+    
+    Il socket ha un timeout, quindi il suo fd è non bloccante: un buffer pieno
+    (EAGAIN) o un invio parziale interrompono l'invio e il chiamante prosegue
+    con sendto(), che rispetta il timeout.
+    
+    Args:
+        raw_addr: indirizzo di destinazione da _pack_sockaddr(), già risolto
+    
+    Returns:
+        Numero di datagrammi inviati dall'inizio di payloads (0 se sendmmsg
+        non è utilizzabile)
+    """
+    if _libc_sendmmsg is None or raw_addr is None:
+        return 0
+    
+    sockaddr = ctypes.create_string_buffer(raw_addr, len(raw_addr))
+    total = 0
+    
+    for start in range(0, len(payloads), SENDMMSG_BATCH_SIZE):
+        chunk = payloads[start:start + SENDMMSG_BATCH_SIZE]
+        count = len(chunk)
+        buffers = [ctypes.create_string_buffer(p, len(p)) for p in chunk]
+        iovecs = (_IoVec * count)()
+        msgs = (_MMsgHdr * count)()
+        for i, buf in enumerate(buffers):
+            iovecs[i].iov_base = ctypes.cast(buf, ctypes.c_void_p)
+            iovecs[i].iov_len = len(chunk[i])
+            hdr = msgs[i].msg_hdr
+            hdr.msg_name = ctypes.cast(sockaddr, ctypes.c_void_p)
+            hdr.msg_namelen = len(raw_addr)
+            hdr.msg_iov = ctypes.pointer(iovecs[i])
+            hdr.msg_iovlen = 1
+        
+        sent = _libc_sendmmsg(sock.fileno(), msgs, count, socket.MSG_DONTWAIT)
+        if sent < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                return total
+            raise OSError(err, os.strerror(err))
+        total += sent
+        if sent < count:
+            return total
+    
+    return total
+
 
 class AlertSeverity(Enum):
     """Livelli di severità per gli alert (compatibili con Syslog)"""
@@ -61,6 +238,123 @@ class AlertType(Enum):
     CUSTOM = "custom"
 
 
+# Colore dell'header email per ogni livello di severità
+_SEVERITY_COLORS: Dict[AlertSeverity, str] = {
+    AlertSeverity.EMERGENCY: '#8B0000',
+    AlertSeverity.ALERT: '#FF0000',
+    AlertSeverity.CRITICAL: '#DC143C',
+    AlertSeverity.ERROR: '#FF4500',
+    AlertSeverity.WARNING: '#FFA500',
+    AlertSeverity.NOTICE: '#1E90FF',
+    AlertSeverity.INFO: '#32CD32',
+    AlertSeverity.DEBUG: '#808080',
+}
+
+# Nome severità (minuscolo, come in config) -> valore Syslog
+_SEVERITY_NAME_TO_VALUE: Dict[str, int] = {
+    name.lower(): member.value for name, member in AlertSeverity.__members__.items()
+}
+
+# Template HTML delle email di alert (compilati una sola volta)
+_DETAIL_ROW_TMPL = string.Template(
+    "<tr><td style='padding: 8px; border-bottom: 1px solid #ddd;'><strong>$k</strong></td>"
+    "<td style='padding: 8px; border-bottom: 1px solid #ddd;'>$v</td></tr>"
+)
+
+_DETAILS_SECTION_TMPL = string.Template("""
+            <h3 style="color: #333; margin-top: 20px;">Dettagli</h3>
+            <table style="width: 100%; border-collapse: collapse;">
+                $details_rows
+            </table>
+            """)
+
+_ALERT_HTML_TMPL = string.Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body { font-family: 'Segoe UI', Tahoma, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }
+                .container { max-width: 600px; margin: 0 auto; background: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+                .header { background: $color; color: white; padding: 20px; }
+                .header h1 { margin: 0; font-size: 1.5em; }
+                .header .badge { display: inline-block; background: rgba(255,255,255,0.2); padding: 4px 12px; border-radius: 20px; font-size: 0.8em; margin-top: 10px; }
+                .content { padding: 20px; }
+                .message { background: #f9f9f9; padding: 15px; border-radius: 5px; margin-bottom: 20px; border-left: 4px solid $color; }
+                .footer { background: #f0f0f0; padding: 15px; font-size: 0.85em; color: #666; text-align: center; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>$title</h1>
+                    <span class="badge">$severity</span>
+                    <span class="badge">$alert_type</span>
+                </div>
+                <div class="content">
+                    <div class="message">
+                        <p style="margin: 0;">$message</p>
+                    </div>
+                    <p><strong>Host:</strong> $hostname</p>
+                    <p><strong>Timestamp:</strong> $timestamp</p>
+                    $details_html
+                </div>
+                <div class="footer">
+                    <p>Proxreporter Alert System</p>
+                    <p>&copy; Domarc SRL</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """)
+
+_DIGEST_ENTRY_TMPL = string.Template("""
+                <div class="alert" style="border-left: 4px solid $color;">
+                    <h2 style="color: $color;">$title</h2>
+                    <span class="badge" style="background: $color;">$severity</span>
+                    <span class="badge" style="background: #666;">$alert_type</span>
+                    <p>$message</p>
+                    <p><strong>Timestamp:</strong> $timestamp</p>
+                    <table style="width: 100%; border-collapse: collapse;">$details_rows</table>
+                </div>""")
+
+_DIGEST_HTML_TMPL = string.Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body { font-family: 'Segoe UI', Tahoma, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }
+                .container { max-width: 700px; margin: 0 auto; background: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+                .header { background: #333; color: white; padding: 20px; }
+                .header h1 { margin: 0; font-size: 1.5em; }
+                .content { padding: 20px; }
+                .alert { background: #f9f9f9; padding: 15px; border-radius: 5px; margin-bottom: 20px; }
+                .alert h2 { margin: 0 0 8px 0; font-size: 1.1em; }
+                .badge { display: inline-block; color: white; padding: 2px 10px; border-radius: 20px; font-size: 0.8em; }
+                .footer { background: #f0f0f0; padding: 15px; font-size: 0.85em; color: #666; text-align: center; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>$count alert</h1>
+                </div>
+                <div class="content">
+                    <p><strong>Host:</strong> $hostname</p>
+                    <p><strong>Timestamp:</strong> $timestamp</p>
+                    $sections
+                </div>
+                <div class="footer">
+                    <p>Proxreporter Alert System</p>
+                    <p>&copy; Domarc SRL</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """)
+
+
 class SyslogSender:
     """Invia messaggi a un server Syslog remoto via UDP o TCP"""
     
@@ -93,10 +387,28 @@ class SyslogSender:
         self.protocol = self.config.get('protocol', 'udp').lower()
         self.facility = int(self.config.get('facility', self.FACILITY_LOCAL0))
         self.app_name = self.config.get('app_name', 'proxreporter')
-        self.hostname = socket.gethostname()
+        self.hostname = _HOSTNAME
+        self._hostname_bytes = self.hostname.encode('utf-8')
+        self._app_name_bytes = self.app_name.encode('utf-8')
         self.codcli = config.get('codcli', '')
         self.nomecliente = config.get('nomecliente', '')
         self._socket = None
+        # Destinazione UDP risolta alla creazione del socket: (sockaddr, forma binaria)
+        self._address: Optional[tuple] = None
+        self._raw_address: Optional[bytes] = None
+        
+        # Campi GELF costanti per la vita del sender, serializzati una sola volta
+        # (prefisso JSON senza la graffa di chiusura)
+        self._gelf_base = {
+            "version": "1.1",
+            "host": self.hostname,
+            "_app": self.app_name,
+            "_module": "proxreporter",
+            "_app_version": __version__,
+            "_client_code": self.codcli,
+            "_client_name": self.nomecliente,
+        }
+        self._gelf_prefix = _json_dumps(self._gelf_base)[:-1]
     
     def _get_socket(self) -> Optional[socket.socket]:
         """Crea o restituisce il socket per la connessione"""
@@ -108,67 +420,89 @@ class SyslogSender:
                 self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 self._socket.settimeout(5)
                 self._socket.connect((self.host, self.port))
+                # Messaggi piccoli: niente ritardo di Nagle; keepalive per rilevare
+                # connessioni cadute (es. dietro NAT) prima del prossimo invio
+                self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                if hasattr(socket, 'TCP_KEEPIDLE'):
+                    self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+                    self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+                    self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
             else:
-                self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                # Risoluzione del nome una sola volta per socket (IPv4 o IPv6)
+                family, _, _, _, address = socket.getaddrinfo(
+                    self.host, self.port, 0, socket.SOCK_DGRAM
+                )[0]
+                self._socket = socket.socket(family, socket.SOCK_DGRAM)
+                self._address = address
+                self._raw_address = _pack_sockaddr(family, address)
                 self._socket.settimeout(5)
+                # Buffer di invio più ampio per assorbire i burst di alert
+                self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, UDP_SEND_BUFFER_SIZE)
             return self._socket
         except Exception as e:
             logger.error(f"✗ Errore connessione Syslog {self.host}:{self.port}: {e}")
             return None
     
     def _build_syslog_message(self, severity: AlertSeverity, message: str, 
-                               structured_data: Optional[Dict] = None) -> bytes:
+                               structured_data: Optional[Dict] = None,
+                               alert_type: Optional[AlertType] = None) -> bytes:
         """
         Costruisce un messaggio Syslog in formato RFC 5424 o GELF per Graylog.
         
         PRI = facility * 8 + severity
+        
+        alert_type, se indicato, prevale sulla chiave 'alert_type' di
+        structured_data (che non viene modificato).
         """
         # Check if GELF format is requested
         if self.config.get('format', 'rfc5424').lower() == 'gelf':
-            return self._build_gelf_message(severity, message, structured_data)
+            return self._build_gelf_message(severity, message, structured_data, alert_type)
         
         pri = self.facility * 8 + severity.value
-        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+        now = datetime.now(timezone.utc)
+        timestamp = '%04d-%02d-%02dT%02d:%02d:%02d.%03dZ' % (
+            now.year, now.month, now.day, now.hour, now.minute, now.second, now.microsecond // 1000
+        )
         
         # Structured data (opzionale) - formato ottimizzato per Graylog
-        sd = '-'
-        if structured_data:
-            sd_parts = []
+        sd = b'-'
+        if structured_data or alert_type:
+            structured_data = structured_data or {}
+            sd_params = []
             for key, value in structured_data.items():
-                # Escape caratteri speciali
-                value_escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace(']', '\\]')
-                sd_parts.append(f'{key}="{value_escaped}"')
-            sd = f'[proxreporter@0 {" ".join(sd_parts)}]'
+                if key == 'alert_type' and alert_type:
+                    value = alert_type.value
+                sd_params.append(f'{key}="{_escape_sd_value(value)}"')
+            if alert_type and 'alert_type' not in structured_data:
+                sd_params.append(f'alert_type="{alert_type.value}"')
+            sd = b'[proxreporter@0 ' + " ".join(sd_params).encode('utf-8') + b']'
         
         # Formato RFC 5424: <PRI>VERSION TIMESTAMP HOSTNAME APP-NAME PROCID MSGID STRUCTURED-DATA MSG
-        syslog_msg = f'<{pri}>1 {timestamp} {self.hostname} {self.app_name} - - {sd} {message}'
-        
-        return syslog_msg.encode('utf-8')
+        return b''.join((
+            b'<', str(pri).encode('ascii'), b'>1 ', timestamp.encode('ascii'), b' ',
+            self._hostname_bytes, b' ', self._app_name_bytes, b' - - ',
+            sd, b' ', message.encode('utf-8'),
+        ))
     
     def _build_gelf_message(self, severity: AlertSeverity, message: str,
-                            structured_data: Optional[Dict] = None) -> bytes:
+                            structured_data: Optional[Dict] = None,
+                            alert_type: Optional[AlertType] = None) -> bytes:
         """Costruisce un messaggio in formato GELF con campi comuni standardizzati."""
-        import time
-        
-        alert_type = (structured_data or {}).get("alert_type", "custom")
+        if alert_type:
+            alert_type = alert_type.value
+        else:
+            alert_type = (structured_data or {}).get("alert_type", "custom")
         event = alert_type.replace("_", ".") if alert_type else "alert"
         status = "success" if severity.value >= 6 else ("warning" if severity.value >= 4 else "error")
         
         gelf_msg = {
-            "version": "1.1",
-            "host": self.hostname,
             "short_message": message[:250] if len(message) > 250 else message,
             "full_message": message,
             "timestamp": time.time(),
             "level": severity.value,
-            # Campi comuni standard
-            "_app": self.app_name,
-            "_module": "proxreporter",
-            "_app_version": __version__,
             "_event": event,
             "_message_type": alert_type.upper() if alert_type else "ALERT",
-            "_client_code": self.codcli,
-            "_client_name": self.nomecliente,
             "_hostname": self.hostname,
             "_status": status,
         }
@@ -180,7 +514,11 @@ class SyslogSender:
                 gelf_key = f"_{key}" if not key.startswith('_') else key
                 gelf_msg[gelf_key] = str(value) if not isinstance(value, (int, float, bool)) else value
         
-        return (json.dumps(gelf_msg) + '\0').encode('utf-8')
+        # Un campo invariante sovrascritto dai dati strutturati richiede la serializzazione completa
+        if not self._gelf_base.keys().isdisjoint(gelf_msg):
+            return _json_dumps({**self._gelf_base, **gelf_msg}) + b'\0'
+        
+        return self._gelf_prefix + b',' + _json_dumps(gelf_msg)[1:] + b'\0'
     
     def send(self, severity: AlertSeverity, message: str, 
              alert_type: Optional[AlertType] = None,
@@ -204,31 +542,83 @@ class SyslogSender:
             logger.warning("Syslog host non configurato")
             return False
         
-        structured_data = extra_data.copy() if extra_data else {}
-        if alert_type:
-            structured_data['alert_type'] = alert_type.value
-        
         try:
             sock = self._get_socket()
             if not sock:
                 return False
             
-            syslog_message = self._build_syslog_message(severity, message, structured_data)
+            syslog_message = self._build_syslog_message(severity, message, extra_data, alert_type)
             
             if self.protocol == 'tcp':
                 # TCP richiede newline come terminatore
-                sock.sendall(syslog_message + b'\n')
+                _sendmsg_all(sock, [syslog_message, b'\n'])
             else:
-                sock.sendto(syslog_message, (self.host, self.port))
+                sock.sendto(syslog_message, self._address)
             
-            logger.debug(f"Syslog inviato a {self.host}:{self.port}: {message[:50]}...")
+            logger.debug("Syslog inviato a %s:%d: %.50s...", self.host, self.port, message)
             return True
             
         except Exception as e:
             logger.error(f"✗ Errore invio Syslog: {e}")
-            self._socket = None  # Reset socket per retry
+            self._reset_socket()
             return False
     
+    def send_many(self, records: List[Tuple[AlertSeverity, str, Optional[AlertType], Optional[Dict]]]) -> int:
+        """
+        Invia più messaggi al server Syslog con il minor numero di syscall.
+        
+        Su UDP (Linux) i datagrammi vengono inviati con sendmmsg() a blocchi,
+        altrove con sendto() sequenziali; su TCP i messaggi vengono accorpati
+        in un unico sendall().
+        
+        Args:
+            records: lista di tuple (severity, message, alert_type, extra_data)
+        
+        Returns:
+            Numero di messaggi inviati
+        """
+        if not self.enabled or not records:
+            return 0
+        
+        if not self.host:
+            logger.warning("Syslog host non configurato")
+            return 0
+        
+        try:
+            sock = self._get_socket()
+            if not sock:
+                return 0
+            
+            payloads = [
+                self._build_syslog_message(severity, message, extra_data, alert_type)
+                for severity, message, alert_type, extra_data in records
+            ]
+            
+            if self.protocol == 'tcp':
+                # TCP richiede newline come terminatore di ogni messaggio
+                buffers = []
+                for payload in payloads:
+                    buffers.append(payload)
+                    buffers.append(b'\n')
+                _sendmsg_all(sock, buffers)
+            else:
+                # Quanto sendmmsg non ha inviato (non disponibile, EAGAIN, invio parziale) passa da sendto
+                sent = _sendmmsg(sock, payloads, self._raw_address)
+                for payload in payloads[sent:]:
+                    sock.sendto(payload, self._address)
+            
+            logger.debug("Syslog inviati %d messaggi a %s:%d", len(payloads), self.host, self.port)
+            return len(payloads)
+            
+        except Exception as e:
+            logger.error(f"✗ Errore invio Syslog: {e}")
+            self._reset_socket()
+            return 0
+    
+    def _reset_socket(self):
+        """Scarta il socket (verrà ricreato al prossimo invio)"""
+        self._socket = None
+    
     def close(self):
         """Chiude il socket"""
         if self._socket:
@@ -257,6 +647,22 @@ class AlertManager:
         self.config = config
         self.alerts_config = config.get('alerts', {})
         
+        # Soglie di severità per canale, risolte una sola volta
+        min_severity_email = self.alerts_config.get('email_min_severity', 'warning')
+        min_severity_syslog = self.alerts_config.get('syslog_min_severity', 'info')
+        self._email_threshold = _SEVERITY_NAME_TO_VALUE.get(min_severity_email.lower(), 4)
+        self._syslog_threshold = _SEVERITY_NAME_TO_VALUE.get(min_severity_syslog.lower(), 6)
+        
+        # Override per tipo di alert (es. "backup_success": {"email": false})
+        self._type_overrides: Dict[str, Dict[str, bool]] = {}
+        for alert_type in AlertType:
+            alert_specific = self.alerts_config.get(alert_type.value, {})
+            if isinstance(alert_specific, dict):
+                overrides = {channel: alert_specific[channel]
+                             for channel in ('email', 'syslog') if channel in alert_specific}
+                if overrides:
+                    self._type_overrides[alert_type.value] = overrides
+        
         # Inizializza i sender
         self.syslog_sender = SyslogSender(config)
         
@@ -267,6 +673,25 @@ class AlertManager:
         self._alert_buffer: List[Dict] = []
         self._buffer_enabled = self.alerts_config.get('buffer_enabled', False)
         self._buffer_max_size = self.alerts_config.get('buffer_max_size', 10)
+        self._buffer_flush_interval = float(self.alerts_config.get('buffer_flush_interval', 60))
+        self._buffer_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        if self._buffer_enabled:
+            atexit.register(self.flush)
+        
+        # Soppressione degli alert hardware ripetuti: chiave -> ultimo invio (monotonic).
+        # Disattivata di default (0); una chiave viene registrata solo dopo che
+        # almeno un canale ha accettato l'alert
+        self._dedup_ttl = float(self.alerts_config.get('dedup_ttl_sec', 0))
+        self._seen: Dict[tuple, float] = {}
+        self._seen_lock = threading.Lock()
+        
+        # Invio asincrono tramite thread dedicato (opzionale)
+        self._async_enabled = self.alerts_config.get('async_dispatch', False)
+        self._dispatch_queue: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._dispatch_thread: Optional[threading.Thread] = None
+        # Serializza l'uso dei socket/connessioni tra worker e chiamante
+        self._send_lock = threading.RLock()
     
     @property
     def email_sender(self):
@@ -287,34 +712,28 @@ class AlertManager:
         Returns:
             Dict con chiavi 'email' e 'syslog' e valori booleani
         """
-        result = {'email': False, 'syslog': False}
-        
-        # Configurazione globale
-        min_severity_email = self.alerts_config.get('email_min_severity', 'warning')
-        min_severity_syslog = self.alerts_config.get('syslog_min_severity', 'info')
-        
-        severity_map = {
-            'emergency': 0, 'alert': 1, 'critical': 2, 'error': 3,
-            'warning': 4, 'notice': 5, 'info': 6, 'debug': 7
+        result = {
+            'email': severity.value <= self._email_threshold,
+            'syslog': severity.value <= self._syslog_threshold,
         }
         
-        # Verifica se la severità è sufficiente per ogni canale
-        email_threshold = severity_map.get(min_severity_email.lower(), 4)
-        syslog_threshold = severity_map.get(min_severity_syslog.lower(), 6)
-        
-        result['email'] = severity.value <= email_threshold
-        result['syslog'] = severity.value <= syslog_threshold
-        
         # Configurazione per tipo di alert specifico
-        alert_specific = self.alerts_config.get(alert_type.value, {})
-        if isinstance(alert_specific, dict):
-            if 'email' in alert_specific:
-                result['email'] = alert_specific['email']
-            if 'syslog' in alert_specific:
-                result['syslog'] = alert_specific['syslog']
+        overrides = self._type_overrides.get(alert_type.value)
+        if overrides:
+            result.update(overrides)
         
         return result
     
+    def _active_channels(self, alert_type: AlertType, severity: AlertSeverity) -> Dict[str, bool]:
+        """
+        Come _should_send_alert, ma considera anche se il sender del canale
+        è effettivamente abilitato (syslog.enabled / smtp.enabled).
+        """
+        channels = self._should_send_alert(alert_type, severity)
+        channels['syslog'] = channels['syslog'] and self.syslog_sender.enabled
+        channels['email'] = channels['email'] and bool(self.email_sender) and self.email_sender.enabled
+        return channels
+    
     def send_alert(self, 
                    alert_type: AlertType,
                    severity: AlertSeverity,
@@ -338,116 +757,271 @@ class AlertManager:
         """
         results = {'email': False, 'syslog': False}
         
-        channels = self._should_send_alert(alert_type, severity)
+        # Alert filtrato o nessun canale attivo: nessun lavoro da fare
+        channels = self._active_channels(alert_type, severity)
+        if not (channels['email'] or channels['syslog']):
+            return results
         
-        # Prepara dati strutturati
-        structured_data = {
-            'alert_type': alert_type.value,
-            'severity': severity.name,
-            'timestamp': datetime.now().isoformat(),
-            'hostname': socket.gethostname(),
-        }
-        if details:
-            structured_data.update(details)
+        # Alert non urgenti: accoda e invia in blocco con flush()
+        if (self._buffer_enabled and not force_immediate
+                and severity.value >= AlertSeverity.WARNING.value):
+            self._buffer_alert(alert_type, severity, title, message, details)
+            results['buffered'] = True
+            return results
         
-        # Syslog
-        if channels['syslog'] and self.syslog_sender.enabled:
-            syslog_message = f"{title}: {message}"
-            results['syslog'] = self.syslog_sender.send(
-                severity, syslog_message, alert_type, structured_data
+        # Invio delegato al worker: il chiamante non attende la rete
+        if self._async_enabled and not force_immediate:
+            self._enqueue_alert(alert_type, severity, title, message, details)
+            results['queued'] = True
+            return results
+        
+        with self._send_lock:
+            # Syslog
+            if channels['syslog']:
+                syslog_message = f"{title}: {message}"
+                results['syslog'] = self.syslog_sender.send(
+                    severity, syslog_message, alert_type,
+                    self._build_structured_data(alert_type, severity, details)
+                )
+                if results['syslog']:
+                    logger.info("  → Alert inviato via Syslog: %s", title)
+            
+            # Email
+            if channels['email']:
+                results['email'] = self._send_alert_email(alert_type, severity, title, message, details)
+        
+        return results
+    
+    @staticmethod
+    def _make_alert_record(alert_type: AlertType, severity: AlertSeverity,
+                           title: str, message: str, details: Optional[Dict] = None,
+                           dedup_key: Optional[tuple] = None) -> Dict:
+        """
+        Rappresentazione di un alert in attesa di invio (buffer, coda, batch).
+        dedup_key, se presente, viene registrata quando un canale accetta l'alert.
+        Il timestamp è quello in cui l'alert è stato generato, non quello dell'invio.
+        """
+        return {
+            'alert_type': alert_type,
+            'severity': severity,
+            'title': title,
+            'message': message,
+            'details': details,
+            'dedup_key': dedup_key,
+            'timestamp': datetime.now(),
+        }
+    
+    def _enqueue_alert(self, alert_type: AlertType, severity: AlertSeverity,
+                       title: str, message: str, details: Optional[Dict] = None,
+                       dedup_key: Optional[tuple] = None) -> None:
+        """Accoda un alert per l'invio in background, avviando il worker se necessario"""
+        if self._dispatch_thread is None or not self._dispatch_thread.is_alive():
+            self._dispatch_thread = threading.Thread(
+                target=self._dispatch_worker, name="proxreporter-alerts", daemon=True
             )
-            if results['syslog']:
-                logger.info(f"  → Alert inviato via Syslog: {title}")
+            self._dispatch_thread.start()
         
-        # Email
-        if channels['email'] and self.email_sender:
-            # Costruisci HTML per email
-            html_content = self._build_alert_email_html(
-                alert_type, severity, title, message, details
+        self._dispatch_queue.put_nowait(
+            self._make_alert_record(alert_type, severity, title, message, details, dedup_key)
+        )
+    
+    def _dispatch_worker(self) -> None:
+        """Preleva gli alert dalla coda a blocchi e li invia"""
+        while True:
+            item = self._dispatch_queue.get()
+            stop = item is None
+            batch = [] if stop else [item]
+            
+            while not stop and len(batch) < DISPATCH_BATCH_SIZE:
+                try:
+                    item = self._dispatch_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            
+            if batch:
+                try:
+                    self._dispatch_batch(batch)
+                except Exception as e:
+                    logger.error(f"✗ Errore invio alert in background: {e}")
+            
+            if stop:
+                return
+    
+    def _buffer_alert(self, alert_type: AlertType, severity: AlertSeverity,
+                      title: str, message: str, details: Optional[Dict] = None) -> None:
+        """Aggiunge un alert al buffer e avvia il flush se necessario"""
+        with self._buffer_lock:
+            self._alert_buffer.append(
+                self._make_alert_record(alert_type, severity, title, message, details)
             )
-            subject = f"[Proxreporter {severity.name}] {title}"
+            buffer_full = len(self._alert_buffer) >= self._buffer_max_size
+            if not buffer_full and self._flush_timer is None and self._buffer_flush_interval > 0:
+                self._flush_timer = threading.Timer(self._buffer_flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        
+        if buffer_full:
+            self.flush()
+    
+    def flush(self) -> Dict[str, int]:
+        """
+        Invia tutti gli alert presenti nel buffer.
+        
+        I messaggi Syslog vengono inviati con un'unica chiamata send_many(),
+        le email vengono raggruppate in un solo messaggio riepilogativo.
+        
+        Returns:
+            Dict con conteggio alert inviati per canale
+        """
+        with self._buffer_lock:
+            buffered, self._alert_buffer = self._alert_buffer, []
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        
+        return self._dispatch_batch(buffered)
+    
+    def _dispatch_batch(self, alerts: List[Dict], digest_label: str = "alerts") -> Dict[str, int]:
+        """
+        Invia un gruppo di alert: Syslog con una sola send_many(),
+        email raggruppate in un unico messaggio riepilogativo.
+        
+        Args:
+            alerts: record creati da _make_alert_record()
+            digest_label: descrizione usata nell'oggetto dell'email riepilogativa
+        """
+        results = {'syslog': 0, 'email': 0, 'total': len(alerts)}
+        if not alerts:
+            return results
+        
+        with self._send_lock:
+            syslog_records = []
+            syslog_keys = []
+            email_alerts = []
+            for alert in alerts:
+                channels = self._active_channels(alert['alert_type'], alert['severity'])
+                if channels['syslog']:
+                    syslog_records.append((
+                        alert['severity'], f"{alert['title']}: {alert['message']}", alert['alert_type'],
+                        self._build_structured_data(alert['alert_type'], alert['severity'],
+                                                    alert['details'], alert['timestamp'])
+                    ))
+                    syslog_keys.append(alert.get('dedup_key'))
+                if channels['email']:
+                    email_alerts.append(alert)
+            
+            if syslog_records:
+                results['syslog'] = self.syslog_sender.send_many(syslog_records)
+                if results['syslog']:
+                    logger.info("  → %d alert inviati via Syslog", results['syslog'])
+            
+            if email_alerts:
+                if len(email_alerts) == 1:
+                    alert = email_alerts[0]
+                    sent = self._send_alert_email(alert['alert_type'], alert['severity'],
+                                                  alert['title'], alert['message'], alert['details'],
+                                                  alert['timestamp'])
+                else:
+                    html_content = self._build_alert_digest_html(email_alerts)
+                    subject = f"[Proxreporter] {len(email_alerts)} {digest_label}"
+                    sent = self.email_sender.send_report(html_content, subject)
+                    if sent:
+                        logger.info("  → Riepilogo di %d alert inviato via Email", len(email_alerts))
+                if sent:
+                    results['email'] = len(email_alerts)
+                    self._mark_delivered(alert.get('dedup_key') for alert in email_alerts)
             
-            results['email'] = self.email_sender.send_report(html_content, subject)
-            if results['email']:
-                logger.info(f"  → Alert inviato via Email: {title}")
+            if results['syslog']:
+                self._mark_delivered(syslog_keys)
         
         return results
     
+    def _build_structured_data(self, alert_type: AlertType, severity: AlertSeverity,
+                               details: Optional[Dict] = None,
+                               timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+        """Prepara i dati strutturati da allegare al messaggio Syslog (timestamp: generazione dell'alert)"""
+        structured_data = {
+            'alert_type': alert_type.value,
+            'severity': severity.name,
+            'timestamp': (timestamp or datetime.now()).isoformat(),
+            'hostname': _HOSTNAME,
+        }
+        if details:
+            structured_data.update(details)
+        return structured_data
+    
+    def _send_alert_email(self, alert_type: AlertType, severity: AlertSeverity,
+                          title: str, message: str, details: Optional[Dict] = None,
+                          timestamp: Optional[datetime] = None) -> bool:
+        """Costruisce e invia l'email per un singolo alert"""
+        html_content = self._build_alert_email_html(
+            alert_type, severity, title, message, details, timestamp
+        )
+        subject = f"[Proxreporter {severity.name}] {title}"
+        
+        sent = self.email_sender.send_report(html_content, subject)
+        if sent:
+            logger.info("  → Alert inviato via Email: %s", title)
+        return sent
+    
     def _build_alert_email_html(self, alert_type: AlertType, severity: AlertSeverity,
                                  title: str, message: str, 
-                                 details: Optional[Dict] = None) -> str:
+                                 details: Optional[Dict] = None,
+                                 timestamp: Optional[datetime] = None) -> str:
         """Costruisce il contenuto HTML per l'email di alert"""
         
-        severity_colors = {
-            AlertSeverity.EMERGENCY: '#8B0000',
-            AlertSeverity.ALERT: '#FF0000',
-            AlertSeverity.CRITICAL: '#DC143C',
-            AlertSeverity.ERROR: '#FF4500',
-            AlertSeverity.WARNING: '#FFA500',
-            AlertSeverity.NOTICE: '#1E90FF',
-            AlertSeverity.INFO: '#32CD32',
-            AlertSeverity.DEBUG: '#808080',
-        }
-        
-        color = severity_colors.get(severity, '#333333')
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        hostname = socket.gethostname()
+        color = _SEVERITY_COLORS.get(severity, '#333333')
+        timestamp = (timestamp or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+        hostname = _HOSTNAME
         
         details_html = ""
         if details:
             details_rows = "".join([
-                f"<tr><td style='padding: 8px; border-bottom: 1px solid #ddd;'><strong>{k}</strong></td>"
-                f"<td style='padding: 8px; border-bottom: 1px solid #ddd;'>{v}</td></tr>"
-                for k, v in details.items()
+                _DETAIL_ROW_TMPL.substitute(k=k, v=v) for k, v in details.items()
             ])
-            details_html = f"""
-            <h3 style="color: #333; margin-top: 20px;">Dettagli</h3>
-            <table style="width: 100%; border-collapse: collapse;">
-                {details_rows}
-            </table>
-            """
+            details_html = _DETAILS_SECTION_TMPL.substitute(details_rows=details_rows)
         
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: 'Segoe UI', Tahoma, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
-                .container {{ max-width: 600px; margin: 0 auto; background: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                .header {{ background: {color}; color: white; padding: 20px; }}
-                .header h1 {{ margin: 0; font-size: 1.5em; }}
-                .header .badge {{ display: inline-block; background: rgba(255,255,255,0.2); padding: 4px 12px; border-radius: 20px; font-size: 0.8em; margin-top: 10px; }}
-                .content {{ padding: 20px; }}
-                .message {{ background: #f9f9f9; padding: 15px; border-radius: 5px; margin-bottom: 20px; border-left: 4px solid {color}; }}
-                .footer {{ background: #f0f0f0; padding: 15px; font-size: 0.85em; color: #666; text-align: center; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>{title}</h1>
-                    <span class="badge">{severity.name}</span>
-                    <span class="badge">{alert_type.value}</span>
-                </div>
-                <div class="content">
-                    <div class="message">
-                        <p style="margin: 0;">{message}</p>
-                    </div>
-                    <p><strong>Host:</strong> {hostname}</p>
-                    <p><strong>Timestamp:</strong> {timestamp}</p>
-                    {details_html}
-                </div>
-                <div class="footer">
-                    <p>Proxreporter Alert System</p>
-                    <p>&copy; Domarc SRL</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return _ALERT_HTML_TMPL.substitute(
+            color=color,
+            title=title,
+            severity=severity.name,
+            alert_type=alert_type.value,
+            message=message,
+            hostname=hostname,
+            timestamp=timestamp,
+            details_html=details_html,
+        )
+    
+    def _build_alert_digest_html(self, alerts: List[Dict]) -> str:
+        """Costruisce un'unica email HTML che riepiloga più alert"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        hostname = _HOSTNAME
+        
+        sections = []
+        for alert in alerts:
+            details_rows = "".join([
+                _DETAIL_ROW_TMPL.substitute(k=k, v=v) for k, v in (alert['details'] or {}).items()
+            ])
+            sections.append(_DIGEST_ENTRY_TMPL.substitute(
+                color=_SEVERITY_COLORS.get(alert['severity'], '#333333'),
+                title=alert['title'],
+                severity=alert['severity'].name,
+                alert_type=alert['alert_type'].value,
+                message=alert['message'],
+                timestamp=alert['timestamp'].strftime('%Y-%m-%d %H:%M:%S'),
+                details_rows=details_rows,
+            ))
         
-        return html
+        return _DIGEST_HTML_TMPL.substitute(
+            count=len(alerts),
+            hostname=hostname,
+            timestamp=timestamp,
+            sections="".join(sections),
+        )
     
     # Metodi di convenienza per tipi comuni di alert
     
@@ -551,22 +1125,17 @@ class AlertManager:
     # HARDWARE ALERTS
     # =========================================================================
     
-    def alert_hardware_issue(self, component: str, device: str, status: str,
-                              message: str, details: Dict[str, Any] = None,
-                              hostname: str = "") -> Dict[str, bool]:
+    def _prepare_hardware_alert(self, component: str, device: str, status: str,
+                                message: str, details: Dict[str, Any] = None,
+                                hostname: str = "") -> Tuple[AlertType, AlertSeverity, str, str, Dict[str, Any]]:
         """
-        Alert generico per problemi hardware.
+        Calcola tipo, severità, titolo e dettagli di un alert hardware.
         
-        Args:
-            component: disk, memory, raid, temperature, kernel
-            device: nome dispositivo (es. /dev/sda, cpu0, md0)
-            status: critical o warning
-            message: descrizione del problema
-            details: dettagli aggiuntivi
-            hostname: nome host
+        Returns:
+            Tupla (alert_type, severity, title, message, details)
         """
         if not hostname:
-            hostname = socket.gethostname()
+            hostname = _HOSTNAME
         
         # Determina tipo alert e severità
         if status == "critical":
@@ -595,18 +1164,34 @@ class AlertManager:
         if details:
             alert_details.update(details)
         
+        return alert_type, severity, f"Hardware {component.upper()}: {device}", message, alert_details
+    
+    def alert_hardware_issue(self, component: str, device: str, status: str,
+                              message: str, details: Dict[str, Any] = None,
+                              hostname: str = "") -> Dict[str, bool]:
+        """
+        Alert generico per problemi hardware.
+        
+        Args:
+            component: disk, memory, raid, temperature, kernel
+            device: nome dispositivo (es. /dev/sda, cpu0, md0)
+            status: critical o warning
+            message: descrizione del problema
+            details: dettagli aggiuntivi
+            hostname: nome host
+        """
         return self.send_alert(
-            alert_type,
-            severity,
-            f"Hardware {component.upper()}: {device}",
-            message,
-            alert_details
+            *self._prepare_hardware_alert(component, device, status, message, details, hostname)
         )
     
     def send_hardware_alerts(self, hardware_alerts: list, hostname: str = "") -> Dict[str, int]:
         """
         Invia tutti gli alert hardware rilevati.
         
+        I messaggi Syslog vengono raccolti e inviati in un'unica operazione
+        tramite SyslogSender.send_many(); le email vengono raggruppate in un
+        solo messaggio riepilogativo.
+        
         Args:
             hardware_alerts: Lista di HardwareAlert dal HardwareMonitor
             hostname: nome host
@@ -614,27 +1199,61 @@ class AlertManager:
         Returns:
             Dict con conteggio alert inviati per canale
         """
-        results = {'syslog': 0, 'email': 0, 'total': 0}
-        
-        for alert in hardware_alerts:
+        alerts = []
+        for alert, dedup_key in self._deduplicate_hardware_alerts(hardware_alerts):
             status = "critical" if alert.status.value == "critical" else "warning"
-            
-            result = self.alert_hardware_issue(
+            alerts.append(self._make_alert_record(*self._prepare_hardware_alert(
                 component=alert.component,
                 device=alert.device,
                 status=status,
                 message=alert.message,
                 details=alert.details,
                 hostname=hostname
-            )
-            
-            if result.get('syslog'):
-                results['syslog'] += 1
-            if result.get('email'):
-                results['email'] += 1
-            results['total'] += 1
+            ), dedup_key=dedup_key))
         
-        return results
+        if self._async_enabled:
+            for record in alerts:
+                self._enqueue_alert(**record)
+            return {'syslog': 0, 'email': 0, 'total': len(alerts), 'queued': len(alerts)}
+        
+        return self._dispatch_batch(alerts, digest_label="hardware alerts")
+    
+    def _deduplicate_hardware_alerts(self, hardware_alerts: list) -> List[Tuple[Any, Optional[tuple]]]:
+        """
+        Scarta gli alert hardware identici (componente, device, stato, messaggio)
+        già consegnati negli ultimi dedup_ttl_sec secondi.
+        
+        Returns:
+            Coppie (alert, chiave di deduplica); la chiave è None se la
+            deduplica è disattivata
+        """
+        if self._dedup_ttl <= 0:
+            return [(alert, None) for alert in hardware_alerts]
+        
+        now = time.monotonic()
+        with self._seen_lock:
+            # Rimuovi le voci scadute
+            self._seen = {key: ts for key, ts in self._seen.items() if now - ts < self._dedup_ttl}
+            seen = set(self._seen)
+        
+        fresh = []
+        for alert in hardware_alerts:
+            key = (alert.component, alert.device, alert.status.value, alert.message)
+            if key not in seen:
+                fresh.append((alert, key))
+        
+        skipped = len(hardware_alerts) - len(fresh)
+        if skipped:
+            logger.info("  → %d alert hardware ripetuti soppressi", skipped)
+        return fresh
+    
+    def _mark_delivered(self, dedup_keys) -> None:
+        """Registra le chiavi di deduplica degli alert accettati da un canale"""
+        now = time.monotonic()
+        with self._seen_lock:
+            for key in dedup_keys:
+                if key is not None:
+                    self._seen[key] = now
     
     def send_heartbeat(self, hostname: str = "", extra_info: Dict[str, Any] = None) -> bool:
         """
@@ -648,11 +1267,10 @@ class AlertManager:
         Returns:
             True se inviato con successo
         """
-        import socket
         import platform
         
         if not hostname:
-            hostname = socket.gethostname()
+            hostname = _HOSTNAME
         
         # Raccogli info di base sul sistema
         heartbeat_data = {
@@ -672,7 +1290,7 @@ class AlertManager:
         result = self.syslog_sender.send(
             AlertSeverity.INFO,
             f"HEARTBEAT: {hostname} online - Proxreporter v{__version__}",
-            heartbeat_data
+            extra_data=heartbeat_data
         )
         
         if result:
@@ -681,5 +1299,15 @@ class AlertManager:
         return result
     
     def close(self):
-        """Chiude tutte le connessioni"""
+        """Invia gli alert in buffer/coda e chiude tutte le connessioni"""
+        # Il flush all'uscita non serve più e non deve trattenere l'istanza
+        if self._buffer_enabled:
+            atexit.unregister(self.flush)
+        self.flush()
+        if self._dispatch_thread is not None:
+            self._dispatch_queue.put(None)
+            self._dispatch_thread.join()
+            self._dispatch_thread = None
         self.syslog_sender.close()
+        if self._email_sender:
+            self._email_sender.close()
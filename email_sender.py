@@ -23,6 +23,8 @@ class EmailSender:
         self.smtp_config = config.get('smtp', {})
         self.client_config = config.get('client', {})
         self.enabled = self.smtp_config.get('enabled', False)
+        # Connessione SMTP autenticata riutilizzata tra invii successivi
+        self._smtp = None
     
     def _resolve_sender(self, sender_template: str) -> str:
         """
@@ -107,36 +109,90 @@ class EmailSender:
                         logger.warning(f"Impossibile allegare {fpath}: {e}")
         
         try:
-            context = ssl.create_default_context()
-            
-            # SSL implicito (porta 465 o use_ssl=True)
-            if use_ssl or port == 465:
-                logger.info("  Connessione con SSL implicito...")
-                with smtplib.SMTP_SSL(host, port, context=context) as server:
-                    server.login(user, password)
-                    server.send_message(msg)
-            # STARTTLS (porta 587 o use_tls=True)
-            elif use_tls or port == 587:
-                logger.info("  Connessione con STARTTLS...")
-                with smtplib.SMTP(host, port) as server:
-                    server.starttls(context=context)
-                    server.login(user, password)
-                    server.send_message(msg)
-            # Nessuna crittografia (porta 25, SSL/TLS disabilitati)
-            else:
-                logger.info("  Connessione senza crittografia...")
-                with smtplib.SMTP(host, port) as server:
-                    server.login(user, password)
-                    server.send_message(msg)
+            cached = self._smtp
+            server = self._get_smtp(host, port, user, password, use_ssl, use_tls)
+            try:
+                server.send_message(msg)
+            except OSError as e:
+                # Si riprova solo se una connessione riutilizzata è caduta nel frattempo:
+                # gli altri errori SMTP (autenticazione, destinatari, DATA) e quelli
+                # di una connessione appena aperta vanno ai gestori sotto
+                reused = server is cached
+                dropped = isinstance(e, smtplib.SMTPServerDisconnected) or not isinstance(e, smtplib.SMTPException)
+                if not (reused and dropped):
+                    raise
+                self._drop_smtp()
+                server = self._get_smtp(host, port, user, password, use_ssl, use_tls)
+                server.send_message(msg)
                     
             logger.info(f"✓ Email inviata correttamente a {', '.join(recipients)}")
             return True
         except smtplib.SMTPAuthenticationError as e:
             logger.error(f"✗ Errore autenticazione SMTP: {e}")
+            self._drop_smtp()
             return False
         except smtplib.SMTPException as e:
             logger.error(f"✗ Errore SMTP: {e}")
+            self._drop_smtp()
             return False
         except Exception as e:
             logger.error(f"✗ Errore invio email: {e}")
+            self._drop_smtp()
             return False
+    
+    def _get_smtp(self, host, port, user, password, use_ssl, use_tls):
+        """
+        Restituisce la connessione SMTP autenticata, creandola se necessario.
+        
+        Una connessione già aperta viene verificata con NOOP prima del riuso.
+        """
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop_smtp()
+        
+        context = ssl.create_default_context()
+        
+        # SSL implicito (porta 465 o use_ssl=True)
+        if use_ssl or port == 465:
+            logger.info("  Connessione con SSL implicito...")
+            server = smtplib.SMTP_SSL(host, port, context=context)
+        # STARTTLS (porta 587 o use_tls=True)
+        elif use_tls or port == 587:
+            logger.info("  Connessione con STARTTLS...")
+            server = smtplib.SMTP(host, port)
+            server.starttls(context=context)
+        # Nessuna crittografia (porta 25, SSL/TLS disabilitati)
+        else:
+            logger.info("  Connessione senza crittografia...")
+            server = smtplib.SMTP(host, port)
+        
+        try:
+            server.login(user, password)
+        except Exception:
+            server.close()
+            raise
+        
+        self._smtp = server
+        return server
+    
+    def _drop_smtp(self):
+        """Scarta la connessione SMTP in cache senza attendere il server"""
+        if self._smtp is not None:
+            try:
+                self._smtp.close()
+            except Exception:
+                pass
+            self._smtp = None
+    
+    def close(self):
+        """Chiude la connessione SMTP in cache"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._drop_smtp()
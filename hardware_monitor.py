@@ -14,18 +14,158 @@ Proprietario: Domarc SRL
 Copyright (c) 2024-2026 Domarc SRL - Tutti i diritti riservati.
 """
 
+import asyncio
+import glob
+import json
 import logging
+import os
 import re
+import shlex
+import shutil
 import subprocess
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Iterator, Sequence, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger("proxreporter")
 
 
+def _json_loads(data: str) -> Any:
+    """Decodifica JSON usando orjson se disponibile (solleva ValueError)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Un comando è una stringa shell, una lista argv o una pipeline di liste argv
+Command = Union[str, Sequence[str], Sequence[Sequence[str]]]
+
+# Regex precompilate usate nei cicli di parsing
+_EDAC_CE_RE = re.compile(r'(\d+)\s+Corrected', re.IGNORECASE)
+_EDAC_UE_RE = re.compile(r'(\d+)\s+Uncorrected', re.IGNORECASE)
+_MDSTAT_MD_RE = re.compile(r'^(md\d+)\s*:\s*(\w+)\s+(\w+)')
+_MDSTAT_STATE_RE = re.compile(r'\[([U_]+)\]')
+_PROGRESS_RE = re.compile(r'(\d+\.?\d*)%')
+_ZPOOL_POOL_RE = re.compile(r'^\s*pool:\s*(\S+)')
+_ZPOOL_STATE_RE = re.compile(r'^\s*state:\s*(\S+)')
+_ZPOOL_VDEV_RE = re.compile(r'^\s+(\S+)\s+(DEGRADED|FAULTED|UNAVAIL)')
+_ZPOOL_REPAIRED_RE = re.compile(r'(\d+)\s+repaired')
+_SENSOR_TEMP_RE = re.compile(r'(\S+):\s*\+?(-?\d+\.?\d*)\s*°?C')
+_SENSOR_VALUE_RE = re.compile(r'([+-]?\d+\.?\d*)\s*[°]?\s*C', re.IGNORECASE)
+
+# Sensori da trattare con le soglie CPU
+_CPU_SENSOR_RE = re.compile(r'core|cpu|tctl|package|tdie', re.IGNORECASE)
+
+# Errori hardware comuni nel kernel log, un pattern per tipo: una riga può
+# appartenere a più tipi (es. "XFS ...: metadata I/O error" è sia filesystem
+# che io_error), quindi ogni pattern va cercato indipendentemente
+_KERNEL_ERROR_PATTERNS = {
+    "mce": re.compile(r'mce:|Machine check', re.IGNORECASE),
+    "io_error": re.compile(r'I/O error|Buffer I/O error|blk_update_request', re.IGNORECASE),
+    "ata_error": re.compile(r'ata\d+.*error|SATA.*error', re.IGNORECASE),
+    "nvme_error": re.compile(r'nvme.*(error|failed)', re.IGNORECASE),
+    "memory_error": re.compile(r'EDAC|ECC|memory error|page allocation failure', re.IGNORECASE),
+    "pcie_error": re.compile(r'PCIe.*error|AER.*error', re.IGNORECASE),
+    "hardware_error": re.compile(r'Hardware Error', re.IGNORECASE),
+    "thermal": re.compile(r'thermal|CPU.*throttl|temperature above', re.IGNORECASE),
+    "filesystem": re.compile(r'EXT4-fs error|XFS.*error|BTRFS.*error|filesystem error', re.IGNORECASE),
+}
+
+# Alternanza di tutti i pattern: solo per scartare rapidamente le righe
+# che non contengono alcun errore noto (non per classificarle)
+_KERNEL_ERROR_RE = re.compile(
+    "|".join(f"(?:{pattern.pattern})" for pattern in _KERNEL_ERROR_PATTERNS.values()),
+    re.IGNORECASE
+)
+
+# Stessi pattern in sintassi ERE per il pre-filtro con grep -iE lato shell
+_KERNEL_ERROR_GREP = (
+    "mce:|Machine check|I/O error|blk_update_request|ata[0-9]+.*error|SATA.*error"
+    "|nvme.*(error|failed)|EDAC|ECC|memory error|page allocation failure"
+    "|PCIe.*error|AER.*error|Hardware Error|thermal|CPU.*throttl|temperature above"
+    "|EXT4-fs error|XFS.*error|BTRFS.*error|filesystem error"
+)
+
+# Campi di /proc/meminfo usati da _get_memory_info -> chiave nel risultato
+_MEMINFO_FIELDS = {
+    "MemTotal": "total_kb",
+    "MemAvailable": "available_kb",
+    "SwapTotal": "swap_total_kb",
+    "SwapFree": "swap_free_kb",
+}
+
+# Campi di smartctl -i: sottostringa dell'etichetta -> chiave nel risultato
+# ("Model" copre sia "Device Model" ATA che "Model Number" NVMe)
+_SMART_INFO_KEYS = (
+    ("Model", "model"),
+    ("Serial", "serial"),
+    ("Capacity", "capacity"),
+)
+
+_KERNEL_ERROR_DESCRIPTIONS = {
+    "mce": "MCE (Machine Check Exception)",
+    "io_error": "I/O Error",
+    "ata_error": "SATA/ATA Error",
+    "nvme_error": "NVMe Error",
+    "memory_error": "Memory Error",
+    "pcie_error": "PCIe Error",
+    "hardware_error": "Hardware Error",
+    "thermal": "Thermal Event",
+    "filesystem": "Filesystem Error",
+}
+
+
+def _parse_celsius(text: str) -> Optional[float]:
+    """
+    Estrae la prima temperatura da un valore di sensors (es. "+45.0°C  (high = ...)").
+    
+    Caso comune gestito con semplici operazioni su stringa: si cerca "°C" e si
+    risale sulle cifre che lo precedono; le altre forme ("45 C", "degC")
+    passano dalla regex.
+    """
+    idx = text.find('°C')
+    if idx > 0:
+        end = idx
+        while end > 0 and text[end - 1] == ' ':
+            end -= 1
+        start = end
+        while start > 0 and (text[start - 1].isdigit() or text[start - 1] == '.'):
+            start -= 1
+        number = text[start:end].lstrip('.')
+        if number and number[0].isdigit():
+            if start > 0 and text[start - 1] in '+-':
+                number = text[start - 1] + number
+            try:
+                return float(number)
+            except ValueError:
+                pass
+    
+    match = _SENSOR_VALUE_RE.search(text)
+    return float(match.group(1)) if match else None
+
+
+def _read_sysfs_attr(path: str) -> str:
+    """Legge un attributo sysfs (al massimo una pagina) con una sola read()"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, 4096).decode('utf-8', 'replace')
+    finally:
+        os.close(fd)
+
+
 class HardwareStatus(Enum):
     """Stati possibili per i componenti hardware"""
     OK = "ok"
@@ -34,7 +174,11 @@ class HardwareStatus(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+# slots=True (niente __dict__ per istanza) è disponibile da Python 3.10
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class HardwareAlert:
     """Rappresenta un alert hardware"""
     component: str          # disk, memory, raid, temperature, kernel
@@ -63,6 +207,31 @@ class HardwareMonitor:
         "ecc_uncorrected_critical": 1,
     }
     
+    # Numero massimo di smartctl eseguiti in parallelo
+    MAX_PARALLEL_DISKS = 16
+    
+    # Righe del kernel log (già filtrate) analizzate al massimo
+    KERNEL_LOG_MAX_LINES = 200
+    
+    # Oltre questo numero di occorrenze un tipo di errore kernel non viene più
+    # contato; quando tutti i tipi lo raggiungono la scansione si interrompe
+    KERNEL_ERROR_COUNT_CAP = 100
+    
+    # Thread usati da get_full_status per le raccolte indipendenti
+    MAX_STATUS_WORKERS = 8
+    
+    # Strumenti esterni opzionali (spesso assenti sugli host)
+    OPTIONAL_TOOLS = ("smartctl", "sensors", "zpool", "edac-util", "mdadm", "lsblk", "dmesg")
+    
+    # Identità dei dischi locali (modello/seriale/capacità), salvata su file tra
+    # un heartbeat e l'altro. La chiave è un identificativo stabile del disco
+    # (WWID da sysfs o nome in /dev/disk/by-id), non il nome kernel che può
+    # cambiare dopo un riavvio o un hot-swap; i dischi senza identificativo
+    # non vengono memorizzati
+    DISK_STATIC_CACHE_FILE = "/var/lib/proxreporter/disks.json"
+    DISK_STATIC_CACHE_TTL = 24 * 3600
+    DISK_BY_ID_DIR = "/dev/disk/by-id"
+    
     def __init__(self, config: Dict[str, Any] = None, executor: Callable = None):
         """
         Inizializza il monitor hardware.
@@ -74,27 +243,245 @@ class HardwareMonitor:
         self.config = config or {}
         self.thresholds = {**self.DEFAULT_THRESHOLDS, **self.config.get("hardware_thresholds", {})}
         self.executor = executor or self._local_executor
+        # Con l'executor locale /sys e /proc si leggono direttamente, senza shell
+        self._is_local = executor is None
+        # Presenza degli strumenti verificata una sola volta; sugli host
+        # remoti non è verificabile e si assume che ci siano
+        self._have: Dict[str, bool] = (
+            {name: shutil.which(name) is not None for name in self.OPTIONAL_TOOLS}
+            if self._is_local else {}
+        )
         self.alerts: List[HardwareAlert] = []
+        self._alerts_lock = threading.Lock()
+        # Lista alert del controllo in esecuzione nel thread corrente (vedi _collect_alerts)
+        self._alert_sink = threading.local()
+        # Timestamp condiviso dagli alert di uno stesso passaggio
+        self._scan_time: Optional[datetime] = None
+        # Cache valide per un singolo passaggio di monitoraggio
+        self._disk_cache: Optional[List[str]] = None
+        self._smart_output_cache: Dict[str, Optional[str]] = {}
+        self._smart_attrs_cache: Dict[str, Dict[str, int]] = {}
+        self._summary_cache: Optional[tuple] = None  # (numero alert, riepilogo)
+        # File della cache identità dischi (vuoto = solo in memoria)
+        self._disk_static_file = self.config.get("hardware_monitoring", {}).get(
+            "disk_cache_file", self.DISK_STATIC_CACHE_FILE
+        )
+        self._disk_static_cache: Optional[Dict[str, Dict[str, Any]]] = None  # caricata al primo uso
+        self._disk_static_lock = threading.Lock()
+        self._disk_static_dirty = False
+        # Dispositivo -> (identificativo stabile, seriale da sysfs), per il passaggio corrente
+        self._disk_identity_cache: Dict[str, Optional[tuple]] = {}
     
-    def _local_executor(self, cmd: str, silent: bool = True) -> tuple:
-        """Esegue un comando localmente"""
+    def _local_executor(self, cmd: Union[str, Sequence[str]], silent: bool = True) -> tuple:
+        """Esegue un comando localmente (le liste argv girano senza shell)"""
         try:
+            # In modalità silenziosa stderr non serve: va direttamente su /dev/null
             result = subprocess.run(
-                cmd, shell=True, capture_output=True, text=True, timeout=30
+                cmd, shell=isinstance(cmd, str), stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL if silent else subprocess.PIPE,
+                text=True, timeout=30
             )
-            return result.returncode, result.stdout, result.stderr
+            return result.returncode, result.stdout, result.stderr or ""
         except subprocess.TimeoutExpired:
             return -1, "", "Command timeout"
         except Exception as e:
             return -1, "", str(e)
     
-    def _run_command(self, cmd: str, silent: bool = True) -> Optional[str]:
+    def invalidate_caches(self) -> None:
+        """Svuota i dati memorizzati durante l'ultimo passaggio di controllo"""
+        self._disk_cache = None
+        self._smart_output_cache.clear()
+        self._smart_attrs_cache.clear()
+        self._disk_identity_cache.clear()
+        self._summary_cache = None
+    
+    def _add_alert(self, component: str, device: str, status: HardwareStatus,
+                   message: str, details: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Crea e aggiunge un alert. Dentro _collect_alerts finisce nella lista
+        del controllo corrente, altrimenti direttamente in self.alerts.
+        """
+        alert = HardwareAlert(
+            component=component,
+            device=device,
+            status=status,
+            message=message,
+            details=details if details is not None else {},
+            timestamp=self._scan_time or datetime.now()
+        )
+        self._emit_alerts([alert])
+    
+    def _emit_alerts(self, alerts: List[HardwareAlert]) -> None:
+        """Aggiunge gli alert alla lista del controllo corrente o a self.alerts"""
+        sink = getattr(self._alert_sink, "alerts", None)
+        if sink is not None:
+            sink.extend(alerts)
+            return
+        with self._alerts_lock:
+            self.alerts.extend(alerts)
+    
+    def _collect_alerts(self, check: Callable[..., None], *args) -> List[HardwareAlert]:
+        """
+        Esegue un controllo e ritorna gli alert che ha generato, invece di
+        aggiungerli a self.alerts: i controlli eseguiti in parallelo si
+        possono così ricomporre in un ordine fisso.
+        """
+        previous = getattr(self._alert_sink, "alerts", None)
+        self._alert_sink.alerts = collected = []
+        try:
+            check(*args)
+        finally:
+            self._alert_sink.alerts = previous
+        return collected
+    
+    @staticmethod
+    def _is_pipeline(cmd: Command) -> bool:
+        """True se il comando è una pipeline (lista di liste argv)"""
+        return not isinstance(cmd, str) and bool(cmd) and not isinstance(cmd[0], str)
+    
+    @classmethod
+    def _to_shell(cls, cmd: Command) -> str:
+        """Converte un comando argv (o una pipeline) in stringa per la shell"""
+        if isinstance(cmd, str):
+            return cmd
+        if cls._is_pipeline(cmd):
+            return " | ".join(cls._to_shell(stage) for stage in cmd)
+        return " ".join(shlex.quote(arg) for arg in cmd) + " 2>/dev/null"
+    
+    def _has_tool(self, name: str) -> bool:
+        """Verifica (con cache) se uno strumento esterno è installato"""
+        return self._have.get(name, True)
+    
+    def _tool_missing(self, cmd: Command) -> bool:
+        """True se il comando argv usa uno strumento che sappiamo non installato"""
+        if isinstance(cmd, str) or not cmd:
+            return False
+        first = cmd[0] if not self._is_pipeline(cmd) else cmd[0][0]
+        return not self._has_tool(first)
+    
+    def _run_command(self, cmd: Command, silent: bool = True) -> Optional[str]:
         """Esegue un comando e ritorna l'output"""
+        if self._tool_missing(cmd):
+            return None  # Evita fork+exec di un comando che fallirebbe comunque
+        if not self._is_local or self._is_pipeline(cmd):
+            # Gli executor remoti (SSH) accettano solo stringhe shell
+            cmd = self._to_shell(cmd)
         exit_code, stdout, stderr = self.executor(cmd, silent)
         if exit_code == 0:
             return stdout
         return None
     
+    def _run_command_lines(self, cmd: Command) -> Iterator[str]:
+        """
+        Esegue un comando e ne restituisce l'output riga per riga.
+        
+        In locale le righe vengono lette dalla pipe man mano che arrivano,
+        senza materializzare tutto lo stdout; con executor remoti si
+        ripiega sull'output completo di _run_command.
+        """
+        if not self._is_local:
+            output = self._run_command(cmd)
+            if output:
+                yield from output.splitlines()
+            return
+        
+        if self._tool_missing(cmd):
+            return
+        
+        if isinstance(cmd, str):
+            stages = [cmd]
+        elif self._is_pipeline(cmd):
+            stages = list(cmd)
+        else:
+            stages = [cmd]
+        
+        # Pipeline costruita Popen-su-Popen, senza /bin/sh in mezzo
+        procs = []
+        stdin = None
+        try:
+            for stage in stages:
+                proc = subprocess.Popen(
+                    stage, shell=isinstance(stage, str), stdin=stdin,
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1
+                )
+                if stdin is not None:
+                    stdin.close()  # Solo il processo successivo deve tenere aperta la pipe
+                stdin = proc.stdout
+                procs.append(proc)
+        except OSError:
+            if stdin is not None:
+                stdin.close()
+            for proc in procs:
+                proc.kill()
+                proc.wait()
+            return
+        
+        try:
+            yield from procs[-1].stdout
+        finally:
+            procs[-1].stdout.close()
+            for proc in procs:
+                try:
+                    proc.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+    
+    def _read_sysfs(self, path: str) -> Optional[str]:
+        """Legge un file di /sys o /proc (in-process se locale, altrimenti con cat)"""
+        if self._is_local:
+            try:
+                return Path(path).read_text()
+            except OSError:
+                return None
+        return self._run_command(["cat", path])
+    
+    def _list_sysfs(self, path: str) -> List[str]:
+        """Elenca il contenuto di una directory sysfs (in-process se locale)"""
+        if self._is_local:
+            try:
+                return sorted(os.listdir(path))
+            except OSError:
+                return []
+        output = self._run_command(f"ls {path}/ 2>/dev/null")
+        return output.split() if output else []
+    
+    def _read_sysfs_values(self, *patterns: str) -> Dict[str, str]:
+        """
+        Legge più attributi sysfs con un'unica invocazione di grep.
+        
+        Args:
+            patterns: Percorsi (anche con glob) dei file da leggere
+            
+        Returns:
+            Dizionario percorso -> valore (senza newline finale)
+        """
+        if self._is_local:
+            values = {}
+            for pattern in patterns:
+                for path in sorted(glob.glob(pattern)):
+                    try:
+                        value = _read_sysfs_attr(path).strip()
+                    except OSError:
+                        continue
+                    if value:
+                        values[path] = value
+            return values
+        
+        # grep -H stampa "percorso:valore" per ogni file; "|| true" perché un
+        # glob senza corrispondenze fa uscire grep con codice 2
+        output = self._run_command(f"grep -H . {' '.join(patterns)} 2>/dev/null || true")
+        values = {}
+        if not output:
+            return values
+        
+        for line in output.splitlines():
+            # I percorsi sysfs letti qui non contengono ':'
+            path, sep, value = line.partition(':')
+            if sep:
+                values[path] = value.strip()
+        return values
+    
     def run_all_checks(self) -> List[HardwareAlert]:
         """
         Esegue tutti i controlli hardware.
@@ -103,28 +490,35 @@ class HardwareMonitor:
             Lista di alert rilevati
         """
         self.alerts = []
+        self.invalidate_caches()
+        self._scan_time = datetime.now()
         
         logger.info("→ Controllo stato hardware...")
         
-        # Dischi SMART
-        self._check_smart_disks()
-        
-        # Memoria ECC
-        self._check_memory_ecc()
+        checks = (
+            self._check_smart_disks,    # Dischi SMART
+            self._check_memory_ecc,     # Memoria ECC
+            self._check_raid_mdadm,     # RAID mdadm
+            self._check_raid_zfs,       # RAID ZFS
+            self._check_temperatures,   # Temperature
+            self._check_kernel_errors,  # Errori Kernel
+        )
         
-        # RAID (mdadm + ZFS)
-        self._check_raid_mdadm()
-        self._check_raid_zfs()
+        # I controlli riguardano sottosistemi indipendenti: li eseguiamo in
+        # parallelo, il tempo totale diventa quello del controllo più lento
+        with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+            futures = [pool.submit(self._collect_alerts, check) for check in checks]
+            wait(futures)
         
-        # Temperature
-        self._check_temperatures()
-        
-        # Errori Kernel
-        self._check_kernel_errors()
+        # Alert nell'ordine fisso di checks, come nell'esecuzione sequenziale;
+        # result() propaga eventuali eccezioni
+        for future in futures:
+            self._emit_alerts(future.result())
         
         # Summary
-        critical_count = sum(1 for a in self.alerts if a.status == HardwareStatus.CRITICAL)
-        warning_count = sum(1 for a in self.alerts if a.status == HardwareStatus.WARNING)
+        summary = self.get_summary()
+        critical_count = summary["critical"]
+        warning_count = summary["warning"]
         
         if critical_count > 0:
             logger.warning(f"  ⚠ Rilevati {critical_count} problemi CRITICI, {warning_count} warning")
@@ -141,18 +535,74 @@ class HardwareMonitor:
     
     def _check_smart_disks(self) -> None:
         """Controlla lo stato SMART di tutti i dischi"""
+        if not self._has_tool("smartctl"):
+            return
+        
         # Trova tutti i dischi
         disks = self._get_disk_devices()
+        if not disks:
+            return
+        
+        # smartctl è dominato dall'attesa del disco: interroga i dischi in parallelo
+        if self._is_local:
+            # In locale un solo event loop sovrappone tutti gli smartctl,
+            # poi l'analisi lavora sull'output già in cache
+            asyncio.run(self._prefetch_smart_outputs(disks))
+            for disk in disks:
+                self._check_smart_disk(disk)
+        else:
+            # Gli executor remoti sono sincroni: un thread per disco
+            # Gli alert di ogni disco sono raccolti a parte e aggiunti nell'ordine dei dischi
+            with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_DISKS, len(disks))) as pool:
+                per_disk = list(pool.map(
+                    lambda disk: self._collect_alerts(self._check_smart_disk, disk), disks
+                ))
+            for alerts in per_disk:
+                self._emit_alerts(alerts)
+    
+    async def _run_command_async(self, argv: Sequence[str]) -> Optional[str]:
+        """Esegue un comando argv locale in modo asincrono e ritorna l'output"""
+        if self._tool_missing(argv):
+            return None
+        
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+        except OSError:
+            return None
+        
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=30)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return None
         
-        for disk in disks:
-            self._check_smart_disk(disk)
+        if proc.returncode != 0:
+            return None
+        return stdout.decode(errors="replace")
+    
+    async def _prefetch_smart_outputs(self, disks: List[str]) -> None:
+        """Esegue smartctl su tutti i dischi insieme e ne memorizza l'output"""
+        limit = asyncio.Semaphore(self.MAX_PARALLEL_DISKS)
+        
+        async def fetch(device: str) -> Optional[str]:
+            async with limit:
+                return await self._run_command_async(self._smart_argv(device))
+        
+        outputs = await asyncio.gather(*(fetch(disk) for disk in disks))
+        self._smart_output_cache.update(zip(disks, outputs))
     
     def _get_disk_devices(self) -> List[str]:
-        """Ottiene la lista dei dispositivi disco"""
+        """Ottiene la lista dei dispositivi disco (memorizzata fino a invalidate_caches)"""
+        if self._disk_cache is not None:
+            return self._disk_cache
+        
         devices = []
         
         # Metodo 1: lsblk
-        output = self._run_command("lsblk -d -n -o NAME,TYPE 2>/dev/null")
+        output = self._run_command(["lsblk", "-d", "-n", "-o", "NAME,TYPE"])
         if output:
             for line in output.strip().split('\n'):
                 parts = line.split()
@@ -161,113 +611,300 @@ class HardwareMonitor:
         
         # Metodo 2: /sys/block (fallback)
         if not devices:
-            output = self._run_command("ls /sys/block/ 2>/dev/null")
-            if output:
-                for dev in output.strip().split():
-                    if dev.startswith(('sd', 'nvme', 'hd', 'vd')):
-                        devices.append(f"/dev/{dev}")
+            for dev in self._list_sysfs("/sys/block"):
+                if dev.startswith(('sd', 'nvme', 'hd', 'vd')):
+                    devices.append(f"/dev/{dev}")
         
+        self._disk_cache = devices
         return devices
     
     def _check_smart_disk(self, device: str) -> None:
         """Controlla lo stato SMART di un singolo disco"""
         # Verifica se smartctl è disponibile
-        output = self._run_command(f"smartctl -H -A {device} 2>/dev/null")
+        output = self._get_smart_output(device)
         if not output:
             return
         
         disk_name = device.split('/')[-1]
+        t = self.thresholds
+        reallocated_warning, reallocated_critical = t["reallocated_sectors_warning"], t["reallocated_sectors_critical"]
+        pending_warning = t["pending_sectors_warning"]
+        disk_temp_warning, disk_temp_critical = t["disk_temp_warning"], t["disk_temp_critical"]
         
         # Check overall health
         if "PASSED" in output:
             pass  # OK
         elif "FAILED" in output:
-            self.alerts.append(HardwareAlert(
+            self._add_alert(
                 component="disk",
                 device=device,
                 status=HardwareStatus.CRITICAL,
                 message=f"Disco {disk_name}: SMART health test FAILED",
                 details={"smart_status": "FAILED"}
-            ))
+            )
             return
         
         # Parse attributi SMART
-        smart_attrs = self._parse_smart_attributes(output)
+        smart_attrs = self._get_smart_attributes(device, output)
         
         # Reallocated Sectors (ID 5)
         reallocated = smart_attrs.get("Reallocated_Sector_Ct", 0)
-        if reallocated >= self.thresholds["reallocated_sectors_critical"]:
-            self.alerts.append(HardwareAlert(
+        if reallocated >= reallocated_critical:
+            self._add_alert(
                 component="disk",
                 device=device,
                 status=HardwareStatus.CRITICAL,
                 message=f"Disco {disk_name}: {reallocated} settori riallocati (critico)",
                 details={"reallocated_sectors": reallocated}
-            ))
-        elif reallocated >= self.thresholds["reallocated_sectors_warning"]:
-            self.alerts.append(HardwareAlert(
+            )
+        elif reallocated >= reallocated_warning:
+            self._add_alert(
                 component="disk",
                 device=device,
                 status=HardwareStatus.WARNING,
                 message=f"Disco {disk_name}: {reallocated} settori riallocati",
                 details={"reallocated_sectors": reallocated}
-            ))
+            )
         
         # Pending Sectors (ID 197)
         pending = smart_attrs.get("Current_Pending_Sector", 0)
-        if pending >= self.thresholds["pending_sectors_warning"]:
-            self.alerts.append(HardwareAlert(
+        if pending >= pending_warning:
+            self._add_alert(
                 component="disk",
                 device=device,
                 status=HardwareStatus.WARNING,
                 message=f"Disco {disk_name}: {pending} settori pending",
                 details={"pending_sectors": pending}
-            ))
+            )
         
         # Temperature (ID 194 o 190)
         temp = smart_attrs.get("Temperature_Celsius", smart_attrs.get("Airflow_Temperature_Cel", 0))
-        if temp >= self.thresholds["disk_temp_critical"]:
-            self.alerts.append(HardwareAlert(
+        if temp >= disk_temp_critical:
+            self._add_alert(
                 component="disk",
                 device=device,
                 status=HardwareStatus.CRITICAL,
                 message=f"Disco {disk_name}: temperatura {temp}°C (critica)",
                 details={"temperature": temp}
-            ))
-        elif temp >= self.thresholds["disk_temp_warning"]:
-            self.alerts.append(HardwareAlert(
+            )
+        elif temp >= disk_temp_warning:
+            self._add_alert(
                 component="disk",
                 device=device,
                 status=HardwareStatus.WARNING,
                 message=f"Disco {disk_name}: temperatura {temp}°C (elevata)",
                 details={"temperature": temp}
-            ))
+            )
         
         # Offline Uncorrectable (ID 198)
         uncorrectable = smart_attrs.get("Offline_Uncorrectable", 0)
         if uncorrectable > 0:
-            self.alerts.append(HardwareAlert(
+            self._add_alert(
                 component="disk",
                 device=device,
                 status=HardwareStatus.CRITICAL,
                 message=f"Disco {disk_name}: {uncorrectable} settori non correggibili",
                 details={"uncorrectable_sectors": uncorrectable}
-            ))
+            )
+    
+    def _smart_argv(self, device: str) -> List[str]:
+        """
+        Unica invocazione di smartctl per disco: stato di salute (-H) e
+        attributi (-A), più l'identità (-i) solo se non è già in cache.
+        """
+        if self._get_static_disk_info(device) is None:
+            return ["smartctl", "-i", "-H", "-A", device]
+        return ["smartctl", "-H", "-A", device]
+    
+    def _disk_identity(self, device: str) -> Optional[tuple]:
+        """
+        Identificativo stabile e seriale (da sysfs, se esposto) del disco locale.
+        
+        Returns:
+            (identificativo, seriale o None), oppure None se il disco non ha
+            un identificativo stabile
+        """
+        if device in self._disk_identity_cache:
+            return self._disk_identity_cache[device]
+        
+        block = f"/sys/block/{os.path.basename(device)}"
+        stable_id = None
+        # SCSI/SATA espongono device/wwid, NVMe wwid direttamente sul blocco
+        for path in (f"{block}/device/wwid", f"{block}/wwid"):
+            try:
+                stable_id = " ".join(_read_sysfs_attr(path).split())
+            except OSError:
+                continue
+            if stable_id:
+                break
+        if not stable_id:
+            stable_id = self._disk_by_id(device)
+        
+        identity = (stable_id, self._read_disk_serial(block)) if stable_id else None
+        self._disk_identity_cache[device] = identity
+        return identity
+    
+    def _disk_by_id(self, device: str) -> Optional[str]:
+        """Nome in /dev/disk/by-id che punta al disco (preferiti i wwn-*)"""
+        try:
+            entries = os.listdir(self.DISK_BY_ID_DIR)
+        except OSError:
+            return None
+        target = os.path.realpath(device)
+        names = sorted(
+            name for name in entries
+            if "-part" not in name
+            and os.path.realpath(os.path.join(self.DISK_BY_ID_DIR, name)) == target
+        )
+        if not names:
+            return None
+        return next((name for name in names if name.startswith("wwn-")), names[0])
+    
+    @staticmethod
+    def _read_disk_serial(block: str) -> Optional[str]:
+        """Seriale del disco da sysfs: device/serial (NVMe) o VPD pagina 0x80 (SCSI/SATA)"""
+        try:
+            serial = _read_sysfs_attr(f"{block}/device/serial").strip()
+            if serial:
+                return serial
+        except OSError:
+            pass
+        
+        try:
+            with open(f"{block}/device/vpd_pg80", "rb") as f:
+                page = f.read()
+        except OSError:
+            return None
+        # Header di 4 byte: il byte 3 è la lunghezza del seriale che segue
+        if len(page) < 4:
+            return None
+        serial = page[4:4 + page[3]].decode("ascii", "replace").strip()
+        return serial or None
+    
+    def _load_static_disk_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Cache identità dischi, caricata dal file al primo uso (chiamare con il lock)"""
+        if self._disk_static_cache is not None:
+            return self._disk_static_cache
+        
+        self._disk_static_cache = {}
+        if not self._disk_static_file:
+            return self._disk_static_cache
+        try:
+            with open(self._disk_static_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self._disk_static_cache
+        if isinstance(data, dict):
+            # Le voci indicizzate per nome kernel ("/dev/sdX") non sono affidabili: scartate
+            self._disk_static_cache.update(
+                (disk_id, entry) for disk_id, entry in data.items()
+                if isinstance(entry, dict) and not disk_id.startswith("/dev/")
+            )
+        return self._disk_static_cache
+    
+    def _get_static_disk_info(self, device: str) -> Optional[Dict[str, Any]]:
+        """Identità in cache del disco locale, se presente e ancora valida"""
+        # I dischi degli host remoti non sono identificabili da qui: niente cache
+        if not self._is_local:
+            return None
+        identity = self._disk_identity(device)
+        if identity is None:
+            return None
+        stable_id, serial = identity
+        
+        with self._disk_static_lock:
+            entry = self._load_static_disk_cache().get(stable_id)
+        if not entry:
+            return None
+        cached_at = entry.get("cached_at", 0)
+        if not isinstance(cached_at, (int, float)) or time.time() - cached_at > self.DISK_STATIC_CACHE_TTL:
+            return None
+        info = entry.get("info")
+        if not isinstance(info, dict):
+            return None
+        # Il seriale attuale (se sysfs lo espone) deve coincidere con quello memorizzato
+        if serial and info.get("serial") and info["serial"] != serial:
+            return None
+        return info
+    
+    def _store_static_disk_info(self, device: str, info: Dict[str, Any]) -> None:
+        """Memorizza l'identità del disco locale (salvata da save_static_disk_cache)"""
+        if not self._is_local:
+            return
+        identity = self._disk_identity(device)
+        if identity is None:
+            return
+        with self._disk_static_lock:
+            self._load_static_disk_cache()[identity[0]] = {"info": info, "cached_at": int(time.time())}
+            self._disk_static_dirty = True
+    
+    def save_static_disk_cache(self) -> None:
+        """Scrive su file la cache identità dischi se è stata aggiornata"""
+        if not self._disk_static_dirty or not self._disk_static_file:
+            return
+        self._disk_static_dirty = False
+        with self._disk_static_lock:
+            data = dict(self._load_static_disk_cache())
+        try:
+            os.makedirs(os.path.dirname(self._disk_static_file) or ".", exist_ok=True)
+            tmp_path = f"{self._disk_static_file}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._disk_static_file)
+        except OSError as e:
+            logger.debug(f"Impossibile salvare la cache dei dischi: {e}")
+    
+    def _get_smart_output(self, device: str) -> Optional[str]:
+        """
+        Output di smartctl -H -A (e -i se serve) per il disco, memorizzato per
+        il passaggio corrente: contiene stato di salute, attributi ed
+        eventualmente l'identità, così _get_disk_info non deve interrogare
+        di nuovo il disco.
+        """
+        if device in self._smart_output_cache:
+            return self._smart_output_cache[device]
+        
+        output = self._run_command(self._smart_argv(device))
+        self._smart_output_cache[device] = output
+        return output
+    
+    def _get_smart_attributes(self, device: str, output: str) -> Dict[str, int]:
+        """Attributi SMART parsati, memorizzati insieme all'output di smartctl"""
+        attrs = self._smart_attrs_cache.get(device)
+        if attrs is None:
+            attrs = self._parse_smart_attributes(output)
+            self._smart_attrs_cache[device] = attrs
+        return attrs
     
     def _parse_smart_attributes(self, output: str) -> Dict[str, int]:
         """Parsa gli attributi SMART dall'output di smartctl"""
         attrs = {}
+        in_table = False
         
-        # Pattern per attributi SMART
+        # La tabella ha colonne fisse, basta split() sulle righe dopo l'header:
         # ID# ATTRIBUTE_NAME          FLAG     VALUE WORST THRESH TYPE      UPDATED  WHEN_FAILED RAW_VALUE
-        pattern = r'^\s*(\d+)\s+(\S+)\s+\S+\s+\d+\s+\d+\s+\d+\s+\S+\s+\S+\s+\S+\s+(\d+)'
-        
-        for line in output.split('\n'):
-            match = re.match(pattern, line)
-            if match:
-                attr_name = match.group(2)
-                raw_value = int(match.group(3))
-                attrs[attr_name] = raw_value
+        for line in output.splitlines():
+            stripped = line.strip()
+            if stripped.startswith('ID#'):
+                in_table = True
+                continue
+            if not in_table:
+                continue
+            if not stripped:
+                in_table = False
+                continue
+            
+            # Al massimo 9 divisioni: parts[9] è RAW_VALUE con l'eventuale coda
+            parts = stripped.split(None, 9)
+            if len(parts) < 10 or not parts[0].isdigit():
+                continue
+            
+            # RAW_VALUE può avere suffissi (es. "47 (Min/Max 18/52)", "1234h+05m"):
+            # conta solo il prefisso numerico
+            raw = parts[9]
+            digits = len(raw) - len(raw.lstrip('0123456789'))
+            if digits:
+                attrs[parts[1]] = int(raw[:digits])
         
         return attrs
     
@@ -278,7 +915,7 @@ class HardwareMonitor:
     def _check_memory_ecc(self) -> None:
         """Controlla errori memoria ECC"""
         # Metodo 1: edac-util
-        output = self._run_command("edac-util -s 2>/dev/null")
+        output = self._run_command(["edac-util", "-s"])
         if output:
             self._parse_edac_util(output)
             return
@@ -289,67 +926,65 @@ class HardwareMonitor:
     def _parse_edac_util(self, output: str) -> None:
         """Parsa output di edac-util"""
         # Cerca errori corretti e non corretti
-        ce_match = re.search(r'(\d+)\s+Corrected', output, re.IGNORECASE)
-        ue_match = re.search(r'(\d+)\s+Uncorrected', output, re.IGNORECASE)
+        ce_match = _EDAC_CE_RE.search(output)
+        ue_match = _EDAC_UE_RE.search(output)
         
         corrected = int(ce_match.group(1)) if ce_match else 0
         uncorrected = int(ue_match.group(1)) if ue_match else 0
         
         if uncorrected >= self.thresholds["ecc_uncorrected_critical"]:
-            self.alerts.append(HardwareAlert(
+            self._add_alert(
                 component="memory",
                 device="ECC",
                 status=HardwareStatus.CRITICAL,
                 message=f"Memoria: {uncorrected} errori ECC non corretti (CRITICO)",
                 details={"corrected": corrected, "uncorrected": uncorrected}
-            ))
+            )
         elif corrected >= self.thresholds["ecc_corrected_warning"]:
-            self.alerts.append(HardwareAlert(
+            self._add_alert(
                 component="memory",
                 device="ECC",
                 status=HardwareStatus.WARNING,
                 message=f"Memoria: {corrected} errori ECC corretti",
                 details={"corrected": corrected, "uncorrected": uncorrected}
-            ))
+            )
     
     def _check_edac_sysfs(self) -> None:
         """Controlla errori ECC via sysfs"""
         edac_path = "/sys/devices/system/edac/mc"
         
-        # Controlla se esiste
-        output = self._run_command(f"ls {edac_path}/ 2>/dev/null")
-        if not output:
+        # Tutti i contatori di tutti i controller in un solo comando
+        values = self._read_sysfs_values(
+            f"{edac_path}/mc*/ce_count", f"{edac_path}/mc*/ue_count"
+        )
+        if not values:
             return  # No EDAC support
         
         total_ce = 0
         total_ue = 0
         
-        for mc in output.strip().split():
-            if mc.startswith("mc"):
-                ce = self._run_command(f"cat {edac_path}/{mc}/ce_count 2>/dev/null")
-                ue = self._run_command(f"cat {edac_path}/{mc}/ue_count 2>/dev/null")
-                
-                if ce:
-                    total_ce += int(ce.strip())
-                if ue:
-                    total_ue += int(ue.strip())
+        for path, value in values.items():
+            if path.endswith("/ce_count"):
+                total_ce += int(value)
+            elif path.endswith("/ue_count"):
+                total_ue += int(value)
         
         if total_ue >= self.thresholds["ecc_uncorrected_critical"]:
-            self.alerts.append(HardwareAlert(
+            self._add_alert(
                 component="memory",
                 device="ECC",
                 status=HardwareStatus.CRITICAL,
                 message=f"Memoria: {total_ue} errori ECC non corretti",
                 details={"corrected": total_ce, "uncorrected": total_ue}
-            ))
+            )
         elif total_ce >= self.thresholds["ecc_corrected_warning"]:
-            self.alerts.append(HardwareAlert(
+            self._add_alert(
                 component="memory",
                 device="ECC",
                 status=HardwareStatus.WARNING,
                 message=f"Memoria: {total_ce} errori ECC corretti",
                 details={"corrected": total_ce, "uncorrected": total_ue}
-            ))
+            )
     
     # =========================================================================
     # RAID CHECKS
@@ -357,127 +992,128 @@ class HardwareMonitor:
     
     def _check_raid_mdadm(self) -> None:
         """Controlla stato RAID mdadm"""
-        output = self._run_command("cat /proc/mdstat 2>/dev/null")
+        output = self._read_sysfs("/proc/mdstat")
         if not output or "md" not in output:
             return
         
         # Parse mdstat
         current_md = None
-        for line in output.split('\n'):
-            # Nuova riga md
-            md_match = re.match(r'^(md\d+)\s*:\s*(\w+)\s+(\w+)', line)
+        for line in output.splitlines():
+            # Nuova riga md (la regex si prova solo sulle righe che iniziano per "md")
+            md_match = _MDSTAT_MD_RE.match(line) if line.startswith('md') else None
             if md_match:
                 current_md = md_match.group(1)
                 status = md_match.group(2)  # active/inactive
                 
                 if status != "active":
-                    self.alerts.append(HardwareAlert(
+                    self._add_alert(
                         component="raid",
                         device=current_md,
                         status=HardwareStatus.CRITICAL,
                         message=f"RAID {current_md}: stato {status} (non attivo)",
                         details={"raid_status": status}
-                    ))
+                    )
             
             # Stato dischi [UU] o [U_]
-            state_match = re.search(r'\[([U_]+)\]', line)
+            state_match = _MDSTAT_STATE_RE.search(line) if '[' in line else None
             if state_match and current_md:
                 state = state_match.group(1)
                 failed_count = state.count('_')
                 
                 if failed_count > 0:
-                    self.alerts.append(HardwareAlert(
+                    self._add_alert(
                         component="raid",
                         device=current_md,
                         status=HardwareStatus.CRITICAL,
                         message=f"RAID {current_md}: {failed_count} disco(i) degradato/i [{state}]",
                         details={"state": state, "failed_disks": failed_count}
-                    ))
+                    )
             
             # Rebuild in progress
-            if "recovery" in line.lower() or "resync" in line.lower():
-                progress_match = re.search(r'(\d+\.?\d*)%', line)
+            lowered = line.lower()
+            if "recovery" in lowered or "resync" in lowered:
+                progress_match = _PROGRESS_RE.search(line)
                 progress = progress_match.group(1) if progress_match else "?"
                 
-                self.alerts.append(HardwareAlert(
+                self._add_alert(
                     component="raid",
                     device=current_md,
                     status=HardwareStatus.WARNING,
                     message=f"RAID {current_md}: rebuild in corso ({progress}%)",
                     details={"rebuild_progress": progress}
-                ))
+                )
     
     def _check_raid_zfs(self) -> None:
         """Controlla stato ZFS pool"""
-        output = self._run_command("zpool status 2>/dev/null")
+        output = self._run_command(["zpool", "status"])
         if not output:
             return
         
         current_pool = None
         
-        for line in output.split('\n'):
+        for line in output.splitlines():
             # Nome pool
-            pool_match = re.match(r'^\s*pool:\s*(\S+)', line)
+            pool_match = _ZPOOL_POOL_RE.match(line)
             if pool_match:
                 current_pool = pool_match.group(1)
             
             # Stato pool
-            state_match = re.match(r'^\s*state:\s*(\S+)', line)
+            state_match = _ZPOOL_STATE_RE.match(line)
             if state_match and current_pool:
                 state = state_match.group(1)
                 
                 if state == "DEGRADED":
-                    self.alerts.append(HardwareAlert(
+                    self._add_alert(
                         component="raid",
                         device=f"zpool:{current_pool}",
                         status=HardwareStatus.CRITICAL,
                         message=f"ZFS Pool {current_pool}: stato DEGRADED",
                         details={"pool_state": state}
-                    ))
+                    )
                 elif state == "FAULTED":
-                    self.alerts.append(HardwareAlert(
+                    self._add_alert(
                         component="raid",
                         device=f"zpool:{current_pool}",
                         status=HardwareStatus.CRITICAL,
                         message=f"ZFS Pool {current_pool}: stato FAULTED (critico)",
                         details={"pool_state": state}
-                    ))
+                    )
                 elif state == "OFFLINE":
-                    self.alerts.append(HardwareAlert(
+                    self._add_alert(
                         component="raid",
                         device=f"zpool:{current_pool}",
                         status=HardwareStatus.CRITICAL,
                         message=f"ZFS Pool {current_pool}: OFFLINE",
                         details={"pool_state": state}
-                    ))
+                    )
             
             # Errori nei vdev
             if current_pool and ("DEGRADED" in line or "FAULTED" in line or "UNAVAIL" in line):
-                vdev_match = re.match(r'^\s+(\S+)\s+(DEGRADED|FAULTED|UNAVAIL)', line)
+                vdev_match = _ZPOOL_VDEV_RE.match(line)
                 if vdev_match:
                     vdev = vdev_match.group(1)
                     vdev_state = vdev_match.group(2)
                     
-                    self.alerts.append(HardwareAlert(
+                    self._add_alert(
                         component="raid",
                         device=f"zpool:{current_pool}/{vdev}",
                         status=HardwareStatus.CRITICAL,
                         message=f"ZFS {current_pool}: disco {vdev} {vdev_state}",
                         details={"vdev": vdev, "vdev_state": vdev_state}
-                    ))
+                    )
             
             # Scrub errors
-            errors_match = re.search(r'(\d+)\s+repaired', line)
+            errors_match = _ZPOOL_REPAIRED_RE.search(line)
             if errors_match and current_pool:
                 repaired = int(errors_match.group(1))
                 if repaired > 0:
-                    self.alerts.append(HardwareAlert(
+                    self._add_alert(
                         component="raid",
                         device=f"zpool:{current_pool}",
                         status=HardwareStatus.WARNING,
                         message=f"ZFS Pool {current_pool}: {repaired} errori riparati durante scrub",
                         details={"repaired_errors": repaired}
-                    ))
+                    )
     
     # =========================================================================
     # TEMPERATURE CHECKS
@@ -486,7 +1122,7 @@ class HardwareMonitor:
     def _check_temperatures(self) -> None:
         """Controlla temperature CPU e componenti"""
         # Metodo 1: sensors (lm-sensors)
-        output = self._run_command("sensors 2>/dev/null")
+        output = self._run_command(["sensors"])
         if output:
             self._parse_sensors_output(output)
             return
@@ -496,19 +1132,19 @@ class HardwareMonitor:
     
     def _parse_sensors_output(self, output: str) -> None:
         """Parsa output di sensors"""
-        # Pattern per temperature
-        temp_pattern = r'(\S+):\s*\+?(-?\d+\.?\d*)\s*°?C'
+        cpu_warning = self.thresholds["cpu_temp_warning"]
+        cpu_critical = self.thresholds["cpu_temp_critical"]
         
-        for line in output.split('\n'):
-            match = re.search(temp_pattern, line)
+        for line in output.splitlines():
+            match = _SENSOR_TEMP_RE.search(line)
             if match:
                 sensor_name = match.group(1).lower()
                 temp = float(match.group(2))
                 
                 # Determina soglie in base al tipo di sensore
-                if 'core' in sensor_name or 'cpu' in sensor_name or 'tctl' in sensor_name:
-                    warning_thresh = self.thresholds["cpu_temp_warning"]
-                    critical_thresh = self.thresholds["cpu_temp_critical"]
+                if _CPU_SENSOR_RE.search(sensor_name):
+                    warning_thresh = cpu_warning
+                    critical_thresh = cpu_critical
                     component = "temperature"
                     device = f"CPU ({sensor_name})"
                 else:
@@ -519,56 +1155,67 @@ class HardwareMonitor:
                     device = sensor_name
                 
                 if temp >= critical_thresh:
-                    self.alerts.append(HardwareAlert(
+                    self._add_alert(
                         component=component,
                         device=device,
                         status=HardwareStatus.CRITICAL,
                         message=f"Temperatura {device}: {temp}°C (CRITICA)",
                         details={"temperature": temp, "threshold": critical_thresh}
-                    ))
+                    )
                 elif temp >= warning_thresh:
-                    self.alerts.append(HardwareAlert(
+                    self._add_alert(
                         component=component,
                         device=device,
                         status=HardwareStatus.WARNING,
                         message=f"Temperatura {device}: {temp}°C (elevata)",
                         details={"temperature": temp, "threshold": warning_thresh}
-                    ))
+                    )
     
     def _check_thermal_sysfs(self) -> None:
         """Controlla temperature via sysfs"""
-        output = self._run_command("ls /sys/class/thermal/ 2>/dev/null")
-        if not output:
+        # temp e type di tutte le zone in un solo comando
+        values = self._read_sysfs_values(
+            "/sys/class/thermal/thermal_zone*/temp", "/sys/class/thermal/thermal_zone*/type"
+        )
+        if not values:
             return
         
-        for zone in output.strip().split():
-            if zone.startswith("thermal_zone"):
-                temp_output = self._run_command(f"cat /sys/class/thermal/{zone}/temp 2>/dev/null")
-                type_output = self._run_command(f"cat /sys/class/thermal/{zone}/type 2>/dev/null")
-                
-                if temp_output:
-                    try:
-                        temp = int(temp_output.strip()) / 1000  # millidegree to degree
-                        zone_type = type_output.strip() if type_output else zone
-                        
-                        if temp >= self.thresholds["cpu_temp_critical"]:
-                            self.alerts.append(HardwareAlert(
-                                component="temperature",
-                                device=zone_type,
-                                status=HardwareStatus.CRITICAL,
-                                message=f"Temperatura {zone_type}: {temp}°C (CRITICA)",
-                                details={"temperature": temp}
-                            ))
-                        elif temp >= self.thresholds["cpu_temp_warning"]:
-                            self.alerts.append(HardwareAlert(
-                                component="temperature",
-                                device=zone_type,
-                                status=HardwareStatus.WARNING,
-                                message=f"Temperatura {zone_type}: {temp}°C (elevata)",
-                                details={"temperature": temp}
-                            ))
-                    except ValueError:
-                        pass
+        cpu_warning = self.thresholds["cpu_temp_warning"]
+        cpu_critical = self.thresholds["cpu_temp_critical"]
+        
+        # Raggruppa per zona: {"thermal_zone0": {"temp": ..., "type": ...}}
+        zones: Dict[str, Dict[str, str]] = {}
+        for path, value in values.items():
+            zone, _, attr = path.rpartition('/')
+            zones.setdefault(zone.rsplit('/', 1)[-1], {})[attr] = value
+        
+        for zone, attrs in zones.items():
+            temp_output = attrs.get("temp")
+            type_output = attrs.get("type")
+            
+            if temp_output:
+                try:
+                    temp = int(temp_output) / 1000  # millidegree to degree
+                    zone_type = type_output if type_output else zone
+                    
+                    if temp >= cpu_critical:
+                        self._add_alert(
+                            component="temperature",
+                            device=zone_type,
+                            status=HardwareStatus.CRITICAL,
+                            message=f"Temperatura {zone_type}: {temp}°C (CRITICA)",
+                            details={"temperature": temp}
+                        )
+                    elif temp >= cpu_warning:
+                        self._add_alert(
+                            component="temperature",
+                            device=zone_type,
+                            status=HardwareStatus.WARNING,
+                            message=f"Temperatura {zone_type}: {temp}°C (elevata)",
+                            details={"temperature": temp}
+                        )
+                except ValueError:
+                    pass
     
     # =========================================================================
     # KERNEL ERROR CHECKS
@@ -576,49 +1223,30 @@ class HardwareMonitor:
     
     def _check_kernel_errors(self) -> None:
         """Controlla errori nel kernel log (dmesg)"""
-        # Ultimi 1000 messaggi del kernel
-        output = self._run_command("dmesg --level=err,crit,alert,emerg -T 2>/dev/null | tail -100")
-        if not output:
-            # Fallback senza timestamp
-            output = self._run_command("dmesg --level=err,crit,alert,emerg 2>/dev/null | tail -100")
-        
-        if not output:
-            return
-        
-        # Pattern per errori hardware comuni
-        error_patterns = {
-            "mce": (r'mce:|Machine check', "MCE (Machine Check Exception)"),
-            "io_error": (r'I/O error|Buffer I/O error|blk_update_request', "I/O Error"),
-            "ata_error": (r'ata\d+.*error|SATA.*error', "SATA/ATA Error"),
-            "nvme_error": (r'nvme.*error|nvme.*failed', "NVMe Error"),
-            "memory_error": (r'EDAC|ECC|memory error|page allocation failure', "Memory Error"),
-            "pcie_error": (r'PCIe.*error|AER.*error', "PCIe Error"),
-            "hardware_error": (r'Hardware Error|hardware error', "Hardware Error"),
-            "thermal": (r'thermal|CPU.*throttl|temperature above', "Thermal Event"),
-            "filesystem": (r'EXT4-fs error|XFS.*error|BTRFS.*error|filesystem error', "Filesystem Error"),
-        }
+        dmesg = ["dmesg", "--level=err,crit,alert,emerg"]
         
         found_errors = {}
         
-        for line in output.split('\n'):
-            line_lower = line.lower()
-            
-            for error_type, (pattern, description) in error_patterns.items():
-                if re.search(pattern, line, re.IGNORECASE):
-                    if error_type not in found_errors:
-                        found_errors[error_type] = {
-                            "description": description,
-                            "count": 0,
-                            "last_message": ""
-                        }
-                    found_errors[error_type]["count"] += 1
-                    found_errors[error_type]["last_message"] = line.strip()[:200]
+        # Metodo 1: dmesg -J (util-linux recente), output strutturato
+        json_lines = self._read_kernel_log_json(dmesg)
+        if json_lines is not None:
+            self._scan_kernel_lines(iter(json_lines), found_errors)
+        else:
+            # Metodo 2: output testuale; grep filtra le sole righe rilevanti
+            # prima di arrivare a Python
+            grep_filter = [["grep", "-iE", _KERNEL_ERROR_GREP], ["tail", f"-{self.KERNEL_LOG_MAX_LINES}"]]
+            lines_read = self._scan_kernel_lines(
+                self._run_command_lines([dmesg + ["-T"]] + grep_filter), found_errors
+            )
+            if not lines_read:
+                # Fallback senza timestamp
+                self._scan_kernel_lines(self._run_command_lines([dmesg] + grep_filter), found_errors)
         
         # Genera alert per ogni tipo di errore trovato
         for error_type, error_info in found_errors.items():
             severity = HardwareStatus.CRITICAL if error_type in ["mce", "memory_error", "hardware_error"] else HardwareStatus.WARNING
             
-            self.alerts.append(HardwareAlert(
+            self._add_alert(
                 component="kernel",
                 device=error_type,
                 status=severity,
@@ -628,7 +1256,72 @@ class HardwareMonitor:
                     "count": error_info["count"],
                     "last_message": error_info["last_message"]
                 }
-            ))
+            )
+    
+    def _read_kernel_log_json(self, dmesg: List[str]) -> Optional[List[str]]:
+        """
+        Legge il kernel log con dmesg -k -J.
+        
+        Returns:
+            Ultime KERNEL_LOG_MAX_LINES righe rilevanti, formattate come
+            "[secondi] messaggio"; None se dmesg non supporta -J
+        """
+        output = self._run_command(dmesg + ["-k", "-J"])
+        if not output or not output.strip():
+            return None
+        
+        try:
+            records = _json_loads(output).get("dmesg", [])
+        except (ValueError, AttributeError):
+            return None
+        
+        # Le ultime N righe che corrispondono a un errore noto (come grep | tail)
+        lines = deque(maxlen=self.KERNEL_LOG_MAX_LINES)
+        for record in records:
+            msg = record.get("msg", "") if isinstance(record, dict) else ""
+            if msg and _KERNEL_ERROR_RE.search(msg):
+                lines.append(f"[{record.get('time', '')}] {msg}")
+        return list(lines)
+    
+    @classmethod
+    def _scan_kernel_lines(cls, lines: Iterator[str], found_errors: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Classifica le righe del kernel log accumulando i risultati in found_errors.
+        
+        Returns:
+            True se è stata letta almeno una riga
+        """
+        lines_read = False
+        cap = cls.KERNEL_ERROR_COUNT_CAP
+        saturated = sum(1 for info in found_errors.values() if info["count"] >= cap)
+        
+        for line in lines:
+            lines_read = True
+            # Una riga conta una volta per ciascun tipo a cui corrisponde
+            if not _KERNEL_ERROR_RE.search(line):
+                continue
+            
+            for error_type, pattern in _KERNEL_ERROR_PATTERNS.items():
+                if not pattern.search(line):
+                    continue
+                if error_type not in found_errors:
+                    found_errors[error_type] = {
+                        "description": _KERNEL_ERROR_DESCRIPTIONS[error_type],
+                        "count": 0,
+                        "last_message": ""
+                    }
+                info = found_errors[error_type]
+                info["last_message"] = line.strip()[:200]
+                if info["count"] < cap:
+                    info["count"] += 1
+                    if info["count"] == cap:
+                        saturated += 1
+            
+            # Tutti i tipi hanno raggiunto il tetto: il resto del log non cambia l'esito
+            if saturated == len(_KERNEL_ERROR_DESCRIPTIONS):
+                break
+        
+        return lines_read
     
     # =========================================================================
     # UTILITY METHODS
@@ -662,23 +1355,34 @@ class HardwareMonitor:
     
     def get_summary(self) -> Dict[str, Any]:
         """Ritorna un riepilogo dello stato hardware"""
-        return {
+        # Riusa il riepilogo se gli alert non sono cambiati (run_all_checks lo invalida)
+        if self._summary_cache is not None and self._summary_cache[0] == len(self.alerts):
+            summary = self._summary_cache[1]
+            return {**summary, "by_component": dict(summary["by_component"])}
+        
+        # Un solo passaggio sugli alert
+        by_status = Counter()
+        by_component = Counter()
+        for a in self.alerts:
+            by_status[a.status] += 1
+            by_component[a.component] += 1
+        
+        summary = {
             "total_alerts": len(self.alerts),
-            "critical": len(self.get_alerts_by_severity(HardwareStatus.CRITICAL)),
-            "warning": len(self.get_alerts_by_severity(HardwareStatus.WARNING)),
+            "critical": by_status[HardwareStatus.CRITICAL],
+            "warning": by_status[HardwareStatus.WARNING],
             "by_component": {
-                "disk": len(self.get_alerts_by_component("disk")),
-                "memory": len(self.get_alerts_by_component("memory")),
-                "raid": len(self.get_alerts_by_component("raid")),
-                "temperature": len(self.get_alerts_by_component("temperature")),
-                "kernel": len(self.get_alerts_by_component("kernel")),
+                component: by_component[component]
+                for component in ("disk", "memory", "raid", "temperature", "kernel")
             },
             "overall_status": (
-                HardwareStatus.CRITICAL.value if self.has_critical_alerts()
+                HardwareStatus.CRITICAL.value if by_status[HardwareStatus.CRITICAL]
                 else HardwareStatus.WARNING.value if self.alerts
                 else HardwareStatus.OK.value
             )
         }
+        self._summary_cache = (len(self.alerts), summary)
+        return {**summary, "by_component": dict(summary["by_component"])}
     
     def get_full_status(self) -> Dict[str, Any]:
         """
@@ -694,160 +1398,181 @@ class HardwareMonitor:
             "summary": self.get_summary()
         }
         
-        # Raccogli info dischi
         disks = self._get_disk_devices()
-        for disk in disks:
-            disk_info = self._get_disk_info(disk)
-            if disk_info:
-                status["disks"].append(disk_info)
-        
-        # Raccogli temperature
-        temps = self._get_all_temperatures()
-        if temps:
-            status["temperatures"] = temps
-        
-        # Raccogli info memoria
-        mem_info = self._get_memory_info()
-        if mem_info:
-            status["memory"] = mem_info
-        
-        # Raccogli info RAID
-        raid_info = self._get_raid_info()
-        if raid_info:
-            status["raid"] = raid_info
         
+        # Le raccolte sono indipendenti e dominate dall'attesa dei comandi
+        # esterni: le eseguiamo in parallelo (ordine dei dischi preservato)
+        with ThreadPoolExecutor(max_workers=self.MAX_STATUS_WORKERS) as pool:
+            disk_futures = [pool.submit(self._get_disk_info, disk) for disk in disks]
+            temps_future = pool.submit(self._get_all_temperatures)
+            mem_future = pool.submit(self._get_memory_info)
+            raid_future = pool.submit(self._get_raid_info)
+            
+            # Raccogli info dischi
+            for future in disk_futures:
+                disk_info = future.result()
+                if disk_info:
+                    status["disks"].append(disk_info)
+            
+            # Raccogli temperature
+            temps = temps_future.result()
+            if temps:
+                status["temperatures"] = temps
+            
+            # Raccogli info memoria
+            mem_info = mem_future.result()
+            if mem_info:
+                status["memory"] = mem_info
+            
+            # Raccogli info RAID
+            raid_info = raid_future.result()
+            if raid_info:
+                status["raid"] = raid_info
+        
+        self.save_static_disk_cache()
         return status
     
     def _get_disk_info(self, device: str) -> Optional[Dict[str, Any]]:
         """Ottiene informazioni dettagliate su un disco"""
         info = {"device": device}
         
-        # SMART health
-        output = self._run_command(f"smartctl -H {device} 2>/dev/null")
-        if output:
-            if "PASSED" in output:
+        # SMART health e attributi (riusa l'output di _check_smart_disk se disponibile)
+        smart_output = self._get_smart_output(device)
+        if smart_output:
+            if "PASSED" in smart_output:
                 info["smart_status"] = "PASSED"
-            elif "FAILED" in output:
+            elif "FAILED" in smart_output:
                 info["smart_status"] = "FAILED"
             else:
                 info["smart_status"] = "UNKNOWN"
         
-        # Modello e seriale
-        output = self._run_command(f"smartctl -i {device} 2>/dev/null")
-        if output:
-            for line in output.split('\n'):
-                if "Model" in line or "Device Model" in line:
-                    info["model"] = line.split(':')[-1].strip()
-                elif "Serial" in line:
-                    info["serial"] = line.split(':')[-1].strip()
-                elif "Capacity" in line or "User Capacity" in line:
-                    info["capacity"] = line.split(':')[-1].strip()
+        # Modello e seriale: dalla cache, altrimenti dall'output di smartctl -i
+        static_info = self._get_static_disk_info(device)
+        if static_info is None and smart_output:
+            static_info = {}
+            for line in smart_output.splitlines():
+                # L'identità precede le sezioni SMART (-H/-A): lì ci si ferma
+                if line.startswith("=== START OF") and "INFORMATION" not in line:
+                    break
+                label, sep, value = line.partition(':')
+                if not sep:
+                    continue
+                for needle, key in _SMART_INFO_KEYS:
+                    if needle in label:
+                        static_info[key] = value.strip()
+                        break
+            if static_info:
+                self._store_static_disk_info(device, static_info)
+        if static_info:
+            info.update(static_info)
         
         # Temperatura
-        output = self._run_command(f"smartctl -A {device} 2>/dev/null")
-        if output:
-            for line in output.split('\n'):
+        if smart_output:
+            for line in smart_output.splitlines():
                 if "Temperature" in line and "Celsius" in line:
-                    parts = line.split()
+                    # Il valore è tra i primi campi (ATA: colonna 4, NVMe/SCSI: 2-4)
+                    parts = line.split(None, 4)
                     for i, p in enumerate(parts):
                         if p.isdigit() and i > 0:
                             info["temperature"] = int(p)
                             break
-                # Settori riallocati
-                if "Reallocated_Sector" in line:
-                    parts = line.split()
-                    if len(parts) >= 10:
-                        try:
-                            info["reallocated_sectors"] = int(parts[9])
-                        except ValueError:
-                            pass
+                    if "temperature" in info:
+                        break  # Basta la prima riga di temperatura valida
+            
+            # Settori riallocati
+            smart_attrs = self._get_smart_attributes(device, smart_output)
+            if "Reallocated_Sector_Ct" in smart_attrs:
+                info["reallocated_sectors"] = smart_attrs["Reallocated_Sector_Ct"]
         
         return info if len(info) > 1 else None
     
     def _get_all_temperatures(self) -> List[Dict[str, Any]]:
         """Raccoglie tutte le temperature del sistema (sensors, hwmon, thermal_zone)"""
         temps = []
+        append = temps.append  # Metodo risolto una volta per tutti i cicli
         
         # 1. Prova sensors -j (lm-sensors JSON)
-        output = self._run_command("sensors -j 2>/dev/null")
+        output = self._run_command(["sensors", "-j"])
         if output:
             try:
-                import json
-                data = json.loads(output)
+                data = _json_loads(output)
                 for chip, values in data.items():
-                    if isinstance(values, dict) and not chip.startswith("Adapter"):
-                        for sensor, readings in values.items():
-                            if isinstance(readings, dict) and sensor and not sensor.startswith("Adapter"):
-                                for key, value in readings.items():
-                                    if "input" in key.lower() and isinstance(value, (int, float)):
-                                        temps.append({
-                                            "chip": chip,
-                                            "sensor": sensor,
-                                            "temperature": round(float(value), 1)
-                                        })
-            except (json.JSONDecodeError, ValueError, TypeError):
+                    # "Adapter" è una stringa, non un dizionario di sensori
+                    if not isinstance(values, dict):
+                        continue
+                    for sensor, readings in values.items():
+                        if not isinstance(readings, dict) or not sensor:
+                            continue
+                        # Le chiavi di sensors -j sono già minuscole (es. temp1_input)
+                        for key, value in readings.items():
+                            if key.endswith("_input") and isinstance(value, (int, float)):
+                                append({
+                                    "chip": chip,
+                                    "sensor": sensor,
+                                    "temperature": round(float(value), 1)
+                                })
+            except (ValueError, TypeError, AttributeError):
                 pass
         
         # 2. Fallback: sensors output testuale (supporta °C, C, degC)
         if not temps:
-            output = self._run_command("sensors 2>/dev/null")
+            output = self._run_command(["sensors"])
             if output:
                 current_chip = ""
-                for line in output.split('\n'):
-                    if line.strip() and not line.startswith(' ') and ':' not in line.strip():
-                        current_chip = line.strip().rstrip(':')
-                    elif current_chip and ('°C' in line or 'C' in line or 'degC' in line.lower()):
+                for line in output.splitlines():
+                    stripped = line.strip()
+                    if stripped and not line.startswith(' ') and ':' not in stripped:
+                        current_chip = stripped.rstrip(':')
+                    # 'C' copre anche °C e degC
+                    elif current_chip and 'C' in line:
                         parts = line.split(':', 1)
                         if len(parts) >= 2:
                             sensor = parts[0].strip()
-                            temp_match = re.search(r'([+-]?\d+\.?\d*)\s*[°]?\s*C', parts[1], re.IGNORECASE)
-                            if temp_match:
-                                temps.append({
+                            temperature = _parse_celsius(parts[1])
+                            if temperature is not None:
+                                append({
                                     "chip": current_chip,
                                     "sensor": sensor,
-                                    "temperature": float(temp_match.group(1))
+                                    "temperature": temperature
                                 })
         
         # 3. Fallback: /sys/class/hwmon (molti server non hanno lm-sensors)
         if not temps:
-            try:
-                hwmon_path = Path("/sys/class/hwmon")
-                if hwmon_path.exists():
-                    for hwdir in sorted(hwmon_path.iterdir()):
-                        if not hwdir.name.startswith("hwmon"):
-                            continue
-                        name_file = hwdir / "name"
-                        chip = name_file.read_text().strip() if name_file.exists() else hwdir.name
-                        for temp_input in sorted(hwdir.glob("temp*_input")):
-                            try:
-                                val = int((hwdir / temp_input.name).read_text().strip())
-                                temp_c = val / 1000
-                                label_file = hwdir / temp_input.name.replace("_input", "_label")
-                                sensor = label_file.read_text().strip() if label_file.exists() else temp_input.stem.replace("_input", "")
-                                temps.append({"chip": chip, "sensor": sensor, "temperature": temp_c})
-                            except (ValueError, OSError):
-                                pass
-            except OSError:
-                pass
+            # name, input e label di tutti i sensori in un solo passaggio
+            values = self._read_sysfs_values(
+                "/sys/class/hwmon/hwmon*/name",
+                "/sys/class/hwmon/hwmon*/temp*_input",
+                "/sys/class/hwmon/hwmon*/temp*_label",
+            )
+            for path in sorted(values):
+                if not path.endswith("_input"):
+                    continue
+                hwdir, _, input_name = path.rpartition('/')
+                try:
+                    temp_c = int(values[path]) / 1000
+                except ValueError:
+                    continue
+                chip = values.get(f"{hwdir}/name", hwdir.rsplit('/', 1)[-1])
+                sensor = input_name[:-len("_input")]
+                sensor = values.get(f"{hwdir}/{sensor}_label", sensor)
+                append({"chip": chip, "sensor": sensor, "temperature": temp_c})
         
         # 4. Fallback: /sys/class/thermal
         if not temps:
-            try:
-                thermal_path = Path("/sys/class/thermal")
-                if thermal_path.exists():
-                    for i, zdir in enumerate(sorted(thermal_path.glob("thermal_zone*"))):
-                        temp_file = zdir / "temp"
-                        type_file = zdir / "type"
-                        if temp_file.exists():
-                            try:
-                                val = int(temp_file.read_text().strip())
-                                temp_c = val / 1000
-                                zone_type = type_file.read_text().strip() if type_file.exists() else f"zone{i}"
-                                temps.append({"chip": "thermal_zone", "sensor": zone_type, "temperature": temp_c})
-                            except (ValueError, OSError):
-                                pass
-            except OSError:
-                pass
+            values = self._read_sysfs_values(
+                "/sys/class/thermal/thermal_zone*/temp", "/sys/class/thermal/thermal_zone*/type"
+            )
+            zone_dirs = sorted({path.rpartition('/')[0] for path in values})
+            for i, zdir in enumerate(zone_dirs):
+                temp_output = values.get(f"{zdir}/temp")
+                if not temp_output:
+                    continue
+                try:
+                    temp_c = int(temp_output) / 1000
+                except ValueError:
+                    continue
+                zone_type = values.get(f"{zdir}/type", f"zone{i}")
+                append({"chip": "thermal_zone", "sensor": zone_type, "temperature": temp_c})
         
         return temps
     
@@ -856,20 +1581,22 @@ class HardwareMonitor:
         info = {}
         
         # /proc/meminfo
-        output = self._run_command("cat /proc/meminfo 2>/dev/null")
+        output = self._read_sysfs("/proc/meminfo")
         if output:
-            for line in output.split('\n'):
-                if line.startswith("MemTotal:"):
-                    info["total_kb"] = int(line.split()[1])
-                elif line.startswith("MemAvailable:"):
-                    info["available_kb"] = int(line.split()[1])
-                elif line.startswith("SwapTotal:"):
-                    info["swap_total_kb"] = int(line.split()[1])
-                elif line.startswith("SwapFree:"):
-                    info["swap_free_kb"] = int(line.split()[1])
+            found = 0
+            wanted = len(_MEMINFO_FIELDS)
+            field_for = _MEMINFO_FIELDS.get
+            for line in output.splitlines():
+                key, _, value = line.partition(':')
+                field = field_for(key)
+                if field:
+                    info[field] = int(value.split(None, 1)[0])
+                    found += 1
+                    if found == wanted:
+                        break  # I campi successivi non servono
         
         # ECC info
-        output = self._run_command("edac-util -s 2>/dev/null")
+        output = self._run_command(["edac-util", "-s"])
         if output and "No errors" not in output:
             info["ecc_status"] = output.strip()
         else:
@@ -882,11 +1609,12 @@ class HardwareMonitor:
         raid_info = []
         
         # mdadm
-        output = self._run_command("cat /proc/mdstat 2>/dev/null")
+        output = self._read_sysfs("/proc/mdstat")
         if output and "md" in output:
-            for line in output.split('\n'):
+            for line in output.splitlines():
                 if line.startswith('md'):
-                    parts = line.split()
+                    # Servono solo nome, stato e livello: "md0 : active raid1 sda1[0] ..."
+                    parts = line.split(None, 4)
                     if len(parts) >= 3:
                         raid_info.append({
                             "type": "mdadm",
@@ -896,7 +1624,7 @@ class HardwareMonitor:
                         })
         
         # ZFS
-        output = self._run_command("zpool list -H -o name,health,size,alloc,free,cap 2>/dev/null")
+        output = self._run_command(["zpool", "list", "-H", "-o", "name,health,size,alloc,free,cap"])
         if output:
             for line in output.strip().split('\n'):
                 parts = line.split('\t')
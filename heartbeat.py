@@ -17,15 +17,28 @@ Copyright (c) 2024-2026 Domarc SRL - Tutti i diritti riservati.
 """
 
 import argparse
+import functools
+import importlib
 import json
 import logging
 import os
-import platform
+import random
 import socket
+import subprocess
 import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Version info
 try:
@@ -35,13 +48,186 @@ except ImportError:
     def get_version_string():
         return "Proxreporter (version unknown)"
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Il logging viene configurato in main(): l'import del modulo non tocca il root logger
 logger = logging.getLogger("proxreporter")
 
+# Output pveversion: "pve-manager/8.1.3/abc123 (running kernel: 6.5.11-8-pve)"
+_PVE_PREFIX = "pve-manager/"
+
+# Versione PVE in cache tra un heartbeat e l'altro (valida per il kernel in uso)
+_PVE_VERSION_CACHE = Path(__file__).resolve().parent / ".pve_version.cache"
+_PVE_VERSION_CACHE_TTL = 86400
+
+# Dati statici del sistema, letti una sola volta all'import (una sola uname())
+_UNAME = os.uname()
+_HOSTNAME = socket.gethostname()
+_PLATFORM_SYSTEM = _UNAME.sysname
+_PLATFORM_RELEASE = _UNAME.release
+_PYTHON_VERSION = "%d.%d.%d" % sys.version_info[:3]
+
+# Campi GELF comuni a tutti i messaggi del processo
+_GELF_BASE = {
+    "version": "1.1",
+    "host": _HOSTNAME,
+    "_app": "proxreporter",
+    "_app_version": __version__,
+    "_hostname": _HOSTNAME,
+}
+
+
+def _gelf_payload(gelf_msg: Dict[str, Any]) -> bytes:
+    """Serializza un messaggio GELF (orjson se disponibile) con il terminatore NUL"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(gelf_msg) + b'\0'
+    return json.dumps(gelf_msg, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\0'
+
+
+# Indirizzi risolti dei server GELF: (host, porta, tipo) -> [famiglia, sockaddr, usi].
+# Il DNS viene interrogato di nuovo ogni _HOST_ADDR_REFRESH utilizzi (TTL)
+_HOST_ADDR_CACHE: Dict[tuple, list] = {}
+_HOST_ADDR_REFRESH = 100
+
+
+def _resolve_host(host: str, port: int, sock_type: int) -> Tuple[int, tuple]:
+    """Risolve host:porta con getaddrinfo, riusando il risultato in cache"""
+    key = (host, port, sock_type)
+    entry = _HOST_ADDR_CACHE.get(key)
+    if entry is None or entry[2] >= _HOST_ADDR_REFRESH:
+        family, _, _, _, sockaddr = socket.getaddrinfo(host, port, type=sock_type)[0]
+        entry = [family, sockaddr, 0]
+        _HOST_ADDR_CACHE[key] = entry
+    entry[2] += 1
+    return entry[0], entry[1]
+
+
+def _tcp_peer_open(sock: socket.socket) -> bool:
+    """Verifica senza bloccare che il server non abbia chiuso la connessione TCP"""
+    timeout = sock.gettimeout()
+    sock.setblocking(False)
+    try:
+        return sock.recv(1, socket.MSG_PEEK) != b''
+    except BlockingIOError:
+        return True  # Nessun dato in arrivo: connessione aperta
+    except OSError:
+        return False
+    finally:
+        sock.settimeout(timeout)
+
+
+class GelfSender:
+    """
+    Connessione persistente verso il server GELF: la stessa connessione serve
+    heartbeat, stato hardware ed eventuali altri invii della stessa esecuzione.
+    """
+    
+    def __init__(self, host: str, port: int, protocol: str = "tcp",
+                 connect_timeout: float = 5, io_timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.protocol = protocol.lower()
+        self.connect_timeout = connect_timeout
+        self.io_timeout = io_timeout
+        self._sock: Optional[socket.socket] = None
+    
+    @classmethod
+    def from_config(cls, syslog_config: Dict[str, Any], default_port: int) -> "GelfSender":
+        """Crea il sender dalla sezione syslog della configurazione"""
+        return cls(
+            syslog_config.get("host", ""),
+            syslog_config.get("port", default_port),
+            syslog_config.get("protocol", "tcp"),
+            syslog_config.get("connect_timeout", 5),
+            syslog_config.get("io_timeout", 10),
+        )
+    
+    @property
+    def address(self) -> Tuple[str, int, str]:
+        return self.host, self.port, self.protocol
+    
+    def _connect(self) -> socket.socket:
+        """Apre il socket; anche UDP viene connesso, così send() evita la route lookup per pacchetto"""
+        if self.protocol == "tcp":
+            # create_connection applica il timeout già a connect() e prova tutti
+            # gli indirizzi risolti (host dual-stack o solo IPv6)
+            sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+            sock.settimeout(self.io_timeout)
+            # Messaggi piccoli: niente attesa di Nagle
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            return sock
+        
+        family, sockaddr = _resolve_host(self.host, self.port, socket.SOCK_DGRAM)
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            sock.connect(sockaddr)
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(self.io_timeout)
+        return sock
+    
+    def send(self, payload: bytes) -> None:
+        """Invia un payload GELF già terminato da NUL; riconnette una volta se la connessione è caduta"""
+        if self._sock is None or self._sock.fileno() == -1:
+            self._sock = self._connect()
+        elif self.protocol == "tcp" and not _tcp_peer_open(self._sock):
+            # Il server ha chiuso la connessione: sendall "riuscirebbe" perdendo il messaggio
+            self.close()
+            self._sock = self._connect()
+        
+        try:
+            self._sock.sendall(payload)
+        except (BrokenPipeError, ConnectionResetError, ConnectionRefusedError):
+            # TCP: connessione chiusa tra un invio e l'altro; UDP: errore ICMP
+            # di un invio precedente. In entrambi i casi si riprova una volta
+            self.close()
+            self._sock = self._connect()
+            self._sock.sendall(payload)
+        except OSError:
+            # Socket in stato incerto (es. timeout): non va riusato
+            self.close()
+            raise
+    
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+# Dimensione massima di un messaggio GELF UDP non frammentato
+_GELF_UDP_MAX = 8192
+
+
+def _deliver_gelf(message: bytes, syslog_config: Dict[str, Any], port: int,
+                  sender: Optional[GelfSender] = None, routine: bool = False) -> str:
+    """
+    Consegna un payload GELF e ritorna il protocollo usato.
+    
+    I messaggi di routine (heartbeat, stato hardware OK) viaggiano su UDP anche
+    con trasporto TCP se syslog.heartbeat_transport è "udp": la perdita di uno
+    di questi è tollerabile, warning e critical restano su TCP. La porta UDP è
+    syslog.udp_port se presente, altrimenti la stessa del messaggio.
+    """
+    if (routine and syslog_config.get("heartbeat_transport", "").lower() == "udp"
+            and len(message) < _GELF_UDP_MAX):
+        sender = GelfSender(syslog_config.get("host", ""), syslog_config.get("udp_port", port), "udp")
+        try:
+            sender.send(message)
+        finally:
+            sender.close()
+        return "udp"
+    
+    if sender is not None:
+        sender.send(message)
+        return sender.protocol
+    
+    own_sender = GelfSender.from_config(syslog_config, port)
+    try:
+        own_sender.send(message)
+    finally:
+        own_sender.close()
+    return own_sender.protocol
+
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """Carica la configurazione da file"""
@@ -49,105 +235,191 @@ def load_config(config_path: str) -> Dict[str, Any]:
         return json.load(f)
 
 
+@functools.lru_cache(maxsize=4)
+def _read_secret_key(install_dir: Path) -> Optional[bytes]:
+    """Chiave di cifratura letta una sola volta per processo"""
+    try:
+        return (install_dir / ".secret.key").read_bytes()
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _decrypt(encrypted: str, key: bytes) -> str:
+    """Decifra un valore "ENC:..." (memorizzato: ogni valore si decifra una volta)"""
+    # Import differito: cryptography serve solo se ci sono password cifrate
+    from cryptography.fernet import Fernet
+    return Fernet(key).decrypt(encrypted[4:].encode()).decode()
+
+
 def decrypt_password(encrypted: str, install_dir: Path) -> str:
     """Decripta una password se necessario"""
     if not encrypted or not encrypted.startswith("ENC:"):
         return encrypted
     
     try:
-        from cryptography.fernet import Fernet
-        key_file = install_dir / ".secret.key"
-        if key_file.exists():
-            with open(key_file, 'rb') as f:
-                key = f.read()
-            fernet = Fernet(key)
-            return fernet.decrypt(encrypted[4:].encode()).decode()
+        key = _read_secret_key(install_dir)
+        if key:
+            return _decrypt(encrypted, key)
     except Exception:
         pass
     return ""
 
 
-def get_system_info() -> Dict[str, Any]:
-    """Raccoglie informazioni sul sistema"""
-    info = {
-        'hostname': socket.gethostname(),
-        'platform': platform.system(),
-        'platform_release': platform.release(),
-        'python_version': platform.python_version(),
-        'proxreporter_version': __version__,
-    }
+# Snapshot recenti dei file di /proc: percorso -> (istante monotonic, contenuto)
+_PROC_CACHE: Dict[str, Tuple[float, bytes]] = {}
+_PROC_CACHE_TTL = 1.0
+
+
+def _get_proc(path: str) -> bytes:
+    """
+    Legge un file di /proc riusando il contenuto letto meno di
+    _PROC_CACHE_TTL secondi prima (solleva OSError se non leggibile).
+    """
+    now = time.monotonic()
+    cached = _PROC_CACHE.get(path)
+    if cached and now - cached[0] < _PROC_CACHE_TTL:
+        return cached[1]
+    # I file di /proc usati qui stanno in un buffer: una sola read() sul fd
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, 8192)
+    finally:
+        os.close(fd)
+    _PROC_CACHE[path] = (now, data)
+    return data
+
+
+def _meminfo_kb(buf: bytes, key: bytes) -> int:
+    """Estrae il valore (kB) di una chiave da /proc/meminfo cercandola direttamente nel buffer"""
+    idx = buf.find(b'\n' + key + b':')
+    if idx < 0:
+        if not buf.startswith(key + b':'):
+            return 0
+        start = len(key) + 1
+    else:
+        start = idx + len(key) + 2
+    end = buf.find(b'\n', start)
+    try:
+        return int(buf[start:end if end >= 0 else None].split()[0])
+    except (ValueError, IndexError):
+        return 0
+
+
+def _get_pve_version() -> Optional[str]:
+    """
+    Versione di Proxmox VE. pveversion (uno script Perl) viene eseguito solo
+    se la cache su disco manca, è scaduta o si riferisce a un altro kernel.
+    """
+    try:
+        with open(_PVE_VERSION_CACHE, 'r') as f:
+            cached = json.load(f)
+        if (cached.get("kernel") == _PLATFORM_RELEASE
+                and time.time() - cached.get("cached_at", 0) < _PVE_VERSION_CACHE_TTL
+                and cached.get("version")):
+            return cached["version"]
+    except (OSError, ValueError, AttributeError, TypeError):
+        pass
     
-    # Proxmox VE version
     try:
-        import subprocess
-        import re
         result = subprocess.run(
             ["pveversion"], capture_output=True, text=True, timeout=10
         )
-        if result.returncode == 0:
-            # Output: "pve-manager/8.1.3/abc123 (running kernel: 6.5.11-8-pve)"
-            match = re.match(r"pve-manager/([\d.]+)", result.stdout.strip())
-            if match:
-                info['pve_version'] = match.group(1)
-            else:
-                info['pve_version'] = result.stdout.strip().split()[0]
-    except:
-        pass
+    except (OSError, subprocess.SubprocessError):
+        return None
+    output = result.stdout.strip()
+    if result.returncode != 0 or not output:
+        return None
+    
+    first = output.split(None, 1)[0]
+    if first.startswith(_PVE_PREFIX):
+        version = first[len(_PVE_PREFIX):].partition('/')[0]
+    else:
+        version = first
     
-    # Kernel version
     try:
-        info['kernel_version'] = platform.release()
-    except:
+        with open(_PVE_VERSION_CACHE, 'w') as f:
+            json.dump({"version": version, "kernel": _PLATFORM_RELEASE, "cached_at": int(time.time())}, f)
+    except OSError:
         pass
+    return version
+
+
+def get_system_info() -> Dict[str, Any]:
+    """
+    Raccoglie informazioni sul sistema.
+    
+    I valori sono già scalari (int/float/str), pronti per i campi GELF.
+    """
+    info = {
+        'hostname': _HOSTNAME,
+        'platform': _PLATFORM_SYSTEM,
+        'platform_release': _PLATFORM_RELEASE,
+        'python_version': _PYTHON_VERSION,
+        'proxreporter_version': __version__,
+    }
+    
+    # Proxmox VE version
+    pve_version = _get_pve_version()
+    if pve_version:
+        info['pve_version'] = pve_version
+    
+    # Kernel version
+    info['kernel_version'] = _PLATFORM_RELEASE
     
     # Uptime (Linux)
     try:
-        with open('/proc/uptime', 'r') as f:
-            uptime_seconds = float(f.read().split()[0])
-            info['uptime_seconds'] = int(uptime_seconds)
-            info['uptime_hours'] = round(uptime_seconds / 3600, 1)
-            info['uptime_days'] = round(uptime_seconds / 86400, 1)
-            # Formato leggibile: "5d 3h 22m"
-            days = int(uptime_seconds // 86400)
-            hours = int((uptime_seconds % 86400) // 3600)
-            minutes = int((uptime_seconds % 3600) // 60)
-            info['uptime_formatted'] = f"{days}d {hours}h {minutes}m"
+        buf = _get_proc('/proc/uptime')
+        uptime_seconds = float(buf[:buf.find(b' ')])
+        info['uptime_seconds'] = int(uptime_seconds)
+        info['uptime_hours'] = round(uptime_seconds / 3600, 1)
+        info['uptime_days'] = round(uptime_seconds / 86400, 1)
+        # Formato leggibile: "5d 3h 22m"
+        days = int(uptime_seconds // 86400)
+        hours = int((uptime_seconds % 86400) // 3600)
+        minutes = int((uptime_seconds % 3600) // 60)
+        info['uptime_formatted'] = f"{days}d {hours}h {minutes}m"
     except:
         pass
     
     # Load average (Linux)
     try:
-        with open('/proc/loadavg', 'r') as f:
-            parts = f.read().split()
-            info['load_average'] = [float(parts[0]), float(parts[1]), float(parts[2])]
+        # I primi tre campi sono separati da spazi singoli: niente split
+        buf = _get_proc('/proc/loadavg')
+        p1 = buf.find(b' ')
+        p2 = buf.find(b' ', p1 + 1)
+        p3 = buf.find(b' ', p2 + 1)
+        if p1 < 0 or p2 < 0 or p3 < 0:
+            raise ValueError("formato /proc/loadavg inatteso")
+        # Come stringa: GELF accetta solo valori scalari
+        info['load_average'] = str([float(buf[:p1]), float(buf[p1 + 1:p2]), float(buf[p2 + 1:p3])])
     except:
         pass
     
     # Memory usage (Linux)
     try:
-        with open('/proc/meminfo', 'r') as f:
-            meminfo = {}
-            for line in f:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    meminfo[key.strip()] = int(value.strip().split()[0]) * 1024
-            
-            total = meminfo.get('MemTotal', 0)
-            available = meminfo.get('MemAvailable', 0)
-            if total > 0:
-                used_pct = round((total - available) / total * 100, 1)
-                info['memory_total_gb'] = round(total / (1024**3), 2)
-                info['memory_used_percent'] = used_pct
+        buf = _get_proc('/proc/meminfo')
+        
+        # Servono solo MemTotal e MemAvailable: niente parsing riga per riga
+        total = _meminfo_kb(buf, b'MemTotal') * 1024
+        available = _meminfo_kb(buf, b'MemAvailable') * 1024
+        
+        if total > 0:
+            used_pct = round((total - available) / total * 100, 1)
+            info['memory_total_gb'] = round(total / (1024**3), 2)
+            info['memory_used_percent'] = used_pct
     except:
         pass
     
     return info
 
 
-def send_heartbeat_gelf(config: Dict[str, Any], system_info: Dict[str, Any]) -> bool:
-    """Invia heartbeat in formato GELF al server Syslog"""
-    import time
-    
+def send_heartbeat_gelf(config: Dict[str, Any], system_info: Dict[str, Any],
+                        sender: Optional[GelfSender] = None) -> bool:
+    """
+    Invia heartbeat in formato GELF al server Syslog.
+    Con sender riusa la sua connessione, altrimenti ne apre una solo per questo invio.
+    """
     syslog_config = config.get("syslog", {})
     
     if not syslog_config.get("enabled", False):
@@ -163,47 +435,32 @@ def send_heartbeat_gelf(config: Dict[str, Any], system_info: Dict[str, Any]) ->
         return False
     
     # Costruisci messaggio GELF
-    hostname = system_info.get('hostname', socket.gethostname())
+    hostname = _HOSTNAME
     codcli = config.get("codcli", "")
     nomecliente = config.get("nomecliente", "")
     
     gelf_msg = {
-        "version": "1.1",
-        "host": hostname,
+        **_GELF_BASE,
         "short_message": f"HEARTBEAT: {hostname} online - Proxreporter v{__version__}",
         "full_message": f"Sistema {hostname} ({codcli} - {nomecliente}) attivo e funzionante",
         "timestamp": time.time(),
         "level": 6,  # INFO
         # Campi comuni standard
-        "_app": "proxreporter",
         "_module": "heartbeat",
-        "_app_version": __version__,
         "_event": "heartbeat",
         "_message_type": "HEARTBEAT",
         "_client_code": codcli,
         "_client_name": nomecliente,
-        "_hostname": hostname,
         "_status": "success",
     }
     
     # Aggiungi info sistema
-    for key, value in system_info.items():
-        if key != 'hostname':
-            gelf_msg[f"_{key}"] = str(value) if not isinstance(value, (int, float)) else value
+    gelf_msg.update({f"_{key}": value for key, value in system_info.items() if key != 'hostname'})
     
-    message = (json.dumps(gelf_msg) + '\0').encode('utf-8')
+    message = _gelf_payload(gelf_msg)
     
     try:
-        if protocol == "tcp":
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(10)
-            sock.connect((host, port))
-            sock.sendall(message)
-            sock.close()
-        else:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.sendto(message, (host, port))
-            sock.close()
+        protocol = _deliver_gelf(message, syslog_config, port, sender, routine=True)
         
         logger.info(f"✓ Heartbeat inviato a {host}:{port} ({protocol.upper()})")
         return True
@@ -212,10 +469,33 @@ def send_heartbeat_gelf(config: Dict[str, Any], system_info: Dict[str, Any]) ->
         return False
 
 
-def send_hardware_status_gelf(config: Dict[str, Any], hw_status: Dict[str, Any]) -> bool:
-    """Invia stato hardware in formato GELF al server Syslog porta 8514"""
-    import time
-    
+# Campi GELF per disco/sensore/RAID: (suffisso, chiave, default);
+# default None = campo incluso solo se presente
+_GELF_DISK_FIELDS = (
+    ("device", "device", ""),
+    ("model", "model", ""),
+    ("smart", "smart_status", ""),
+    ("temp", "temperature", None),
+    ("reallocated", "reallocated_sectors", None),
+)
+_GELF_TEMP_FIELDS = (
+    ("chip", "chip", ""),
+    ("sensor", "sensor", ""),
+    ("value", "temperature", 0),
+)
+_GELF_RAID_FIELDS = (
+    ("type", "type", ""),
+    ("device", "device", ""),
+    ("status", "status", ""),
+)
+
+
+def send_hardware_status_gelf(config: Dict[str, Any], hw_status: Dict[str, Any],
+                              sender: Optional[GelfSender] = None) -> bool:
+    """
+    Invia stato hardware in formato GELF al server Syslog porta 8514.
+    Con sender riusa la sua connessione, altrimenti ne apre una solo per questo invio.
+    """
     syslog_config = config.get("syslog", {})
     
     if not syslog_config.get("enabled", False):
@@ -228,7 +508,7 @@ def send_hardware_status_gelf(config: Dict[str, Any], hw_status: Dict[str, Any])
     if not host:
         return False
     
-    hostname = socket.gethostname()
+    hostname = _HOSTNAME
     codcli = config.get("codcli", "")
     nomecliente = config.get("nomecliente", "")
     
@@ -243,91 +523,83 @@ def send_hardware_status_gelf(config: Dict[str, Any], hw_status: Dict[str, Any])
     else:
         level = 6  # INFO
     
-    # Costruisci messaggio GELF
-    gelf_msg = {
-        "version": "1.1",
-        "host": hostname,
+    by_component = summary.get("by_component", {})
+    header = {
         "short_message": f"HARDWARE_STATUS: {overall_status} - {hostname}",
         "full_message": f"Hardware check su {hostname}: {summary.get('total_alerts', 0)} alert ({summary.get('critical', 0)} critical, {summary.get('warning', 0)} warning)",
         "timestamp": time.time(),
         "level": level,
         # Campi comuni standard
-        "_app": "proxreporter",
         "_module": "hardware_monitor",
-        "_app_version": __version__,
         "_event": "hardware.status",
         "_message_type": "HARDWARE_STATUS",
         "_client_code": codcli,
         "_client_name": nomecliente,
-        "_hostname": hostname,
         "_status": overall_status,
         # Campi specifici
         "_total_alerts": summary.get("total_alerts", 0),
         "_critical_count": summary.get("critical", 0),
         "_warning_count": summary.get("warning", 0),
-        "_disk_alerts": summary.get("by_component", {}).get("disk", 0),
-        "_memory_alerts": summary.get("by_component", {}).get("memory", 0),
-        "_raid_alerts": summary.get("by_component", {}).get("raid", 0),
-        "_temperature_alerts": summary.get("by_component", {}).get("temperature", 0),
-        "_kernel_alerts": summary.get("by_component", {}).get("kernel", 0),
+        "_disk_alerts": by_component.get("disk", 0),
+        "_memory_alerts": by_component.get("memory", 0),
+        "_raid_alerts": by_component.get("raid", 0),
+        "_temperature_alerts": by_component.get("temperature", 0),
+        "_kernel_alerts": by_component.get("kernel", 0),
     }
     
-    # Aggiungi info dischi (max 5)
+    # Info dischi (max 5)
     disks = hw_status.get("disks", [])
-    gelf_msg["_disk_count"] = len(disks)
-    for i, disk in enumerate(disks[:5]):
-        prefix = f"_disk_{i}"
-        gelf_msg[f"{prefix}_device"] = disk.get("device", "")
-        gelf_msg[f"{prefix}_model"] = disk.get("model", "")
-        gelf_msg[f"{prefix}_smart"] = disk.get("smart_status", "")
-        if "temperature" in disk:
-            gelf_msg[f"{prefix}_temp"] = disk.get("temperature", 0)
-        if "reallocated_sectors" in disk:
-            gelf_msg[f"{prefix}_reallocated"] = disk.get("reallocated_sectors", 0)
-    
-    # Aggiungi temperature (max 10)
-    temps = hw_status.get("temperatures", [])
-    gelf_msg["_temp_sensor_count"] = len(temps)
-    max_temp = 0
-    for i, temp in enumerate(temps[:10]):
-        t = temp.get("temperature", 0)
-        if t > max_temp:
-            max_temp = t
-        prefix = f"_temp_{i}"
-        gelf_msg[f"{prefix}_chip"] = temp.get("chip", "")
-        gelf_msg[f"{prefix}_sensor"] = temp.get("sensor", "")
-        gelf_msg[f"{prefix}_value"] = t
-    gelf_msg["_temp_max"] = max_temp
-    
-    # Aggiungi info memoria
+    disk_fields = {
+        f"_disk_{i}_{name}": disk.get(key, default)
+        for i, disk in enumerate(disks[:5])
+        for name, key, default in _GELF_DISK_FIELDS
+        if default is not None or key in disk
+    }
+    
+    # Temperature (max 10)
+    temps = hw_status.get("temperatures", [])[:10]
+    temp_fields = {
+        f"_temp_{i}_{name}": temp.get(key, default)
+        for i, temp in enumerate(temps)
+        for name, key, default in _GELF_TEMP_FIELDS
+    }
+    max_temp = max([0, *(temp.get("temperature", 0) for temp in temps)])
+    
+    # Info memoria
     mem = hw_status.get("memory", {})
-    if mem:
-        gelf_msg["_mem_total_gb"] = round(mem.get("total_kb", 0) / 1024 / 1024, 2)
-        gelf_msg["_mem_available_gb"] = round(mem.get("available_kb", 0) / 1024 / 1024, 2)
-        gelf_msg["_mem_ecc_status"] = mem.get("ecc_status", "unknown")
+    mem_fields = {
+        "_mem_total_gb": round(mem.get("total_kb", 0) / 1024 / 1024, 2),
+        "_mem_available_gb": round(mem.get("available_kb", 0) / 1024 / 1024, 2),
+        "_mem_ecc_status": mem.get("ecc_status", "unknown"),
+    } if mem else {}
     
-    # Aggiungi info RAID (max 5)
+    # Info RAID (max 5)
     raids = hw_status.get("raid", [])
-    gelf_msg["_raid_count"] = len(raids)
-    for i, raid in enumerate(raids[:5]):
-        prefix = f"_raid_{i}"
-        gelf_msg[f"{prefix}_type"] = raid.get("type", "")
-        gelf_msg[f"{prefix}_device"] = raid.get("device", "")
-        gelf_msg[f"{prefix}_status"] = raid.get("status", "")
+    raid_fields = {
+        f"_raid_{i}_{name}": raid.get(key, default)
+        for i, raid in enumerate(raids[:5])
+        for name, key, default in _GELF_RAID_FIELDS
+    }
+    
+    # Costruisci messaggio GELF con un'unica fusione dei blocchi
+    gelf_msg = {
+        **_GELF_BASE,
+        **header,
+        "_disk_count": len(disks),
+        **disk_fields,
+        "_temp_sensor_count": len(hw_status.get("temperatures", [])),
+        **temp_fields,
+        "_temp_max": max_temp,
+        **mem_fields,
+        "_raid_count": len(raids),
+        **raid_fields,
+    }
     
-    message = (json.dumps(gelf_msg) + '\0').encode('utf-8')
+    message = _gelf_payload(gelf_msg)
     
     try:
-        if protocol == "tcp":
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(10)
-            sock.connect((host, port))
-            sock.sendall(message)
-            sock.close()
-        else:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.sendto(message, (host, port))
-            sock.close()
+        # Solo lo stato "ok" (INFO) è un messaggio di routine
+        _deliver_gelf(message, syslog_config, port, sender, routine=(level == 6))
         
         logger.info(f"✓ Hardware status inviato a {host}:{port}")
         return True
@@ -336,6 +608,44 @@ def send_hardware_status_gelf(config: Dict[str, Any], hw_status: Dict[str, Any])
         return False
 
 
+# Attesa massima (secondi) prima di scaricare un aggiornamento via git
+UPDATE_STAGGER_SECONDS = 300
+
+
+def _version_tuple(version: str) -> List[int]:
+    return [int(x) for x in version.split('.')]
+
+
+def _load_update_cache(cache_file: Path) -> Dict[str, str]:
+    """Legge la cache del check aggiornamenti ({} se assente o illeggibile)"""
+    try:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_update_cache(cache_file: Path, headers: Any, version: str) -> None:
+    """
+    Memorizza ETag/Last-Modified di un version.py che non richiede aggiornamenti.
+    Non va salvata prima di un aggiornamento: se fallisse, il 304 successivo
+    impedirebbe di riprovare.
+    """
+    cache = {
+        "etag": headers.get("ETag", ""),
+        "last_modified": headers.get("Last-Modified", ""),
+        "version": version,
+    }
+    if not cache["etag"] and not cache["last_modified"]:
+        return
+    try:
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+
 def check_and_update() -> Optional[str]:
     """
     Verifica se è disponibile una nuova versione e aggiorna se necessario.
@@ -344,16 +654,37 @@ def check_and_update() -> Optional[str]:
     Returns:
         Nuova versione se aggiornato, None altrimenti
     """
-    import subprocess
-    import urllib.request
-    
     install_dir = Path(__file__).resolve().parent
     version_url = "https://raw.githubusercontent.com/grandir66/Proxreporter/main/version.py"
+    # Validatori dell'ultimo version.py già verificato: se invariato il server risponde 304
+    cache_file = install_dir / ".update_cache.json"
     
     try:
-        # Scarica solo version.py remoto (pochi bytes)
-        with urllib.request.urlopen(version_url, timeout=10) as response:
-            remote_content = response.read().decode('utf-8')
+        headers = {}
+        cache = _load_update_cache(cache_file)
+        try:
+            # Richiesta condizionale solo se la versione in cache non è più recente
+            # di quella locale (es. installazione riportata indietro a mano)
+            cache_valid = _version_tuple(cache.get("version", "")) <= _version_tuple(__version__)
+        except ValueError:
+            cache_valid = False
+        if cache_valid:
+            if cache.get("etag"):
+                headers["If-None-Match"] = cache["etag"]
+            if cache.get("last_modified"):
+                headers["If-Modified-Since"] = cache["last_modified"]
+        
+        # Scarica solo version.py remoto (pochi bytes), con GET condizionale
+        request = urllib.request.Request(version_url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=3) as response:
+                remote_content = response.read().decode('utf-8')
+                response_headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                logger.debug(f"Versione {__version__} è aggiornata (version.py invariato)")
+                return None
+            raise
         
         # Estrai versione remota
         remote_version = None
@@ -368,13 +699,15 @@ def check_and_update() -> Optional[str]:
         # Confronta con versione locale
         if remote_version == __version__:
             logger.debug(f"Versione {__version__} è aggiornata")
+            _save_update_cache(cache_file, response_headers, remote_version)
             return None
         
         # Versione diversa, verifica se è più recente
-        local_parts = [int(x) for x in __version__.split('.')]
-        remote_parts = [int(x) for x in remote_version.split('.')]
+        local_parts = _version_tuple(__version__)
+        remote_parts = _version_tuple(remote_version)
         
         if remote_parts <= local_parts:
+            _save_update_cache(cache_file, response_headers, remote_version)
             return None
         
         logger.info(f"→ Nuova versione disponibile: {__version__} -> {remote_version}")
@@ -383,17 +716,19 @@ def check_and_update() -> Optional[str]:
         git_dir = install_dir / ".git"
         
         if git_dir.exists():
-            # Aggiornamento via git
+            # Attesa casuale: gli host eseguono il cron tutti al minuto 0 e non
+            # devono scaricare l'aggiornamento da GitHub nello stesso istante
+            time.sleep(random.uniform(0, UPDATE_STAGGER_SECONDS))
+            
+            # Aggiornamento via git: solo l'ultimo commit di main, senza tag
             result = subprocess.run(
-                ["git", "fetch", "origin"],
-                cwd=install_dir,
+                ["git", "-C", str(install_dir), "fetch", "--depth=1", "--no-tags", "origin", "main"],
                 capture_output=True,
                 timeout=30
             )
             if result.returncode == 0:
                 result = subprocess.run(
-                    ["git", "reset", "--hard", "origin/main"],
-                    cwd=install_dir,
+                    ["git", "-C", str(install_dir), "reset", "--hard", "FETCH_HEAD"],
                     capture_output=True,
                     timeout=30
                 )
@@ -443,21 +778,34 @@ def main():
     parser.add_argument("--no-update", action="store_true", help="Non verificare aggiornamenti")
     args = parser.parse_args()
     
+    # Setup logging: pid/thread/process non compaiono nel formato, non vanno raccolti
+    logging.logProcesses = False
+    logging.logThreads = False
+    logging.logMultiprocessing = False
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    
     if args.verbose:
         logger.setLevel(logging.DEBUG)
     
-    # Verifica aggiornamenti (prima di tutto)
-    updated_version = None
-    if not args.no_update:
-        updated_version = check_and_update()
-        if updated_version:
-            # Se aggiornato, ricarica il modulo version
-            try:
-                import importlib
-                import version as ver_module
-                importlib.reload(ver_module)
-            except:
-                pass
+    # Verifica aggiornamenti e raccolta info sistema sono indipendenti e
+    # dominate dall'I/O: girano in parallelo
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        update_future = pool.submit(check_and_update) if not args.no_update else None
+        info_future = pool.submit(get_system_info)
+        updated_version = update_future.result() if update_future else None
+        system_info = info_future.result()
+    
+    if updated_version:
+        # Se aggiornato, ricarica il modulo version
+        try:
+            import version as ver_module
+            importlib.reload(ver_module)
+        except:
+            pass
     
     # Carica configurazione
     config_path = Path(args.config)
@@ -476,9 +824,6 @@ def main():
         config["codcli"] = config.get("codcli", config["client"].get("codcli", ""))
         config["nomecliente"] = config.get("nomecliente", config["client"].get("nomecliente", ""))
     
-    # Raccogli info sistema
-    system_info = get_system_info()
-    
     # Aggiungi info aggiornamento se presente
     if updated_version:
         system_info['updated_to_version'] = updated_version
@@ -487,8 +832,16 @@ def main():
     if args.verbose:
         logger.info(f"Sistema: {system_info}")
     
-    # Invia heartbeat
-    success = send_heartbeat_gelf(config, system_info)
+    # Una connessione per server GELF, condivisa da tutti gli invii di questa esecuzione
+    syslog_config = config.get("syslog", {})
+    heartbeat_sender = GelfSender.from_config(syslog_config, 514)
+    hw_sender = GelfSender.from_config(syslog_config, 8514)
+    if hw_sender.address == heartbeat_sender.address:
+        hw_sender = heartbeat_sender
+    
+    # Invia heartbeat in background: non dipende dal controllo hardware
+    heartbeat_pool = ThreadPoolExecutor(max_workers=1)
+    heartbeat_future = heartbeat_pool.submit(send_heartbeat_gelf, config, system_info, heartbeat_sender)
     
     # Esegui controllo hardware se abilitato
     hw_config = config.get("hardware_monitoring", {})
@@ -500,13 +853,18 @@ def main():
             hw_monitor.run_all_checks()
             hw_status = hw_monitor.get_full_status()
             
+            # Il sender può essere condiviso con l'heartbeat: si attende il suo invio
+            heartbeat_future.result()
             # Invia riepilogo hardware a syslog porta 8514
-            send_hardware_status_gelf(config, hw_status)
+            send_hardware_status_gelf(config, hw_status, hw_sender)
         except ImportError:
             logger.debug("Hardware Monitor non disponibile")
         except Exception as e:
             logger.warning(f"Errore Hardware Monitor: {e}")
     
+    success = heartbeat_future.result()
+    heartbeat_pool.shutdown()
+    
     # Esegui PVE Monitor se abilitato (invia stato backup/storage/servizi)
     pve_config = config.get("pve_monitor", {})
     if pve_config.get("enabled", False):
@@ -520,6 +878,8 @@ def main():
         except Exception as e:
             logger.warning(f"Errore PVE Monitor: {e}")
     
+    heartbeat_sender.close()
+    hw_sender.close()
     sys.exit(0 if success else 1)
 
 
@@ -1,4 +1,5 @@
 import os
+import functools
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -6,13 +7,37 @@ import jinja2
 
 logger = logging.getLogger("proxreporter")
 
+# Template compilati salvati tra un'esecuzione e l'altra (cron)
+JINJA_CACHE_DIR = "/var/cache/proxreport/jinja"
+
+
+def _bytecode_cache():
+    """Cache su disco dei template compilati, None se la directory non è utilizzabile"""
+    try:
+        os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    except OSError:
+        return None
+    if not os.access(JINJA_CACHE_DIR, os.W_OK):
+        return None
+    return jinja2.FileSystemBytecodeCache(directory=JINJA_CACHE_DIR, pattern='%s.cache')
+
+
+@functools.lru_cache(maxsize=4)
+def _get_env(template_dir):
+    """Environment condiviso per directory: i template vengono compilati una sola volta"""
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_dir),
+        autoescape=jinja2.select_autoescape(['html', 'xml']),
+        bytecode_cache=_bytecode_cache(),
+        # I template non cambiano durante l'esecuzione: niente stat() a ogni render
+        auto_reload=False
+    )
+
+
 class HTMLReporter:
     def __init__(self, template_dir):
         self.template_dir = template_dir
-        self.env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(template_dir),
-            autoescape=jinja2.select_autoescape(['html', 'xml'])
-        )
+        self.env = _get_env(str(template_dir))
     
     def generate_report(self, data, output_path):
         """
@@ -29,10 +54,22 @@ class HTMLReporter:
             if 'date_generated' not in data:
                 data['date_generated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
-            html_content = template.render(**data)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            # Scrittura a blocchi: l'HTML completo non viene mai materializzato in memoria.
+            # Il render va su un file temporaneo nella stessa directory, sostituito
+            # atomicamente: un errore a metà non lascia un report troncato
+            stream = template.stream(**data)
+            stream.enable_buffering(size=32)
+            tmp_path = f"{output_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    stream.dump(f, encoding='utf-8')
+                os.replace(tmp_path, output_path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
             
             logger.info(f"✓ Report HTML generato: {output_path}")
             return True
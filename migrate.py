@@ -17,16 +17,33 @@ Uso:
 """
 
 import argparse
+import fcntl
+import functools
 import json
 import logging
 import os
 import shutil
+import stat
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# pygit2 (libgit2 in-process) opzionale: fallback al comando git
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -56,6 +73,12 @@ PRESERVE_FILES = [
     ".encryption_key",
 ]
 
+# Thread per la copia dei file nel backup della vecchia installazione
+BACKUP_COPY_WORKERS = 8
+
+# ioctl Linux per il reflink (copia copy-on-write) di un file: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
 # Vecchi cron job da rimuovere
 OLD_CRON_PATTERNS = [
     "proxreport",
@@ -71,6 +94,42 @@ REQUIRED_PACKAGES = ["git", "python3", "pip3"]
 PACKAGE_MAP = {"pip3": "python3-pip"}
 
 
+def _json_loads(data: bytes) -> Any:
+    """Decodifica JSON usando orjson se disponibile (solleva ValueError)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=1024)
+def _stat(path: str) -> Optional[os.stat_result]:
+    """
+    os.stat memorizzato: i passi della migrazione interrogano più volte gli
+    stessi percorsi. La cache va svuotata con _invalidate_stat_cache() dopo
+    ogni modifica al filesystem.
+    """
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _exists(path: Path) -> bool:
+    """Equivalente di Path.exists() tramite la cache di stat"""
+    return _stat(str(path)) is not None
+
+
+def _is_dir(path: Path) -> bool:
+    """Equivalente di Path.is_dir() tramite la cache di stat"""
+    st = _stat(str(path))
+    return st is not None and stat.S_ISDIR(st.st_mode)
+
+
+def _invalidate_stat_cache() -> None:
+    """Svuota la cache di stat dopo una modifica al filesystem"""
+    _stat.cache_clear()
+
+
 class MigrationResult:
     """Risultato della migrazione"""
     def __init__(self):
@@ -86,11 +145,11 @@ class MigrationResult:
         self.actions: List[str] = []
 
 
-def run_command(cmd: str, check: bool = False) -> Tuple[int, str, str]:
-    """Esegue un comando shell"""
+def run_command(argv: List[str], check: bool = False, input: Optional[str] = None) -> Tuple[int, str, str]:
+    """Esegue un comando (lista argv, senza shell); input opzionale su stdin"""
     try:
         result = subprocess.run(
-            cmd, shell=True, capture_output=True, text=True, timeout=120
+            argv, input=input, capture_output=True, text=True, timeout=120
         )
         return result.returncode, result.stdout, result.stderr
     except subprocess.TimeoutExpired:
@@ -107,8 +166,7 @@ def check_and_install_dependencies(result: MigrationResult) -> bool:
     missing = []
     
     for pkg in REQUIRED_PACKAGES:
-        code, _, _ = run_command(f"which {pkg}")
-        if code != 0:
+        if not shutil.which(pkg):
             missing.append(pkg)
     
     if not missing:
@@ -120,13 +178,13 @@ def check_and_install_dependencies(result: MigrationResult) -> bool:
     
     # Rileva package manager
     pkg_manager = None
-    if run_command("which apt-get")[0] == 0:
+    if shutil.which("apt-get"):
         pkg_manager = "apt"
-    elif run_command("which yum")[0] == 0:
+    elif shutil.which("yum"):
         pkg_manager = "yum"
-    elif run_command("which dnf")[0] == 0:
+    elif shutil.which("dnf"):
         pkg_manager = "dnf"
-    elif run_command("which apk")[0] == 0:
+    elif shutil.which("apk"):
         pkg_manager = "apk"
     
     if not pkg_manager:
@@ -135,7 +193,7 @@ def check_and_install_dependencies(result: MigrationResult) -> bool:
     
     # apt-get update: non fatale (Proxmox enterprise repos possono fallire senza licenza)
     if pkg_manager == "apt":
-        code, _, _ = run_command("apt-get update -qq 2>/dev/null")
+        code, _, _ = run_command(["apt-get", "update", "-qq"])
         if code != 0:
             logger.warning("  ⚠ apt-get update con errori (repo enterprise?) - continuo comunque")
     
@@ -145,13 +203,13 @@ def check_and_install_dependencies(result: MigrationResult) -> bool:
         logger.info(f"  Installazione {apt_pkg}...")
         
         if pkg_manager == "apt":
-            code, _, stderr = run_command(f"apt-get install -y -qq {apt_pkg} 2>/dev/null")
+            code, _, stderr = run_command(["apt-get", "install", "-y", "-qq", apt_pkg])
         elif pkg_manager == "yum":
-            code, _, stderr = run_command(f"yum install -y -q {apt_pkg}")
+            code, _, stderr = run_command(["yum", "install", "-y", "-q", apt_pkg])
         elif pkg_manager == "dnf":
-            code, _, stderr = run_command(f"dnf install -y -q {apt_pkg}")
+            code, _, stderr = run_command(["dnf", "install", "-y", "-q", apt_pkg])
         elif pkg_manager == "apk":
-            code, _, stderr = run_command(f"apk add --quiet {apt_pkg}")
+            code, _, stderr = run_command(["apk", "add", "--quiet", apt_pkg])
         else:
             code, stderr = 1, "Package manager non supportato"
         
@@ -166,42 +224,61 @@ def check_and_install_dependencies(result: MigrationResult) -> bool:
     return True
 
 
+# File che identificano una directory Proxreporter
+OLD_INSTALL_MARKERS = frozenset({"config.json", "proxmox_core.py", "setup.py"})
+
+
 def find_old_installation() -> Optional[Path]:
     """Trova la vecchia installazione"""
     for path in OLD_PATHS:
-        if path.exists():
-            # Verifica se contiene file Proxreporter
-            if (path / "config.json").exists() or \
-               (path / "proxmox_core.py").exists() or \
-               (path / "setup.py").exists():
-                return path
+        # Una sola lettura della directory al posto di uno stat per file cercato;
+        # se la directory non esiste scandir fallisce e si passa oltre
+        try:
+            it = os.scandir(path)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        try:
+            names = {entry.name for entry in it}
+        finally:
+            it.close()
+        
+        # Verifica se contiene file Proxreporter
+        if names & OLD_INSTALL_MARKERS:
+            return path
     return None
 
 
 def is_git_installation(path: Path) -> bool:
     """Verifica se è un'installazione Git"""
-    return (path / ".git").is_dir()
+    return _is_dir(path / ".git")
+
+
+def _read_version(version_file: Path) -> Optional[str]:
+    """Legge __version__ da version.py riga per riga, fermandosi alla prima occorrenza"""
+    try:
+        with version_file.open('r', encoding='utf-8') as f:
+            for line in f:
+                if '__version__' in line and '=' in line:
+                    return line.split('=', 1)[1].strip().strip('"\'')
+    except (OSError, UnicodeDecodeError):
+        pass
+    return None
 
 
 def get_old_version(path: Path) -> Optional[str]:
     """Recupera la versione dalla vecchia installazione"""
     # Prova version.py
     version_file = path / "version.py"
-    if version_file.exists():
-        try:
-            content = version_file.read_text()
-            for line in content.split('\n'):
-                if '__version__' in line and '=' in line:
-                    version = line.split('=')[1].strip().strip('"\'')
-                    return version
-        except:
-            pass
+    if _exists(version_file):
+        version = _read_version(version_file)
+        if version:
+            return version
     
     # Prova config.json
     config_file = path / "config.json"
-    if config_file.exists():
+    if _exists(config_file):
         try:
-            config = json.loads(config_file.read_text())
+            config = _json_loads(config_file.read_bytes())
             return config.get("_version", config.get("version", "unknown"))
         except:
             pass
@@ -218,10 +295,9 @@ def load_old_config(path: Path) -> Optional[Dict[str, Any]]:
     ]
     
     for config_path in config_paths:
-        if config_path.exists():
+        if _exists(config_path):
             try:
-                content = config_path.read_text()
-                return json.loads(content)
+                return _json_loads(config_path.read_bytes())
             except Exception as e:
                 logger.warning(f"Errore lettura {config_path}: {e}")
     
@@ -481,13 +557,66 @@ def prompt_missing_config(config: Dict[str, Any], result: MigrationResult) -> Di
     return config
 
 
+def _clone_or_copy(src: str, dst: str) -> None:
+    """
+    Copia un file via reflink (FICLONE) se il filesystem lo supporta
+    (btrfs, XFS con reflink, ...), altrimenti con shutil.copy2.
+    Il clone condivide i blocchi su disco ma resta indipendente dall'originale:
+    una modifica successiva all'installazione non altera il backup.
+    
+    Solo file regolari: aprire una FIFO bloccherebbe la migrazione, quindi
+    (come shutil.copytree) i file speciali sono un errore.
+    """
+    if not stat.S_ISREG(os.stat(src).st_mode):
+        raise shutil.SpecialFileError(f"`{src}` non è un file regolare")
+    
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except OSError:
+        # EOPNOTSUPP/EXDEV/EINVAL/ENOTTY: reflink non disponibile, copia i dati
+        shutil.copy2(src, dst)
+        return
+    shutil.copystat(src, dst)
+
+
+def _raise_walk_error(error: OSError) -> None:
+    """onerror per os.walk: una directory illeggibile renderebbe il backup incompleto"""
+    raise error
+
+
+def _fast_copytree(src: Path, dst: Path, workers: int = BACKUP_COPY_WORKERS) -> None:
+    """
+    Equivalente di shutil.copytree con i file copiati in parallelo.
+    Le directory vengono create dal thread chiamante prima dei file che
+    contengono; i metadati delle directory sono copiati alla fine, quando
+    la scrittura dei file non ne altera più la mtime.
+    """
+    dirs = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for root, _, files in os.walk(src, onerror=_raise_walk_error, followlinks=True):
+            target = os.path.join(dst, os.path.relpath(root, src))
+            # Come copytree: errore se la destinazione esiste già
+            os.makedirs(target)
+            dirs.append((root, target))
+            for name in files:
+                futures.append(pool.submit(_clone_or_copy, os.path.join(root, name), os.path.join(target, name)))
+        for future in futures:
+            future.result()
+    
+    for root, target in reversed(dirs):
+        shutil.copystat(root, target)
+
+
 def backup_old_installation(old_path: Path, result: MigrationResult) -> Optional[Path]:
     """Crea backup della vecchia installazione"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = old_path.parent / f"{old_path.name}_backup_{timestamp}"
     
     try:
-        shutil.copytree(old_path, backup_path)
+        _fast_copytree(old_path, backup_path)
+        _invalidate_stat_cache()
         result.actions.append(f"Backup creato: {backup_path}")
         return backup_path
     except Exception as e:
@@ -513,21 +642,22 @@ def extract_config_from_cron() -> Optional[Dict[str, Any]]:
     ]
     
     for cron_file in cron_files:
-        if cron_file.exists():
+        if _exists(cron_file):
             try:
                 cron_lines.extend(cron_file.read_text().split('\n'))
             except:
                 pass
     
     # Cerca nel crontab utente
-    code, stdout, _ = run_command("crontab -l 2>/dev/null")
+    code, stdout, _ = run_command(["crontab", "-l"])
     if code == 0 and stdout:
         cron_lines.extend(stdout.split('\n'))
     
     # Cerca nel crontab di root
-    code, stdout, _ = run_command("cat /var/spool/cron/crontabs/root 2>/dev/null")
-    if code == 0 and stdout:
-        cron_lines.extend(stdout.split('\n'))
+    try:
+        cron_lines.extend(Path("/var/spool/cron/crontabs/root").read_text().split('\n'))
+    except OSError:
+        pass
     
     # Analizza le linee per estrarre parametri
     for line in cron_lines:
@@ -573,18 +703,19 @@ def remove_old_cron_jobs(result: MigrationResult, dry_run: bool = False) -> Opti
     ]
     
     for cron_file in cron_files:
-        if cron_file.exists():
+        if _exists(cron_file):
             if dry_run:
                 result.actions.append(f"[DRY-RUN] Rimuoverei: {cron_file}")
             else:
                 try:
                     cron_file.unlink()
+                    _invalidate_stat_cache()
                     result.actions.append(f"Rimosso vecchio cron: {cron_file}")
                 except Exception as e:
                     result.warnings.append(f"Errore rimozione {cron_file}: {e}")
     
     # Controlla anche crontab utente
-    code, stdout, _ = run_command("crontab -l 2>/dev/null")
+    code, stdout, _ = run_command(["crontab", "-l"])
     if code == 0 and stdout:
         new_crontab = []
         removed = False
@@ -601,11 +732,46 @@ def remove_old_cron_jobs(result: MigrationResult, dry_run: bool = False) -> Opti
         
         if removed and not dry_run:
             new_content = '\n'.join(new_crontab)
-            run_command(f"echo '{new_content}' | crontab -")
+            # Il contenuto passa su stdin: nessun quoting shell da gestire
+            run_command(["crontab", "-"], input=new_content)
     
     return extracted_config
 
 
+def _git_update(install_dir: Path) -> Tuple[bool, str]:
+    """Allinea un repository esistente a origin/BRANCH (fetch + reset --hard)"""
+    if PYGIT2_AVAILABLE:
+        try:
+            repo = pygit2.Repository(str(install_dir))
+            repo.remotes["origin"].fetch()
+            target = repo.lookup_reference(f"refs/remotes/origin/{BRANCH}").target
+            repo.reset(target, pygit2.GIT_RESET_HARD)
+            return True, ""
+        except Exception as e:
+            logger.debug(f"  pygit2 update fallito ({e}), uso git")
+    
+    code, _, stderr = run_command(["git", "-C", str(install_dir), "fetch", "origin"])
+    if code != 0:
+        return False, stderr
+    code, _, stderr = run_command(["git", "-C", str(install_dir), "reset", "--hard", f"origin/{BRANCH}"])
+    return code == 0, stderr
+
+
+def _git_clone(install_dir: Path) -> Tuple[bool, str]:
+    """Clona il repository (branch BRANCH) in install_dir"""
+    if PYGIT2_AVAILABLE:
+        try:
+            pygit2.clone_repository(REPO_URL, str(install_dir), checkout_branch=BRANCH)
+            return True, ""
+        except Exception as e:
+            logger.debug(f"  pygit2 clone fallito ({e}), uso git")
+            # git clone rifiuta una destinazione non vuota: rimuovi il clone parziale
+            shutil.rmtree(install_dir, ignore_errors=True)
+    
+    code, _, stderr = run_command(["git", "clone", "-b", BRANCH, REPO_URL, str(install_dir)])
+    return code == 0, stderr
+
+
 def install_new_version(install_dir: Path, result: MigrationResult, dry_run: bool = False) -> bool:
     """Installa nuova versione da Git, preservando config.json e .secret.key"""
     if dry_run:
@@ -619,7 +785,7 @@ def install_new_version(install_dir: Path, result: MigrationResult, dry_run: boo
     # Salva file da preservare
     for filename in preserve_files:
         filepath = install_dir / filename
-        if filepath.exists():
+        if _exists(filepath):
             try:
                 preserved[filename] = filepath.read_text()
                 logger.debug(f"  Preservato: {filename}")
@@ -629,16 +795,18 @@ def install_new_version(install_dir: Path, result: MigrationResult, dry_run: boo
     # Se esiste già come Git repo, aggiorna
     if is_git_installation(install_dir):
         result.actions.append("Aggiornamento repository esistente...")
-        code, _, stderr = run_command(f"cd {install_dir} && git fetch origin && git reset --hard origin/{BRANCH}")
-        if code != 0:
+        ok, stderr = _git_update(install_dir)
+        _invalidate_stat_cache()
+        if not ok:
             result.errors.append(f"Errore git update: {stderr}")
             return False
         result.actions.append("Repository aggiornato")
     else:
         # Se esiste ma non è Git, rimuovi (dopo backup)
-        if install_dir.exists():
+        if _exists(install_dir):
             try:
                 shutil.rmtree(install_dir)
+                _invalidate_stat_cache()
                 result.actions.append(f"Rimossa vecchia directory: {install_dir}")
             except Exception as e:
                 result.errors.append(f"Errore rimozione directory: {e}")
@@ -646,8 +814,9 @@ def install_new_version(install_dir: Path, result: MigrationResult, dry_run: boo
         
         # Clone nuovo repository
         result.actions.append(f"Clonazione repository in {install_dir}...")
-        code, _, stderr = run_command(f"git clone -b {BRANCH} {REPO_URL} {install_dir}")
-        if code != 0:
+        ok, stderr = _git_clone(install_dir)
+        _invalidate_stat_cache()
+        if not ok:
             result.errors.append(f"Errore git clone: {stderr}")
             return False
         
@@ -658,6 +827,7 @@ def install_new_version(install_dir: Path, result: MigrationResult, dry_run: boo
         filepath = install_dir / filename
         try:
             filepath.write_text(content)
+            _invalidate_stat_cache()
             result.actions.append(f"Ripristinato: {filename}")
             logger.info(f"  ✓ Ripristinato: {filename}")
         except Exception as e:
@@ -676,10 +846,10 @@ def install_python_dependencies(install_dir: Path, result: MigrationResult) -> N
     dependencies = ["jinja2", "paramiko", "cryptography"]
     
     # Strategia 1: prova apt (piu affidabile su Proxmox/Debian, non richiede pip)
-    apt_available = run_command("which apt-get")[0] == 0
+    apt_available = shutil.which("apt-get") is not None
     if apt_available:
-        apt_pkgs = " ".join(f"python3-{dep}" for dep in dependencies)
-        code, _, _ = run_command(f"apt-get install -y -qq {apt_pkgs} 2>/dev/null")
+        apt_pkgs = [f"python3-{dep}" for dep in dependencies]
+        code, _, _ = run_command(["apt-get", "install", "-y", "-qq", *apt_pkgs])
         if code == 0:
             result.actions.append("Dipendenze Python installate (apt)")
             logger.info("  ✓ Dipendenze Python installate via apt")
@@ -688,10 +858,10 @@ def install_python_dependencies(install_dir: Path, result: MigrationResult) -> N
     
     # Strategia 2: prova pip3 con requirements.txt
     requirements_file = install_dir / "requirements.txt"
-    pip_available = run_command("which pip3")[0] == 0
+    pip_available = shutil.which("pip3") is not None
     
-    if pip_available and requirements_file.exists():
-        code, _, _ = run_command(f"pip3 install -q -r {requirements_file}")
+    if pip_available and _exists(requirements_file):
+        code, _, _ = run_command(["pip3", "install", "-q", "-r", str(requirements_file)])
         if code == 0:
             result.actions.append("Dipendenze Python installate (pip3 requirements.txt)")
             logger.info("  ✓ Dipendenze Python installate via pip3")
@@ -701,12 +871,12 @@ def install_python_dependencies(install_dir: Path, result: MigrationResult) -> N
     for dep in dependencies:
         installed = False
         if pip_available:
-            code, _, _ = run_command(f"pip3 install -q {dep}")
+            code, _, _ = run_command(["pip3", "install", "-q", dep])
             if code == 0:
                 logger.info(f"  ✓ {dep} installato (pip3)")
                 installed = True
         if not installed and apt_available:
-            code, _, _ = run_command(f"apt-get install -y -qq python3-{dep} 2>/dev/null")
+            code, _, _ = run_command(["apt-get", "install", "-y", "-qq", f"python3-{dep}"])
             if code == 0:
                 logger.info(f"  ✓ python3-{dep} installato (apt)")
                 installed = True
@@ -725,6 +895,7 @@ def restore_config(install_dir: Path, config: Dict[str, Any], result: MigrationR
     try:
         with open(config_path, 'w') as f:
             json.dump(config, f, indent=4)
+        _invalidate_stat_cache()
         result.actions.append(f"Configurazione salvata: {config_path}")
         result.config_migrated = True
         return True
@@ -737,12 +908,13 @@ def restore_secret_key(old_path: Path, new_path: Path, result: MigrationResult,
     """Ripristina chiave di crittografia"""
     for key_file in [".secret.key", ".encryption_key"]:
         old_key = old_path / key_file
-        if old_key.exists():
+        if _exists(old_key):
             if dry_run:
                 result.actions.append(f"[DRY-RUN] Copierei {key_file}")
             else:
                 try:
                     shutil.copy2(old_key, new_path / key_file)
+                    _invalidate_stat_cache()
                     result.actions.append(f"Chiave crittografia ripristinata: {key_file}")
                 except Exception as e:
                     result.warnings.append(f"Errore copia {key_file}: {e}")
@@ -755,11 +927,15 @@ def run_post_migration(install_dir: Path, result: MigrationResult, dry_run: bool
         return
     
     # Imposta permessi eseguibili
-    run_command(f"chmod +x {install_dir}/*.py 2>/dev/null")
+    for script in install_dir.glob("*.py"):
+        try:
+            os.chmod(script, script.stat().st_mode | 0o111)
+        except OSError:
+            pass
     
     # Verifica se esiste config.json, altrimenti crea uno minimale
     config_path = install_dir / "config.json"
-    if not config_path.exists():
+    if not _exists(config_path):
         result.warnings.append("config.json non trovato - esegui setup.py per configurare")
     
     # Configura cron job per heartbeat
@@ -770,15 +946,8 @@ def run_post_migration(install_dir: Path, result: MigrationResult, dry_run: bool
     
     # Verifica versione installata
     version_file = install_dir / "version.py"
-    if version_file.exists():
-        try:
-            content = version_file.read_text()
-            for line in content.split('\n'):
-                if '__version__' in line and '=' in line:
-                    result.new_version = line.split('=')[1].strip().strip('"\'')
-                    break
-        except:
-            pass
+    if _exists(version_file):
+        result.new_version = _read_version(version_file)
 
 
 def setup_heartbeat_cron(install_dir: Path, result: MigrationResult, dry_run: bool = False) -> None:
@@ -800,6 +969,7 @@ PATH=/usr/local/sbin:/usr/local/bin:/sbin:/bin:/usr/sbin:/usr/bin
         Path("/var/log/proxreporter").mkdir(parents=True, exist_ok=True)
         
         cron_file.write_text(cron_content)
+        _invalidate_stat_cache()
         os.chmod(cron_file, 0o644)
         result.actions.append(f"Cron heartbeat configurato: {cron_file}")
     except Exception as e:
@@ -822,6 +992,7 @@ PATH=/usr/local/sbin:/usr/local/bin:/sbin:/bin:/usr/sbin:/usr/bin
     
     try:
         cron_file.write_text(cron_content)
+        _invalidate_stat_cache()
         os.chmod(cron_file, 0o644)
         result.actions.append(f"Cron giornaliero configurato: {cron_file}")
     except Exception as e:
@@ -871,7 +1042,7 @@ def migrate(dry_run: bool = False, force: bool = False) -> MigrationResult:
             # Preserva config.json prima dell'update
             config_path = old_path / "config.json"
             old_config = None
-            if config_path.exists():
+            if _exists(config_path):
                 logger.info("→ Preservo configurazione esistente...")
                 old_config = load_old_config(old_path)
                 if old_config:
@@ -886,9 +1057,9 @@ def migrate(dry_run: bool = False, force: bool = False) -> MigrationResult:
             # Aggiorna repository
             if install_new_version(old_path, result, dry_run):
                 # Ripristina config (sanitizzata) se era stato sovrascritto
-                if old_config and not config_path.exists():
+                if old_config and not _exists(config_path):
                     restore_config(old_path, old_config, result, dry_run)
-                elif old_config and config_path.exists():
+                elif old_config and _exists(config_path):
                     # Riscrive la config sanitizzata anche se il file esiste
                     restore_config(old_path, old_config, result, dry_run)
                 
@@ -896,7 +1067,7 @@ def migrate(dry_run: bool = False, force: bool = False) -> MigrationResult:
                 result.success = True
                 
                 # Segna configurazione come migrata se presente
-                if config_path.exists():
+                if _exists(config_path):
                     result.config_migrated = True
             return result
     else:
@@ -921,7 +1092,7 @@ def migrate(dry_run: bool = False, force: bool = False) -> MigrationResult:
         logger.info(f"  ✓ Configurazione migrata")
     
     # 4. Backup vecchia installazione
-    if old_path and old_path.exists():
+    if old_path and _exists(old_path):
         logger.info("→ Backup installazione esistente...")
         backup_path = backup_old_installation(old_path, result)
         if backup_path:
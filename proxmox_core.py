@@ -1438,6 +1438,8 @@ def run_report(config: Dict[str, Any], codcli: str, nomecliente: str, server_ide
                      pass # Logged inside sender
             except Exception as e:
                 logger.error(f"Errore preparazione email: {e}")
+            finally:
+                email_sender.close()
         else:
              logger.info("→ Invio email disabilitato (smtp.enabled=false o assente)")
     else:
@@ -2257,14 +2259,6 @@ def augment_local_host_details(host_info: Dict[str, Any], extractor: ProxmoxLoca
             return ""
         return ""
 
-    lscpu_output = run("lscpu 2>/dev/null")
-    if lscpu_output:
-        pass
-
-    meminfo_output = run("cat /proc/meminfo 2>/dev/null")
-    if meminfo_output:
-        pass
-
     temperature_readings, highest_temp = _collect_temperature_readings(run)
     if temperature_readings and not host_info.get("temperature_summary"):
         formatted = []
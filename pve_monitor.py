@@ -251,11 +251,13 @@ def get_pve_version() -> str:
         result = subprocess.run(
             ["pveversion"], capture_output=True, text=True, timeout=10
         )
-        if result.returncode == 0:
-            match = re.match(r"pve-manager/([\d.]+)", result.stdout.strip())
-            if match:
-                return match.group(1)
-        return result.stdout.strip()
+        output = result.stdout.strip()
+        # "pve-manager/8.1.3/abc123 (running kernel: ...)": basta un confronto di prefisso
+        if result.returncode == 0 and output.startswith("pve-manager/"):
+            version = output[len("pve-manager/"):].split('/', 1)[0].split(None, 1)
+            if version:
+                return version[0]
+        return output
     except Exception:
         return "unknown"
 
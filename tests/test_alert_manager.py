@@ -0,0 +1,302 @@
+"""
+Tests for AlertManager deduplication and SyslogSender batched UDP sends.
+"""
+
+import ctypes
+import errno
+import socket
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path (alert_manager is a top-level module)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import alert_manager
+from alert_manager import AlertManager, SyslogSender, _pack_sockaddr, _sendmmsg
+from hardware_monitor import HardwareAlert, HardwareStatus
+
+
+def make_manager(dedup_ttl=None, **alerts_config):
+    if dedup_ttl is not None:
+        alerts_config["dedup_ttl_sec"] = dedup_ttl
+    return AlertManager({
+        "syslog": {"enabled": True, "host": "127.0.0.1", "port": 514, "protocol": "udp"},
+        "smtp": {"enabled": False},
+        "alerts": alerts_config,
+    })
+
+
+class FakeSyslog:
+    """Sostituto di send_many: registra i messaggi, l'esito si imposta con ok"""
+    
+    def __init__(self):
+        self.ok = True
+        self.batches = []
+    
+    def __call__(self, records):
+        self.batches.append(records)
+        return len(records) if self.ok else 0
+
+
+@pytest.fixture
+def disk_alert():
+    return HardwareAlert(
+        component="disk", device="/dev/sda",
+        status=HardwareStatus.CRITICAL, message="SMART FAILED",
+    )
+
+
+def sent_count(fake):
+    return sum(len(batch) for batch in fake.batches)
+
+
+class TestHardwareAlertDedup:
+    """Tests for send_hardware_alerts deduplication."""
+    
+    def test_disabled_by_default(self, disk_alert):
+        manager = make_manager()
+        fake = manager.syslog_sender.send_many = FakeSyslog()
+        manager.send_hardware_alerts([disk_alert])
+        manager.send_hardware_alerts([disk_alert])
+        assert sent_count(fake) == 2
+    
+    def test_repeated_alert_suppressed_after_delivery(self, disk_alert):
+        manager = make_manager(dedup_ttl=300)
+        fake = manager.syslog_sender.send_many = FakeSyslog()
+        manager.send_hardware_alerts([disk_alert])
+        manager.send_hardware_alerts([disk_alert])
+        assert sent_count(fake) == 1
+    
+    def test_failed_delivery_not_suppressed(self, disk_alert):
+        manager = make_manager(dedup_ttl=300)
+        fake = manager.syslog_sender.send_many = FakeSyslog()
+        fake.ok = False
+        manager.send_hardware_alerts([disk_alert])
+        fake.ok = True
+        result = manager.send_hardware_alerts([disk_alert])
+        assert result["syslog"] == 1
+        assert sent_count(fake) == 2
+    
+    def test_identical_alerts_in_same_batch_kept(self, disk_alert):
+        manager = make_manager(dedup_ttl=300)
+        fake = manager.syslog_sender.send_many = FakeSyslog()
+        manager.send_hardware_alerts([disk_alert, disk_alert])
+        assert sent_count(fake) == 2
+    
+    def test_expired_key_sent_again(self, disk_alert, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(alert_manager.time, "monotonic", lambda: now[0])
+        manager = make_manager(dedup_ttl=300)
+        fake = manager.syslog_sender.send_many = FakeSyslog()
+        manager.send_hardware_alerts([disk_alert])
+        now[0] += 301
+        manager.send_hardware_alerts([disk_alert])
+        assert sent_count(fake) == 2
+
+
+
+class FakeDatetime(datetime):
+    """datetime con now() controllato dal test"""
+    current = datetime(2026, 1, 1, 10, 0, 0)
+    
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class TestBufferedAlertTimestamp:
+    """Tests for the time reported by buffered alerts."""
+    
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        monkeypatch.setattr(alert_manager, "datetime", FakeDatetime)
+        FakeDatetime.current = datetime(2026, 1, 1, 10, 0, 0)
+        manager = make_manager(buffer_enabled=True, buffer_flush_interval=0, buffer_max_size=100)
+        yield manager
+        manager.close()
+    
+    def buffer(self, manager, title):
+        result = manager.send_alert(alert_manager.AlertType.HOST_WARNING,
+                                    alert_manager.AlertSeverity.WARNING, title, "msg")
+        assert result.get("buffered")
+    
+    def test_flush_keeps_original_time(self, manager):
+        fake = manager.syslog_sender.send_many = FakeSyslog()
+        self.buffer(manager, "first")
+        FakeDatetime.current = datetime(2026, 1, 1, 10, 3, 0)
+        self.buffer(manager, "second")
+        FakeDatetime.current = datetime(2026, 1, 1, 10, 5, 0)
+        
+        digest = manager._build_alert_digest_html(list(manager._alert_buffer))
+        manager.flush()
+        
+        timestamps = [record[3]["timestamp"] for record in fake.batches[0]]
+        assert timestamps == ["2026-01-01T10:00:00", "2026-01-01T10:03:00"]
+        assert "2026-01-01 10:00:00" in digest
+        assert "2026-01-01 10:03:00" in digest
+
+
+class TestClose:
+    """Tests for AlertManager.close()."""
+    
+    def test_close_unregisters_atexit_flush(self, monkeypatch):
+        registered = []
+        monkeypatch.setattr(alert_manager.atexit, "register", registered.append)
+        monkeypatch.setattr(alert_manager.atexit, "unregister", registered.remove)
+        manager = make_manager(buffer_enabled=True, buffer_flush_interval=0)
+        assert registered == [manager.flush]
+        manager.close()
+        assert registered == []
+
+
+needs_sendmmsg = pytest.mark.skipif(alert_manager._libc_sendmmsg is None, reason="sendmmsg non disponibile")
+
+
+def has_ipv6_loopback():
+    try:
+        with socket.socket(socket.AF_INET6, socket.SOCK_DGRAM) as s:
+            s.bind(("::1", 0))
+        return True
+    except OSError:
+        return False
+
+
+@pytest.fixture
+def receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(2)
+    yield sock
+    sock.close()
+
+
+def receive(sock, count):
+    return [sock.recv(65535) for _ in range(count)]
+
+
+def make_sender(port, host="127.0.0.1"):
+    return SyslogSender({"syslog": {"enabled": True, "host": host, "port": port, "protocol": "udp"}})
+
+
+class TestPackSockaddr:
+    """Tests for binary sockaddr packing."""
+    
+    def test_ipv4(self):
+        raw = _pack_sockaddr(socket.AF_INET, ("10.1.2.3", 514))
+        assert len(raw) == 16
+        assert raw[2:4] == (514).to_bytes(2, "big")
+        assert raw[4:8] == bytes([10, 1, 2, 3])
+    
+    def test_ipv6(self):
+        raw = _pack_sockaddr(socket.AF_INET6, ("fe80::1%lo", 514, 0, 1))
+        assert len(raw) == 28
+        assert raw[2:4] == (514).to_bytes(2, "big")
+        assert raw[8:24] == socket.inet_pton(socket.AF_INET6, "fe80::1")
+    
+    def test_unsupported_family(self):
+        assert _pack_sockaddr(socket.AF_UNIX, ("/tmp/x",)) is None
+
+
+class TestSendmmsg:
+    """Tests for batched UDP sends."""
+    
+    @needs_sendmmsg
+    def test_sends_all_datagrams_in_order(self, receiver):
+        payloads = [f"msg {i}".encode() for i in range(150)]
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(5)
+            raw = _pack_sockaddr(socket.AF_INET, receiver.getsockname())
+            assert _sendmmsg(sock, payloads, raw) == len(payloads)
+        assert receive(receiver, len(payloads)) == payloads
+    
+    @needs_sendmmsg
+    @pytest.mark.skipif(not has_ipv6_loopback(), reason="IPv6 loopback non disponibile")
+    def test_ipv6(self):
+        with socket.socket(socket.AF_INET6, socket.SOCK_DGRAM) as rx, \
+                socket.socket(socket.AF_INET6, socket.SOCK_DGRAM) as tx:
+            rx.bind(("::1", 0))
+            rx.settimeout(2)
+            raw = _pack_sockaddr(socket.AF_INET6, rx.getsockname())
+            assert _sendmmsg(tx, [b"a", b"b"], raw) == 2
+            assert receive(rx, 2) == [b"a", b"b"]
+    
+    def test_without_address_sends_nothing(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            assert _sendmmsg(sock, [b"a"], None) == 0
+    
+    def test_eagain_returns_sent_count(self, monkeypatch):
+        def full_buffer(fd, msgs, count, flags):
+            ctypes.set_errno(errno.EAGAIN)
+            return -1
+        
+        monkeypatch.setattr(alert_manager, "_libc_sendmmsg", full_buffer)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            assert _sendmmsg(sock, [b"a", b"b"], _pack_sockaddr(socket.AF_INET, ("127.0.0.1", 9))) == 0
+    
+    def test_other_errors_raised(self, monkeypatch):
+        def broken(fd, msgs, count, flags):
+            ctypes.set_errno(errno.EBADF)
+            return -1
+        
+        monkeypatch.setattr(alert_manager, "_libc_sendmmsg", broken)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            with pytest.raises(OSError):
+                _sendmmsg(sock, [b"a"], _pack_sockaddr(socket.AF_INET, ("127.0.0.1", 9)))
+    
+    def test_partial_send_stops(self, monkeypatch):
+        monkeypatch.setattr(alert_manager, "_libc_sendmmsg", lambda fd, msgs, count, flags: 1)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            payloads = [b"x"] * 100
+            assert _sendmmsg(sock, payloads, _pack_sockaddr(socket.AF_INET, ("127.0.0.1", 9))) == 1
+
+
+class TestSyslogSendMany:
+    """Tests for SyslogSender.send_many over UDP."""
+    
+    def test_all_messages_delivered(self, receiver):
+        sender = make_sender(receiver.getsockname()[1])
+        records = [(alert_manager.AlertSeverity.WARNING, f"m{i}", None, None) for i in range(10)]
+        assert sender.send_many(records) == 10
+        received = receive(receiver, 10)
+        assert all(b"m%d" % i in received[i] for i in range(10))
+    
+    def test_partial_sendmmsg_falls_back_to_sendto(self, receiver, monkeypatch):
+        # sendmmsg finto che "invia" solo il primo datagramma senza trasmetterlo
+        monkeypatch.setattr(alert_manager, "_libc_sendmmsg", lambda fd, msgs, count, flags: 1)
+        sender = make_sender(receiver.getsockname()[1])
+        records = [(alert_manager.AlertSeverity.WARNING, f"m{i}", None, None) for i in range(5)]
+        assert sender.send_many(records) == 5
+        received = receive(receiver, 4)
+        assert all(b"m%d" % (i + 1) in received[i] for i in range(4))
+    
+    def test_eagain_falls_back_to_sendto(self, receiver, monkeypatch):
+        def full_buffer(fd, msgs, count, flags):
+            ctypes.set_errno(errno.EAGAIN)
+            return -1
+        
+        monkeypatch.setattr(alert_manager, "_libc_sendmmsg", full_buffer)
+        sender = make_sender(receiver.getsockname()[1])
+        records = [(alert_manager.AlertSeverity.WARNING, f"m{i}", None, None) for i in range(3)]
+        assert sender.send_many(records) == 3
+        assert len(receive(receiver, 3)) == 3
+    
+    def test_host_resolved_once(self, receiver, monkeypatch):
+        calls = []
+        real_getaddrinfo = socket.getaddrinfo
+        
+        def counting_getaddrinfo(*args, **kwargs):
+            calls.append(args[0])
+            return real_getaddrinfo(*args, **kwargs)
+        
+        monkeypatch.setattr(alert_manager.socket, "getaddrinfo", counting_getaddrinfo)
+        monkeypatch.setattr(alert_manager.socket, "gethostbyname", lambda host: pytest.fail("risoluzione per batch"))
+        sender = make_sender(receiver.getsockname()[1], host="127.0.0.1")
+        records = [(alert_manager.AlertSeverity.WARNING, "m", None, None)]
+        sender.send_many(records)
+        sender.send_many(records)
+        sender.send(alert_manager.AlertSeverity.WARNING, "m")
+        assert calls == ["127.0.0.1"]
+        assert len(receive(receiver, 3)) == 3
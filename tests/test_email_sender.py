@@ -0,0 +1,128 @@
+"""
+Tests for EmailSender SMTP connection reuse and retry.
+"""
+
+import smtplib
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path (email_sender is a top-level module)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import email_sender
+from email_sender import EmailSender
+
+
+class FakeSMTP:
+    """Finto server SMTP: registra le chiamate, gli errori si iniettano via classe"""
+    instances = []
+    login_error = None
+    send_errors = []
+    
+    def __init__(self, host, port):
+        self.logins = 0
+        self.sent = 0
+        self.closed = False
+        FakeSMTP.instances.append(self)
+    
+    def login(self, user, password):
+        self.logins += 1
+        if FakeSMTP.login_error:
+            raise FakeSMTP.login_error
+    
+    def noop(self):
+        return (250, b"OK")
+    
+    def send_message(self, msg):
+        if FakeSMTP.send_errors:
+            raise FakeSMTP.send_errors.pop(0)
+        self.sent += 1
+    
+    def close(self):
+        self.closed = True
+    
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sender(monkeypatch):
+    FakeSMTP.instances = []
+    FakeSMTP.login_error = None
+    FakeSMTP.send_errors = []
+    monkeypatch.setattr(email_sender.smtplib, "SMTP", FakeSMTP)
+    return EmailSender({
+        "smtp": {
+            "enabled": True,
+            "host": "mail.example.com",
+            "port": 25,
+            "user": "user",
+            "password": "secret",
+            "recipients": "a@example.com",
+        }
+    })
+
+
+def total_sent():
+    return sum(s.sent for s in FakeSMTP.instances)
+
+
+class TestSendReport:
+    """Tests for send_report retry policy."""
+    
+    def test_connection_reused_between_sends(self, sender):
+        assert sender.send_report("<p>1</p>", "s1")
+        assert sender.send_report("<p>2</p>", "s2")
+        assert len(FakeSMTP.instances) == 1
+        assert FakeSMTP.instances[0].logins == 1
+        assert total_sent() == 2
+    
+    def test_reused_connection_dropped_is_retried_once(self, sender):
+        assert sender.send_report("<p>1</p>", "s1")
+        FakeSMTP.send_errors = [smtplib.SMTPServerDisconnected("gone")]
+        assert sender.send_report("<p>2</p>", "s2")
+        assert len(FakeSMTP.instances) == 2
+        assert total_sent() == 2
+    
+    def test_reused_connection_socket_error_is_retried(self, sender):
+        assert sender.send_report("<p>1</p>", "s1")
+        FakeSMTP.send_errors = [ConnectionResetError()]
+        assert sender.send_report("<p>2</p>", "s2")
+        assert total_sent() == 2
+    
+    def test_authentication_error_not_retried(self, sender):
+        FakeSMTP.login_error = smtplib.SMTPAuthenticationError(535, b"bad credentials")
+        assert sender.send_report("<p>1</p>", "s1") is False
+        assert len(FakeSMTP.instances) == 1
+        assert FakeSMTP.instances[0].logins == 1
+    
+    def test_recipients_refused_not_resent_on_reused_connection(self, sender):
+        assert sender.send_report("<p>1</p>", "s1")
+        FakeSMTP.send_errors = [smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"no")})]
+        assert sender.send_report("<p>2</p>", "s2") is False
+        assert len(FakeSMTP.instances) == 1
+        assert FakeSMTP.send_errors == []
+    
+    def test_data_error_not_resent(self, sender):
+        assert sender.send_report("<p>1</p>", "s1")
+        FakeSMTP.send_errors = [smtplib.SMTPDataError(554, b"rejected")]
+        assert sender.send_report("<p>2</p>", "s2") is False
+        assert len(FakeSMTP.instances) == 1
+    
+    def test_fresh_connection_error_not_retried(self, sender):
+        FakeSMTP.send_errors = [smtplib.SMTPServerDisconnected("gone")]
+        assert sender.send_report("<p>1</p>", "s1") is False
+        assert len(FakeSMTP.instances) == 1
+    
+    def test_connection_refused_not_retried(self, sender, monkeypatch):
+        calls = []
+        
+        def refused(host, port):
+            calls.append((host, port))
+            raise ConnectionRefusedError()
+        
+        monkeypatch.setattr(email_sender.smtplib, "SMTP", refused)
+        assert sender.send_report("<p>1</p>", "s1") is False
+        assert len(calls) == 1
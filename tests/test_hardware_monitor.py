@@ -0,0 +1,307 @@
+"""
+Tests for hardware_monitor parsing helpers.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path (hardware_monitor is a top-level module)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from hardware_monitor import HardwareMonitor, HardwareStatus, _SENSOR_VALUE_RE, _parse_celsius
+
+
+def scan(lines):
+    found = {}
+    HardwareMonitor._scan_kernel_lines(iter(lines), found)
+    return found
+
+
+class TestKernelErrorClassification:
+    """Tests for kernel log line classification."""
+    
+    def test_xfs_io_error_reports_both_types(self):
+        found = scan(["XFS (dm-0): metadata I/O error"])
+        assert set(found) == {"filesystem", "io_error"}
+    
+    def test_nvme_io_error_reports_both_types(self):
+        found = scan(["nvme0n1: I/O error, sector 1234"])
+        assert set(found) == {"io_error", "nvme_error"}
+    
+    def test_line_counts_once_per_type(self):
+        found = scan(["ata1: SATA link error, ata1 error"])
+        assert found["ata_error"]["count"] == 1
+    
+    def test_counts_and_last_message(self):
+        found = scan([
+            "EXT4-fs error (device sda1): first",
+            "unrelated line",
+            "EXT4-fs error (device sda1): second",
+        ])
+        assert set(found) == {"filesystem"}
+        assert found["filesystem"]["count"] == 2
+        assert found["filesystem"]["last_message"].endswith("second")
+    
+    def test_no_match(self):
+        assert scan(["usb 1-1: new high-speed USB device"]) == {}
+    
+    def test_empty_input_reports_no_lines_read(self):
+        assert HardwareMonitor._scan_kernel_lines(iter([]), {}) is False
+    
+    def test_count_is_capped(self):
+        cap = HardwareMonitor.KERNEL_ERROR_COUNT_CAP
+        found = scan(["mce: CPU0 Machine check"] * (cap + 5))
+        assert found["mce"]["count"] == cap
+
+
+def make_monitor(tmp_path, identities):
+    """Monitor locale con cache su tmp_path e identità dei dischi simulate"""
+    monitor = HardwareMonitor({"hardware_monitoring": {"disk_cache_file": str(tmp_path / "disks.json")}})
+    monitor._disk_identity = lambda device: identities.get(device)
+    return monitor
+
+
+class TestStaticDiskCache:
+    """Tests for the persisted disk identity cache."""
+    
+    INFO_A = {"model": "DISK A", "serial": "SERIAL-A"}
+    
+    def test_cache_survives_new_monitor(self, tmp_path):
+        first = make_monitor(tmp_path, {"/dev/sda": ("wwn-a", None)})
+        first._store_static_disk_info("/dev/sda", self.INFO_A)
+        first.save_static_disk_cache()
+        
+        second = make_monitor(tmp_path, {"/dev/sda": ("wwn-a", None)})
+        assert second._get_static_disk_info("/dev/sda") == self.INFO_A
+    
+    def test_renamed_disk_follows_stable_id(self, tmp_path):
+        first = make_monitor(tmp_path, {"/dev/sda": ("wwn-a", None)})
+        first._store_static_disk_info("/dev/sda", self.INFO_A)
+        first.save_static_disk_cache()
+        
+        # Dopo il riavvio il disco A è diventato sdb e sda è un altro disco
+        second = make_monitor(tmp_path, {"/dev/sda": ("wwn-b", None), "/dev/sdb": ("wwn-a", None)})
+        assert second._get_static_disk_info("/dev/sda") is None
+        assert second._get_static_disk_info("/dev/sdb") == self.INFO_A
+    
+    def test_serial_mismatch_is_a_miss(self, tmp_path):
+        monitor = make_monitor(tmp_path, {"/dev/sda": ("wwn-a", "OTHER-SERIAL")})
+        monitor._store_static_disk_info("/dev/sda", self.INFO_A)
+        assert monitor._get_static_disk_info("/dev/sda") is None
+    
+    def test_disk_without_stable_id_not_cached(self, tmp_path):
+        monitor = make_monitor(tmp_path, {})
+        monitor._store_static_disk_info("/dev/sda", self.INFO_A)
+        assert monitor._get_static_disk_info("/dev/sda") is None
+        assert monitor._smart_argv("/dev/sda") == ["smartctl", "-i", "-H", "-A", "/dev/sda"]
+    
+    def test_cached_disk_skips_identity_query(self, tmp_path):
+        monitor = make_monitor(tmp_path, {"/dev/sda": ("wwn-a", "SERIAL-A")})
+        monitor._store_static_disk_info("/dev/sda", self.INFO_A)
+        assert monitor._smart_argv("/dev/sda") == ["smartctl", "-H", "-A", "/dev/sda"]
+    
+    def test_legacy_device_name_entries_ignored(self, tmp_path):
+        (tmp_path / "disks.json").write_text(
+            '{"/dev/sda": {"info": {"model": "OLD"}, "cached_at": 9999999999}}'
+        )
+        monitor = make_monitor(tmp_path, {"/dev/sda": ("/dev/sda", None)})
+        assert monitor._get_static_disk_info("/dev/sda") is None
+    
+    def test_expired_entry_is_a_miss(self, tmp_path):
+        (tmp_path / "disks.json").write_text(
+            '{"wwn-a": {"info": {"model": "OLD"}, "cached_at": 0}}'
+        )
+        monitor = make_monitor(tmp_path, {"/dev/sda": ("wwn-a", None)})
+        assert monitor._get_static_disk_info("/dev/sda") is None
+    
+    def test_cache_not_shared_between_instances(self, tmp_path):
+        first = make_monitor(tmp_path, {"/dev/sda": ("wwn-a", None)})
+        first._store_static_disk_info("/dev/sda", self.INFO_A)
+        # Non salvata su file: un'altra istanza non la vede
+        second = make_monitor(tmp_path, {"/dev/sda": ("wwn-a", None)})
+        assert second._get_static_disk_info("/dev/sda") is None
+    
+    def test_read_disk_serial_from_vpd_page(self, tmp_path):
+        (tmp_path / "device").mkdir()
+        serial = b"  WD-ABC123"
+        (tmp_path / "device" / "vpd_pg80").write_bytes(b"\x00\x80\x00" + bytes([len(serial)]) + serial)
+        assert HardwareMonitor._read_disk_serial(str(tmp_path)) == "WD-ABC123"
+    
+    def test_read_disk_serial_nvme(self, tmp_path):
+        (tmp_path / "device").mkdir()
+        (tmp_path / "device" / "serial").write_text("S4EWNX0N123456     \n")
+        assert HardwareMonitor._read_disk_serial(str(tmp_path)) == "S4EWNX0N123456"
+    
+    def test_read_disk_serial_missing(self, tmp_path):
+        assert HardwareMonitor._read_disk_serial(str(tmp_path)) is None
+    
+    def test_disk_by_id_prefers_wwn(self, tmp_path):
+        disk = tmp_path / "sda"
+        disk.touch()
+        by_id = tmp_path / "by-id"
+        by_id.mkdir()
+        (by_id / "ata-MODEL_SERIAL").symlink_to(disk)
+        (by_id / "wwn-0x5000c500a1b2c3d4").symlink_to(disk)
+        (by_id / "wwn-0x5000c500a1b2c3d4-part1").symlink_to(tmp_path / "sda1")
+        monitor = HardwareMonitor()
+        monitor.DISK_BY_ID_DIR = str(by_id)
+        assert monitor._disk_by_id(str(disk)) == "wwn-0x5000c500a1b2c3d4"
+        assert monitor._disk_by_id(str(tmp_path / "sdb")) is None
+
+
+class TestParseCelsius:
+    """Tests for sensors temperature parsing."""
+    
+    @pytest.mark.parametrize("text, expected", [
+        ("+45.0°C  (high = +80.0°C, crit = +100.0°C)", 45.0),
+        ("-5.5°C", -5.5),
+        ("+40°C", 40.0),
+        ("45 C", 45.0),
+        ("  +38.0 C  ", 38.0),
+        ("N/A", None),
+        ("", None),
+    ])
+    def test_values(self, text, expected):
+        assert _parse_celsius(text) == expected
+    
+    @pytest.mark.parametrize("text", [
+        "+45.0°C  (high = +80.0°C)", "-12°C", ".5°C", "1.2.3°C", "+0.0°C", "80 °C", "abc°C 42°C",
+    ])
+    def test_matches_regex(self, text):
+        match = _SENSOR_VALUE_RE.search(text)
+        assert _parse_celsius(text) == (float(match.group(1)) if match else None)
+
+
+SMART_ATTRIBUTES = """\
+=== START OF READ SMART DATA SECTION ===
+SMART Attributes Data Structure revision number: 16
+ID# ATTRIBUTE_NAME          FLAG     VALUE WORST THRESH TYPE      UPDATED  WHEN_FAILED RAW_VALUE
+  5 Reallocated_Sector_Ct   0x0033   100   100   010    Pre-fail  Always       -       8
+  9 Power_On_Hours          0x0032   095   095   000    Old_age   Always       -       1234h+05m+12.345s
+194 Temperature_Celsius     0x0022   047   052   000    Old_age   Always       -       47 (Min/Max 18/52)
+197 Current_Pending_Sector  0x0012   100   100   000    Old_age   Always       -       0
+
+SMART Error Log Version: 1
+  1 Not_An_Attribute        0x0000   000   000   000    Old_age   Always       -       99
+"""
+
+
+class TestSmartAttributes:
+    """Tests for smartctl attribute table parsing."""
+    
+    def test_parse_table(self):
+        attrs = HardwareMonitor()._parse_smart_attributes(SMART_ATTRIBUTES)
+        assert attrs == {
+            "Reallocated_Sector_Ct": 8,
+            "Power_On_Hours": 1234,
+            "Temperature_Celsius": 47,
+            "Current_Pending_Sector": 0,
+        }
+    
+    def test_no_table(self):
+        assert HardwareMonitor()._parse_smart_attributes("SMART overall-health: PASSED") == {}
+
+
+class TestSmartPrefetch:
+    """Tests for the asyncio smartctl prefetch."""
+    
+    def test_prefetch_fills_cache_for_every_disk(self):
+        monitor = HardwareMonitor()
+        monitor._get_static_disk_info = lambda device: None
+        calls = []
+        
+        async def fake_run(argv):
+            calls.append(list(argv))
+            await asyncio.sleep(0)
+            return None if argv[-1] == "/dev/sdc" else f"output {argv[-1]}"
+        
+        monitor._run_command_async = fake_run
+        asyncio.run(monitor._prefetch_smart_outputs(["/dev/sda", "/dev/sdb", "/dev/sdc"]))
+        assert monitor._smart_output_cache == {
+            "/dev/sda": "output /dev/sda",
+            "/dev/sdb": "output /dev/sdb",
+            "/dev/sdc": None,
+        }
+        assert sorted(argv[-1] for argv in calls) == ["/dev/sda", "/dev/sdb", "/dev/sdc"]
+        # La cache evita una seconda esecuzione di smartctl per lo stesso disco
+        assert monitor._get_smart_output("/dev/sda") == "output /dev/sda"
+        assert len(calls) == 3
+    
+    def test_prefetch_respects_parallel_limit(self):
+        monitor = HardwareMonitor()
+        monitor._get_static_disk_info = lambda device: None
+        monitor.MAX_PARALLEL_DISKS = 2
+        running = [0, 0]  # attuali, massimo
+        
+        async def fake_run(argv):
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            return "ok"
+        
+        monitor._run_command_async = fake_run
+        asyncio.run(monitor._prefetch_smart_outputs([f"/dev/sd{c}" for c in "abcdef"]))
+        assert running[1] == 2
+
+
+CHECK_NAMES = (
+    "_check_smart_disks", "_check_memory_ecc", "_check_raid_mdadm",
+    "_check_raid_zfs", "_check_temperatures", "_check_kernel_errors",
+)
+
+
+class TestRunAllChecks:
+    """Tests for the parallel check run."""
+    
+    def test_alert_order_matches_check_order(self):
+        monitor = HardwareMonitor()
+        
+        def make_check(index, name):
+            def check():
+                # I primi controlli finiscono per ultimi
+                time.sleep(0.01 * (len(CHECK_NAMES) - index))
+                monitor._add_alert(name, f"dev{index}a", HardwareStatus.WARNING, "a")
+                monitor._add_alert(name, f"dev{index}b", HardwareStatus.WARNING, "b")
+            return check
+        
+        for index, name in enumerate(CHECK_NAMES):
+            setattr(monitor, name, make_check(index, name))
+        
+        alerts = monitor.run_all_checks()
+        assert [a.device for a in alerts] == [f"dev{i}{s}" for i in range(len(CHECK_NAMES)) for s in "ab"]
+    
+    def test_check_exception_propagates(self):
+        monitor = HardwareMonitor()
+        for name in CHECK_NAMES:
+            setattr(monitor, name, lambda: None)
+        
+        def broken():
+            raise RuntimeError("boom")
+        
+        monitor._check_raid_zfs = broken
+        with pytest.raises(RuntimeError):
+            monitor.run_all_checks()
+    
+    def test_direct_check_adds_to_alerts(self):
+        monitor = HardwareMonitor()
+        monitor._add_alert("disk", "/dev/sda", HardwareStatus.CRITICAL, "x")
+        assert [a.device for a in monitor.alerts] == ["/dev/sda"]
+    
+    def test_remote_smart_alerts_in_disk_order(self):
+        monitor = HardwareMonitor(executor=lambda cmd, silent=True: (0, "", ""))
+        disks = ["/dev/sda", "/dev/sdb", "/dev/sdc", "/dev/sdd"]
+        monitor._has_tool = lambda name: True
+        monitor._get_disk_devices = lambda: disks
+        
+        def check_disk(disk):
+            time.sleep(0.01 * (len(disks) - disks.index(disk)))
+            monitor._add_alert("disk", disk, HardwareStatus.WARNING, "x")
+        
+        monitor._check_smart_disk = check_disk
+        alerts = monitor._collect_alerts(monitor._check_smart_disks)
+        assert [a.device for a in alerts] == disks
@@ -0,0 +1,181 @@
+"""
+Tests for heartbeat GELF serialization and delivery.
+"""
+
+import json
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path (heartbeat is a top-level module)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import heartbeat
+from heartbeat import GelfSender, _deliver_gelf, _gelf_payload, _resolve_host
+
+
+class GelfServer:
+    """Server TCP GELF minimo: raccoglie i messaggi terminati da NUL per connessione"""
+    
+    def __init__(self, close_after_first=False):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.close_after_first = close_after_first
+        self.connections = 0
+        self.messages = []
+        self._received = threading.Condition()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+    
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            with conn:
+                buf = b""
+                while True:
+                    data = conn.recv(65536)
+                    if not data:
+                        break
+                    buf += data
+                    while b"\0" in buf:
+                        message, buf = buf.split(b"\0", 1)
+                        with self._received:
+                            self.messages.append(json.loads(message))
+                            self._received.notify_all()
+                        if self.close_after_first:
+                            break
+                    else:
+                        continue
+                    break
+    
+    def wait_for(self, count, timeout=5):
+        with self._received:
+            assert self._received.wait_for(lambda: len(self.messages) >= count, timeout)
+        return self.messages
+    
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def server():
+    srv = GelfServer()
+    yield srv
+    srv.close()
+
+
+class TestGelfPayload:
+    """Tests for GELF serialization."""
+    
+    def test_nul_terminated_json(self):
+        payload = _gelf_payload({"short_message": "città", "level": 6})
+        assert payload.endswith(b"\0")
+        assert json.loads(payload[:-1]) == {"short_message": "città", "level": 6}
+
+
+class TestGelfSender:
+    """Tests for the persistent GELF connection."""
+    
+    def test_tcp_connection_reused(self, server):
+        sender = GelfSender("127.0.0.1", server.port, "tcp")
+        try:
+            sender.send(_gelf_payload({"n": 1}))
+            sender.send(_gelf_payload({"n": 2}))
+            assert server.wait_for(2) == [{"n": 1}, {"n": 2}]
+            assert server.connections == 1
+        finally:
+            sender.close()
+    
+    def test_tcp_reconnects_after_server_close(self):
+        server = GelfServer(close_after_first=True)
+        sender = GelfSender("127.0.0.1", server.port, "tcp")
+        try:
+            sender.send(_gelf_payload({"n": 1}))
+            server.wait_for(1)
+            # Il server ha chiuso: il secondo messaggio non deve andare perso
+            for _ in range(50):
+                if not heartbeat._tcp_peer_open(sender._sock):
+                    break
+                threading.Event().wait(0.01)
+            sender.send(_gelf_payload({"n": 2}))
+            assert server.wait_for(2) == [{"n": 1}, {"n": 2}]
+            assert server.connections == 2
+        finally:
+            sender.close()
+            server.close()
+    
+    def test_udp(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as rx:
+            rx.bind(("127.0.0.1", 0))
+            rx.settimeout(2)
+            sender = GelfSender("127.0.0.1", rx.getsockname()[1], "udp")
+            try:
+                sender.send(_gelf_payload({"n": 1}))
+            finally:
+                sender.close()
+            assert json.loads(rx.recv(65536)[:-1]) == {"n": 1}
+    
+    def test_connection_refused_raises(self):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        sender = GelfSender("127.0.0.1", port, "tcp", connect_timeout=1)
+        with pytest.raises(OSError):
+            sender.send(b"{}\0")
+    
+    def test_from_config(self):
+        sender = GelfSender.from_config({"host": "h", "protocol": "UDP", "io_timeout": 3}, 8514)
+        assert sender.address == ("h", 8514, "udp")
+        assert sender.io_timeout == 3
+
+
+class TestDeliverGelf:
+    """Tests for transport selection."""
+    
+    def test_routine_message_uses_udp_when_configured(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as rx:
+            rx.bind(("127.0.0.1", 0))
+            rx.settimeout(2)
+            config = {"host": "127.0.0.1", "protocol": "tcp",
+                      "heartbeat_transport": "udp", "udp_port": rx.getsockname()[1]}
+            assert _deliver_gelf(_gelf_payload({"n": 1}), config, 1, routine=True) == "udp"
+            assert json.loads(rx.recv(65536)[:-1]) == {"n": 1}
+    
+    def test_non_routine_message_uses_shared_sender(self, server):
+        sender = GelfSender("127.0.0.1", server.port, "tcp")
+        config = {"host": "127.0.0.1", "protocol": "tcp", "heartbeat_transport": "udp"}
+        try:
+            assert _deliver_gelf(_gelf_payload({"n": 1}), config, server.port, sender) == "tcp"
+            assert server.wait_for(1) == [{"n": 1}]
+        finally:
+            sender.close()
+
+
+class TestResolveHost:
+    """Tests for the DNS resolution cache."""
+    
+    def test_resolution_cached_until_refresh(self, monkeypatch):
+        calls = []
+        real_getaddrinfo = socket.getaddrinfo
+        
+        def counting_getaddrinfo(*args, **kwargs):
+            calls.append(args[0])
+            return real_getaddrinfo(*args, **kwargs)
+        
+        monkeypatch.setattr(heartbeat.socket, "getaddrinfo", counting_getaddrinfo)
+        monkeypatch.setattr(heartbeat, "_HOST_ADDR_CACHE", {})
+        monkeypatch.setattr(heartbeat, "_HOST_ADDR_REFRESH", 3)
+        for _ in range(4):
+            family, sockaddr = _resolve_host("127.0.0.1", 12201, socket.SOCK_DGRAM)
+        assert family == socket.AF_INET
+        assert sockaddr == ("127.0.0.1", 12201)
+        assert len(calls) == 2
@@ -0,0 +1,156 @@
+"""
+Tests for migrate backup and version helpers.
+"""
+
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path (migrate is a top-level module)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import migrate
+
+
+def run_with_timeout(func, *args, timeout=5):
+    """Esegue func in un thread: una copia bloccata non deve bloccare la suite"""
+    outcome = {}
+    
+    def target():
+        try:
+            func(*args)
+        except BaseException as e:
+            outcome["error"] = e
+    
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "copia bloccata"
+    return outcome.get("error")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "config.json").write_text('{"codcli": "1"}')
+    (src / "sub" / "data.bin").write_bytes(os.urandom(4096))
+    os.chmod(src / "config.json", 0o600)
+    os.utime(src / "sub" / "data.bin", (1000, 1000))
+    return src
+
+
+class TestFastCopytree:
+    """Tests for the parallel backup copy."""
+    
+    def test_copies_content_and_metadata(self, tree, tmp_path):
+        dst = tmp_path / "dst"
+        migrate._fast_copytree(tree, dst)
+        assert (dst / "config.json").read_text() == '{"codcli": "1"}'
+        assert (dst / "sub" / "data.bin").read_bytes() == (tree / "sub" / "data.bin").read_bytes()
+        assert os.stat(dst / "config.json").st_mode & 0o777 == 0o600
+        assert os.stat(dst / "sub" / "data.bin").st_mtime == 1000
+    
+    def test_existing_destination_fails(self, tree, tmp_path):
+        dst = tmp_path / "dst"
+        dst.mkdir()
+        with pytest.raises(FileExistsError):
+            migrate._fast_copytree(tree, dst)
+    
+    def test_fifo_rejected_without_blocking(self, tree, tmp_path):
+        os.mkfifo(tree / "sub" / "pipe")
+        error = run_with_timeout(migrate._fast_copytree, tree, tmp_path / "dst")
+        assert isinstance(error, shutil.SpecialFileError)
+    
+    def test_unreadable_directory_fails(self, tree, tmp_path, monkeypatch):
+        real_scandir = os.scandir
+        blocked = str(tree / "sub")
+        
+        def scandir(path="."):
+            if str(path) == blocked:
+                raise PermissionError(13, "Permission denied", blocked)
+            return real_scandir(path)
+        
+        monkeypatch.setattr(os, "scandir", scandir)
+        with pytest.raises(PermissionError):
+            migrate._fast_copytree(tree, tmp_path / "dst")
+    
+    def test_missing_source_fails(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            migrate._fast_copytree(tmp_path / "missing", tmp_path / "dst")
+    
+    def test_backup_reports_error(self, tree):
+        os.mkfifo(tree / "pipe")
+        result = migrate.MigrationResult()
+        assert run_with_timeout(migrate.backup_old_installation, tree, result) is None
+        assert result.errors
+
+
+class TestVersionAndDiscovery:
+    """Tests for version reading and old installation discovery."""
+    
+    def test_read_version_first_assignment(self, tmp_path):
+        version_file = tmp_path / "version.py"
+        version_file.write_text('"""doc"""\n__version__ = "2.3.1"\n__version__ = "9.9"\n')
+        assert migrate._read_version(version_file) == "2.3.1"
+    
+    def test_read_version_missing(self, tmp_path):
+        assert migrate._read_version(tmp_path / "version.py") is None
+    
+    def test_find_old_installation(self, tmp_path, monkeypatch):
+        empty = tmp_path / "empty"
+        empty.mkdir()
+        old = tmp_path / "old"
+        old.mkdir()
+        (old / "proxmox_core.py").touch()
+        monkeypatch.setattr(migrate, "OLD_PATHS", [tmp_path / "missing", tmp_path / "empty" / "file", empty, old])
+        assert migrate.find_old_installation() == old
+    
+    def test_find_old_installation_none(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(migrate, "OLD_PATHS", [tmp_path])
+        assert migrate.find_old_installation() is None
+    
+    def test_stat_cache_invalidation(self, tmp_path):
+        target = tmp_path / "later"
+        assert not migrate._exists(target)
+        target.mkdir()
+        assert not migrate._exists(target)
+        migrate._invalidate_stat_cache()
+        assert migrate._is_dir(target)
+
+
+class TestGitHelpers:
+    """Tests for the git command fallback."""
+    
+    @pytest.fixture
+    def commands(self, monkeypatch):
+        calls = []
+        results = []
+        
+        def fake_run_command(argv, check=False, input=None):
+            calls.append(argv)
+            return results.pop(0) if results else (0, "", "")
+        
+        monkeypatch.setattr(migrate, "PYGIT2_AVAILABLE", False)
+        monkeypatch.setattr(migrate, "run_command", fake_run_command)
+        return calls, results
+    
+    def test_clone_uses_git_argv(self, commands, tmp_path):
+        calls, _ = commands
+        assert migrate._git_clone(tmp_path / "install") == (True, "")
+        assert calls == [["git", "clone", "-b", migrate.BRANCH, migrate.REPO_URL, str(tmp_path / "install")]]
+    
+    def test_update_stops_on_fetch_failure(self, commands, tmp_path):
+        calls, results = commands
+        results.append((1, "", "network down"))
+        assert migrate._git_update(tmp_path) == (False, "network down")
+        assert len(calls) == 1
+    
+    def test_update_fetch_then_reset(self, commands, tmp_path):
+        calls, _ = commands
+        assert migrate._git_update(tmp_path) == (True, "")
+        assert calls[1] == ["git", "-C", str(tmp_path), "reset", "--hard", f"origin/{migrate.BRANCH}"]